@@ -1,3 +1,7 @@
 from django.contrib import admin
 
+from .models import ChangeLogEntry, ChangeLogWatermark
+
 # Register your models here.
+admin.site.register(ChangeLogEntry)
+admin.site.register(ChangeLogWatermark)
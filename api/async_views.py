@@ -0,0 +1,165 @@
+from functools import wraps
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+
+from blogs.filters import FullTextSearchFilter
+from blogs.models import Blog, Comment
+from blogs.serializers import BlogSerializer, CommentSerializer
+from employees.filters import EmployeeFilter
+from employees.models import Employee
+from students.models import Student
+
+from .fieldsets import get_fieldset, project_queryset, trim_serializer
+from .paginations import AsyncLimitOffsetPagination, AsyncPageNumberPagination
+from .renderers import dumps
+from .serializers import EmployeeSerializer, StudentSerializer, get_values_list_representation
+
+'''ASYNC VIEWS'''
+# Die DRF-Views in views.py sind synchron -> unter ASGI (asgi.py) schickt Django jeden Request komplett über sync_to_async in einen Thread
+# Die Views hier sind "async def" -> sie laufen direkt im Event Loop, nur die einzelnen DB-Queries werden über das async ORM
+# (acount, aget, aiterator, async for) ausgeführt. Während eine Query läuft, kann der Event Loop andere Requests bearbeiten
+# Hinweis: Django hat (noch) keinen async Datenbanktreiber -> die Queries selbst laufen weiterhin über sync_to_async
+#
+# Nur Lesezugriffe (GET, Liste und Detail). Schreiben läuft weiterhin über die DRF-Views
+# Erreichbar unter /api/v1/async/students/, /api/v1/async/employees/, /api/v1/async/blogs/, /api/v1/async/comments/ (+ <pk>/)
+# Die Antworten entsprechen denen der DRF-Views, auch die Pagination: Employees per ?page-number=&page_size= wie beim EmployeeViewset,
+# die anderen Listen per ?limit=&offset=
+# Ausnahme: die Gesamtanzahl wird immer exakt gezählt -> kein Cache, keine Schätzung über COUNT_THRESHOLD (siehe paginations.py)
+# ?fields= / ?exclude= funktionieren wie bei den DRF-Views (siehe fieldsets.py)
+
+# Anzahl der Zeilen, die aiterator() pro Query aus der DB holt
+CHUNK_SIZE = 2000
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def not_found(model):
+    # gleiche Meldung wie bei get_object_or_404() in den DRF-Views
+    return json_response({'detail': f'No {model._meta.object_name} matches the given query.'}, status=404)
+
+
+async def paginated_response(request, queryset, serialize, pagination_class=AsyncLimitOffsetPagination):
+    # serialize: wandelt eine Liste von Zeilen bzw. Objekten in Dictionaries um
+    paginator = pagination_class()
+    try:
+        page = await paginator.apaginate_queryset(queryset, Request(request))
+    except NotFound as error:
+        return json_response({'detail': error.detail}, status=404)
+    if page is not None:
+        return json_response(paginator.get_paginated_data(serialize(page)))
+    # Ohne Pagination -> alle Zeilen in Chunks laden
+    return json_response(serialize([row async for row in queryset.aiterator(chunk_size=CHUNK_SIZE)]))
+
+
+# Decorator: liest ?fields= / ?exclude= für den Serializer und übergibt die Auswahl als fieldset an die View
+# Unbekannte Felder -> 400 wie bei den DRF-Views
+def sparse_fieldset(serializer_class):
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                fieldset = get_fieldset(request.GET, serializer_class)
+            except ValidationError as error:
+                return json_response(error.detail, status=400)
+            return await view(request, *args, fieldset=fieldset, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Für die einfachen Serializer (Student, Employee, Comment) -> Read-only Fast Path über values_list(), keine Model-Objekte
+async def values_list_list(request, serializer_class, queryset, fieldset, pagination_class=AsyncLimitOffsetPagination):
+    representation = get_values_list_representation(serializer_class, fieldset)
+    return await paginated_response(
+        request, representation.values_list(queryset.order_by('pk')), representation.represent, pagination_class,
+    )
+
+
+async def values_list_detail(serializer_class, queryset, pk, fieldset):
+    representation = get_values_list_representation(serializer_class, fieldset)
+    try:
+        row = await representation.values_list(queryset).aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        return not_found(queryset.model)
+    return json_response(representation.to_representation(row))
+
+
+@require_GET
+@sparse_fieldset(StudentSerializer)
+async def studentsView(request, fieldset):
+    return await values_list_list(request, StudentSerializer, Student.objects.all(), fieldset)
+
+
+@require_GET
+@sparse_fieldset(StudentSerializer)
+async def studentDetailView(request, pk, fieldset):
+    return await values_list_detail(StudentSerializer, Student.objects.all(), pk, fieldset)
+
+
+@require_GET
+@sparse_fieldset(EmployeeSerializer)
+async def employeesView(request, fieldset):
+    # Gleiche Filter wie beim EmployeeViewset (?designation=, ?emp_name=, ?id_min= ...)
+    filterset = EmployeeFilter(request.GET, queryset=Employee.objects.all())
+    if not filterset.is_valid():
+        return json_response(filterset.errors, status=400)
+    return await values_list_list(request, EmployeeSerializer, filterset.qs, fieldset, AsyncPageNumberPagination)
+
+
+@require_GET
+@sparse_fieldset(EmployeeSerializer)
+async def employeeDetailView(request, pk, fieldset):
+    return await values_list_detail(EmployeeSerializer, Employee.objects.all(), pk, fieldset)
+
+
+# Kommentare nur, wenn sie ausgewählt sind (wie beim BlogCommentsMixin in views.py)
+def blog_queryset(fieldset):
+    queryset = Blog.objects.all()
+    if fieldset is None or 'comments' in fieldset:
+        queryset = queryset.prefetch_comments()
+    return queryset
+
+
+# Der FullTextSearchFilter liest die search_fields von der View -> gleiche Felder wie bei BlogView
+class BlogSearchView:
+    search_fields = ['blog_title', 'blog_body']
+
+
+@require_GET
+@sparse_fieldset(BlogSerializer)
+async def blogsView(request, fieldset):
+    # Suche wie bei BlogView über ?q= (FullTextSearchFilter)
+    # Blogs mit eingebetteten Kommentaren -> prefetch_comments() lädt die Kommentare per Prefetch für die ganze Seite (kein N+1)
+    # Der BlogSerializer greift nur auf die bereits geladenen Kommentare zu -> keine weiteren Queries im Event Loop
+    drf_request = Request(request)
+    queryset = FullTextSearchFilter().filter_queryset(drf_request, blog_queryset(fieldset), BlogSearchView)
+    if not queryset.query.order_by:
+        queryset = queryset.order_by('pk')
+    queryset = project_queryset(queryset, BlogSerializer, fieldset)
+    return await paginated_response(request, queryset, lambda blogs: trim_serializer(BlogSerializer(blogs, many=True), fieldset).data)
+
+
+@require_GET
+@sparse_fieldset(BlogSerializer)
+async def blogDetailView(request, pk, fieldset):
+    try:
+        blog = await project_queryset(blog_queryset(fieldset), BlogSerializer, fieldset).aget(pk=pk)
+    except Blog.DoesNotExist:
+        return not_found(Blog)
+    return json_response(trim_serializer(BlogSerializer(blog), fieldset).data)
+
+
+@require_GET
+@sparse_fieldset(CommentSerializer)
+async def commentsView(request, fieldset):
+    return await values_list_list(request, CommentSerializer, Comment.objects.all(), fieldset)
+
+
+@require_GET
+@sparse_fieldset(CommentSerializer)
+async def commentDetailView(request, pk, fieldset):
+    return await values_list_detail(CommentSerializer, Comment.objects.all(), pk, fieldset)
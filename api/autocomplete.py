@@ -0,0 +1,327 @@
+import bisect
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Max
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from blogs.models import Blog
+from employees.models import Employee
+
+from .changes import get_watermark
+from .models import ChangeLogEntry
+
+logger = logging.getLogger('api.autocomplete')
+
+'''AUTOCOMPLETE'''
+# Type-Ahead für Employee-Namen und Blog-Titel, ohne bei jedem Tastendruck die Datenbank zu fragen
+#   GET /api/v1/employees/autocomplete/?q=jo&limit=5 -> {"results": [{"id": 3, "emp_name": "John Smith"}, ...]}
+#   GET /api/v1/blogs/autocomplete/?q=djan          -> {"results": [{"id": 7, "blog_title": "Django Tipps"}, ...]}
+# Vorher: ?emp_name= (icontains -> Full Scan) bzw. ?q= über den SearchFilter
+#
+# PrefixIndex: zwei sortierte Listen aus (Schlüssel, pk) im Speicher des Prozesses
+# - heads: der kleingeschriebene Wert ab dem ersten Wort, z.B. "hans müller"
+# - tails: der Wert ab jedem weiteren Wort, z.B. "müller" -> "mül" findet auch "Hans Müller"
+# Suche: bisect auf den ersten Schlüssel >= präfix, dann die folgenden Einträge, solange sie mit dem Präfix beginnen (höchstens k)
+# -> O(log n + k), unabhängig davon, wie viele Einträge mit dem Präfix beginnen
+# Ranking: Treffer am Anfang des Werts vor Treffern in späteren Wörtern, jeweils alphabetisch (ein exakter Treffer steht damit vorne)
+#
+# Aktualisierung:
+# - beim Start (wsgi.py/asgi.py über warm_up()) bzw. bei der ersten Suche komplett aus der Datenbank
+# - Änderungen dieses Prozesses sofort über die Signals (nach dem Commit, verbunden in signals.py)
+# - Änderungen anderer Prozesse (mehrere Worker) alle SYNC_INTERVAL Sekunden über das Change Log (siehe changes.py)
+#   Wurden Einträge seit dem letzten Abgleich schon kompaktiert (Marke der Ressource über der eigenen seq), wird komplett neu geladen
+#   Den Abgleich macht ein Hintergrund-Thread (gestartet von warm_up()) -> eine Suche fragt die Datenbank nie,
+#   außer beim allerersten Laden, falls warm_up() nicht gelaufen ist
+#   Mit SYNC_ON_REQUEST übernimmt stattdessen der erste Request nach Ablauf von SYNC_INTERVAL den Abgleich (siehe settings.py)
+
+DEFAULTS = {
+    'WARM_UP': True,
+    'LIMIT': 10,
+    'MAX_LIMIT': 50,
+    # Sekunden zwischen zwei Abgleichen mit dem Change Log, None -> nie (nur ein Prozess)
+    'SYNC_INTERVAL': 5,
+    # True -> Abgleich im Request statt im Hintergrund-Thread
+    'SYNC_ON_REQUEST': False,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_AUTOCOMPLETE', {}).get(name, DEFAULTS[name])
+
+
+def normalize(value):
+    # Groß-/Kleinschreibung und mehrfache Leerzeichen spielen keine Rolle
+    return ' '.join(value.casefold().split())
+
+
+def get_keys(label):
+    # -> (Schlüssel für heads, [Schlüssel für tails])
+    words = normalize(label).split(' ')
+    return ' '.join(words), [' '.join(words[position:]) for position in range(1, len(words))]
+
+
+class PrefixIndex:
+    def __init__(self, model, field, resource):
+        self.model = model
+        self.field = field
+        self.resource = resource
+        self.lock = threading.RLock()
+        # Nur ein Request gleichzeitig lädt bzw. gleicht ab, die anderen warten darauf, statt dasselbe noch einmal zu tun
+        # Getrennt von lock -> Suchen laufen weiter, während die Datenbank abgefragt wird
+        self.sync_lock = threading.Lock()
+        self.unload()
+
+    def unload(self):
+        with self.lock:
+            self.loaded = False
+            self.heads = []
+            self.tails = []
+            # pk -> Wert
+            self.labels = {}
+            # Letzte seq des Change Logs, die schon enthalten ist
+            self.seq = 0
+            self.synced_at = 0
+
+    '''AUFBAU'''
+
+    def load(self):
+        # seq vor den Daten lesen -> was während des Ladens geändert wird, holt der nächste Abgleich nach
+        seq = self.get_latest_seq()
+        labels = dict(self.model.objects.values_list('pk', self.field).iterator(chunk_size=5000))
+        heads = []
+        tails = []
+        for pk, label in labels.items():
+            head, keys = get_keys(label)
+            heads.append((head, pk))
+            tails.extend((key, pk) for key in keys)
+        heads.sort()
+        tails.sort()
+        with self.lock:
+            self.heads = heads
+            self.tails = tails
+            self.labels = labels
+            self.seq = seq
+            self.synced_at = time.monotonic()
+            self.loaded = True
+
+    def get_latest_seq(self):
+        # Mindestens die Marke der Kompaktierung -> sonst würde jeder Abgleich nach dem Laden erneut komplett laden
+        latest = ChangeLogEntry.objects.filter(resource=self.resource).aggregate(seq=Max('seq'))['seq'] or 0
+        return max(latest, get_watermark(self.resource))
+
+    '''ÄNDERUNGEN'''
+
+    def put(self, pk, label):
+        with self.lock:
+            if not self.loaded:
+                # Noch nicht geladen -> kommt beim Laden ohnehin aus der Datenbank
+                return
+            if pk in self.labels:
+                if self.labels[pk] == label:
+                    return
+                self._remove(pk)
+            self.labels[pk] = label
+            head, keys = get_keys(label)
+            bisect.insort(self.heads, (head, pk))
+            for key in keys:
+                bisect.insort(self.tails, (key, pk))
+
+    def remove(self, pk):
+        with self.lock:
+            if self.loaded and pk in self.labels:
+                self._remove(pk)
+
+    def _remove(self, pk):
+        head, keys = get_keys(self.labels.pop(pk))
+        for entries, key in [(self.heads, head)] + [(self.tails, key) for key in keys]:
+            index = bisect.bisect_left(entries, (key, pk))
+            if index < len(entries) and entries[index] == (key, pk):
+                del entries[index]
+
+    def sync(self):
+        # Änderungen anderer Prozesse aus dem Change Log übernehmen (pro Objekt nur der aktuelle Stand)
+        # Liegt self.seq unter der Marke der Kompaktierung (compact_changes), fehlen Einträge -> komplett neu laden
+        if self.seq < get_watermark(self.resource):
+            self.load()
+            return
+        changed = ChangeLogEntry.objects.filter(resource=self.resource, seq__gt=self.seq)
+        seq = changed.aggregate(seq=Max('seq'))['seq']
+        if seq is not None:
+            ids = set(changed.filter(seq__lte=seq).values_list('object_id', flat=True))
+            current = dict(self.model.objects.filter(pk__in=ids).values_list('pk', self.field))
+            with self.lock:
+                for pk in ids:
+                    if pk in current:
+                        self.put(pk, current[pk])
+                    else:
+                        self.remove(pk)
+                self.seq = seq
+        with self.lock:
+            self.synced_at = time.monotonic()
+
+    def is_stale(self):
+        interval = get_setting('SYNC_INTERVAL')
+        return not self.loaded or (interval is not None and time.monotonic() - self.synced_at >= interval)
+
+    def refresh(self, force=False):
+        with self.sync_lock:
+            # Nochmal prüfen -> ein anderer Thread hat evtl. gerade abgeglichen, während dieser gewartet hat
+            if not self.loaded:
+                self.load()
+            elif force or self.is_stale():
+                self.sync()
+
+    def ensure_current(self):
+        # Im Request nur das erste Laden, den Abgleich macht der Sync-Thread (außer mit SYNC_ON_REQUEST)
+        if not self.loaded or (get_setting('SYNC_ON_REQUEST') and self.is_stale()):
+            self.refresh()
+
+    '''SUCHE'''
+
+    def search(self, prefix, limit=10):
+        # -> [(pk, Wert), ...], die besten Treffer zuerst
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self.ensure_current()
+        with self.lock:
+            pks = []
+            for entries in (self.heads, self.tails):
+                index = bisect.bisect_left(entries, (prefix,))
+                while len(pks) < limit and index < len(entries) and entries[index][0].startswith(prefix):
+                    # Ein Objekt kann über mehrere Wörter passen (z.B. "anna annabelle" für "ann") -> nur einmal
+                    if entries[index][1] not in pks:
+                        pks.append(entries[index][1])
+                    index += 1
+            return [(pk, self.labels[pk]) for pk in pks]
+
+
+INDEXES = {
+    'employees': PrefixIndex(Employee, 'emp_name', 'employees'),
+    'blogs': PrefixIndex(Blog, 'blog_title', 'blogs'),
+}
+MODEL_INDEXES = {index.model: index for index in INDEXES.values()}
+
+
+def warm_up():
+    # Beim Start des Servers (wsgi.py, asgi.py) -> die erste Suche muss nicht erst den Index aufbauen
+    if not get_setting('WARM_UP'):
+        return
+    for index in INDEXES.values():
+        try:
+            index.load()
+        except DatabaseError:
+            # z.B. Datenbank noch nicht migriert -> der Index wird bei der ersten Suche geladen
+            index.unload()
+    start_sync_thread()
+
+
+'''ABGLEICH IM HINTERGRUND'''
+# Ein Daemon-Thread pro Prozess gleicht alle SYNC_INTERVAL Sekunden die geladenen Indizes mit dem Change Log ab
+# Gestartet in warm_up() beim Import von wsgi.py/asgi.py -> bei Servern, die die App vor dem Fork laden (z.B. gunicorn --preload),
+# läuft der Thread nur im Master-Prozess. Dort stattdessen SYNC_ON_REQUEST einschalten
+_sync_thread = None
+_sync_stop = threading.Event()
+
+
+def sync_indexes():
+    # Ein Durchlauf des Sync-Threads
+    for index in INDEXES.values():
+        if not index.loaded:
+            continue
+        try:
+            index.refresh(force=True)
+        except DatabaseError:
+            # Beim nächsten Durchlauf noch einmal
+            logger.exception('Autocomplete sync for %s failed', index.resource)
+
+
+def run_sync_thread(interval):
+    while not _sync_stop.wait(interval):
+        try:
+            sync_indexes()
+        finally:
+            # Eigene Datenbankverbindung des Threads -> nicht zwischen den Durchläufen offen halten
+            connections.close_all()
+
+
+def start_sync_thread():
+    global _sync_thread
+    interval = get_setting('SYNC_INTERVAL')
+    if interval is None or get_setting('SYNC_ON_REQUEST') or _sync_thread is not None:
+        return
+    _sync_stop.clear()
+    _sync_thread = threading.Thread(target=run_sync_thread, args=(interval,), name='autocomplete-sync', daemon=True)
+    _sync_thread.start()
+
+
+def stop_sync_thread():
+    global _sync_thread
+    if _sync_thread is not None:
+        _sync_stop.set()
+        _sync_thread.join()
+        _sync_thread = None
+
+
+'''SIGNALS'''
+# Erst nach dem Commit -> ein zurückgerollter Write landet nie im Index
+
+
+def index_save(sender, instance, **kwargs):
+    index = MODEL_INDEXES[sender]
+    pk, label = instance.pk, getattr(instance, index.field)
+    transaction.on_commit(lambda: index.put(pk, label))
+
+
+def index_delete(sender, instance, **kwargs):
+    index = MODEL_INDEXES[sender]
+    pk = instance.pk
+    transaction.on_commit(lambda: index.remove(pk))
+
+
+def index_bulk_save(sender, instances, **kwargs):
+    index = MODEL_INDEXES[sender]
+    items = [(instance.pk, getattr(instance, index.field)) for instance in instances]
+
+    def apply():
+        for pk, label in items:
+            index.put(pk, label)
+    transaction.on_commit(apply)
+
+
+def index_bulk_delete(sender, instances, **kwargs):
+    index = MODEL_INDEXES[sender]
+    pks = [instance.pk for instance in instances]
+
+    def apply():
+        for pk in pks:
+            index.remove(pk)
+    transaction.on_commit(apply)
+
+
+'''VIEW'''
+
+
+# GET /api/v1/<resource>/autocomplete/?q=<präfix>&limit=<k>
+# resource wird in urls.py gesetzt: AutocompleteView.as_view(resource='employees')
+class AutocompleteView(APIView):
+    resource = None
+
+    def get(self, request):
+        index = INDEXES[self.resource]
+        limit = request.query_params.get('limit', get_setting('LIMIT'))
+        try:
+            limit = int(limit)
+            if not 1 <= limit <= get_setting('MAX_LIMIT'):
+                raise ValueError
+        except ValueError:
+            raise ValidationError({'limit': f'An integer between 1 and {get_setting("MAX_LIMIT")} is required.'})
+
+        matches = index.search(request.query_params.get('q', ''), limit)
+        return Response({'results': [{'id': pk, index.field: label} for pk, label in matches]})
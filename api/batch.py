@@ -0,0 +1,185 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve, reverse
+from rest_framework import serializers
+from rest_framework.decorators import api_view
+
+from .renderers import dumps
+
+logger = logging.getLogger('api.batch')
+
+'''BATCH REQUESTS'''
+# Mehrere API-Requests in einem einzigen HTTP-Request -> http://127.0.0.1:8000/api/v1/batch/
+# Ein Dashboard, das nacheinander Students, gefilterte Employees, einige Blogs und Kommentare lädt, zahlt sonst für jeden Aufruf
+# den kompletten HTTP-Overhead (Verbindung, Middlewares, Authentifizierung)
+#
+# POST /api/v1/batch/
+# {
+#     "parallel": true,
+#     "requests": [
+#         {"id": "students", "path": "/api/v1/students/?limit=10"},
+#         {"id": "managers", "path": "/api/v1/employees/?designation=manager"},
+#         {"id": "blog", "path": "/api/v1/blogs/1/?exclude=comments", "headers": {"If-None-Match": "\"...\""}},
+#         {"method": "POST", "path": "/api/v1/comments/", "body": {"blog": 1, "comment": "Hallo"}}
+#     ]
+# }
+# -> {"responses": [{"id": "students", "status": 200, "headers": {...}, "body": {...}}, ...]}
+#
+# Die Sub-Requests laufen in-process direkt über die Views aus api/urls.py mit dem User und der Session des Batch-Requests
+# Jeder Sub-Request hat seinen eigenen Status -> ein Fehler bricht den Batch nicht ab
+# Die Middlewares laufen nur einmal für den Batch-Request, NICHT pro Sub-Request. Dadurch entfällt pro Sub-Request z.B.:
+# - Session, Authentifizierung und CSRF (übernommen bzw. schon beim Batch-Request geprüft, siehe build_request)
+# - Security-, Common-, Message- und Clickjacking-Middleware (gelten für die gemeinsame Antwort)
+# - die ProfilingMiddleware (api/middleware.py) -> Profiling bzw. Server-Timing gibt es nur für den Batch-Request als Ganzes
+# HEAD: wie bei HTTP ohne Body -> "body" ist null, Status und Header wie bei GET
+# Reihenfolge: standardmäßig nacheinander in der angegebenen Reihenfolge (z.B. erst POST, dann GET)
+# "parallel": true -> nur wenn ALLE Sub-Requests lesend sind (GET/HEAD), laufen sie gleichzeitig im Thread Pool
+
+# Höchstanzahl Sub-Requests pro Batch
+MAX_REQUESTS = 25
+
+# Threads für parallele Sub-Requests -> der Pool lebt so lange wie der Prozess, jeder Thread behält seine Datenbankverbindung
+# (CONN_MAX_AGE in settings.py) -> die Verbindungen werden über alle Batches hinweg wiederverwendet
+WORKERS = 4
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Header der Sub-Responses, die in die Antwort übernommen werden
+RESPONSE_HEADERS = ('ETag', 'Last-Modified', 'Location', 'X-Cache', 'Allow')
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(WORKERS, thread_name_prefix='api-batch')
+    return _executor
+
+
+def get_api_prefix():
+    # /api/v1/ -> alle Sub-Requests müssen unterhalb davon liegen
+    return reverse('batch_View').removesuffix('batch/')
+
+
+class SubRequestSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=100)
+    method = serializers.ChoiceField(['GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate_path(self, value):
+        if not value.startswith(get_api_prefix()):
+            raise serializers.ValidationError(f'Must start with {get_api_prefix()}.')
+        try:
+            match = resolve(urlsplit(value).path)
+        except Resolver404:
+            raise serializers.ValidationError('Unknown route.')
+        if match.url_name == 'batch_View':
+            raise serializers.ValidationError('Batches cannot be nested.')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False, max_length=MAX_REQUESTS)
+    parallel = serializers.BooleanField(default=False)
+
+
+def build_request(parent, item):
+    # Kopie des Batch-Requests (Host, Cookies, Authorization, ...) mit Methode, Pfad und Body des Sub-Requests
+    # Accept und die Validatoren für Conditional GET kommen nicht vom Batch-Request, sondern pro Sub-Request aus "headers"
+    meta = {
+        key: value for key, value in parent.META.items()
+        if key.startswith('HTTP_') and key not in ('HTTP_ACCEPT', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+    }
+    for key in ('REMOTE_ADDR', 'SERVER_NAME', 'SERVER_PORT'):
+        if key in parent.META:
+            meta[key] = parent.META[key]
+    for header, value in item.get('headers', {}).items():
+        meta['HTTP_' + header.upper().replace('-', '_')] = value
+    meta['HTTP_ACCEPT'] = 'application/json'
+
+    data = dumps(item['body']) if 'body' in item else b''
+    request = RequestFactory().generic(
+        item['method'], item['path'], data, content_type='application/json', secure=parent.is_secure(), **meta,
+    )
+    # User und Session wurden für den Batch-Request schon von den Middlewares ermittelt
+    # CSRF wurde beim Batch-Request selbst geprüft -> nicht noch einmal pro Sub-Request
+    request.user = getattr(parent, 'user', AnonymousUser())
+    if hasattr(parent, 'session'):
+        request.session = parent.session
+    request._dont_enforce_csrf_checks = True
+    return request
+
+
+def get_body(response):
+    # Der gerenderte JSON-Body wird unverändert übernommen -> kein erneutes Parsen und Serialisieren
+    content = response.content
+    if not content:
+        return b'null'
+    if response.get('Content-Type', '').startswith('application/json'):
+        return content
+    return dumps(content.decode(response.charset, errors='replace'))
+
+
+def dispatch(parent, item):
+    try:
+        match = resolve(urlsplit(item['path']).path)
+        request = build_request(parent, item)
+        view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+        response = view(request, *match.args, **match.kwargs)
+        if response.streaming:
+            # Exporte bzw. ?stream= -> passen nicht in eine gemeinsame Antwort
+            return item.get('id'), 400, {}, dumps({'detail': 'Streaming responses are not supported in batches.'})
+        if hasattr(response, 'render'):
+            response.render()
+        headers = {header: response[header] for header in RESPONSE_HEADERS if response.has_header(header)}
+        # Die Views rendern bei HEAD den kompletten Body (Django entfernt ihn sonst erst beim Senden) -> hier verwerfen
+        body = b'null' if item['method'] == 'HEAD' else get_body(response)
+        return item.get('id'), response.status_code, headers, body
+    except Exception:
+        # Unerwartete Fehler eines Sub-Requests -> 500 nur für diesen Eintrag
+        logger.exception('Batch sub-request %s %s failed', item['method'], item['path'])
+        return item.get('id'), 500, {}, dumps({'detail': 'Internal server error.'})
+
+
+def dispatch_in_thread(parent, item):
+    # Worker-Thread: abgelaufene bzw. kaputte Verbindungen schließen (wie Django es vor/nach jedem Request macht),
+    # die übrigen bleiben offen und werden vom nächsten Batch wiederverwendet
+    close_old_connections()
+    try:
+        return dispatch(parent, item)
+    finally:
+        close_old_connections()
+
+
+def encode(results):
+    # {"responses": [...]} direkt als Bytes zusammensetzen -> die Bodies der Sub-Responses sind schon fertiges JSON
+    items = (
+        b'{"id":' + dumps(item_id) + b',"status":' + str(status).encode() + b',"headers":' + dumps(headers) + b',"body":' + body + b'}'
+        for item_id, status, headers, body in results
+    )
+    return b'{"responses":[' + b','.join(items) + b']}'
+
+
+@api_view(['POST'])
+def batchView(request):
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    items = serializer.validated_data['requests']
+    parent = request._request
+
+    parallel = serializer.validated_data['parallel'] and len(items) > 1 and all(item['method'] in SAFE_METHODS for item in items)
+    if parallel:
+        results = list(get_executor().map(lambda item: dispatch_in_thread(parent, item), items))
+    else:
+        results = [dispatch(parent, item) for item in items]
+    return HttpResponse(encode(results), content_type='application/json')
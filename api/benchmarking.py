@@ -0,0 +1,314 @@
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.test import APIClient
+
+from blogs.models import Blog, Comment
+from employees.models import Employee
+from students.models import Student
+
+from . import urls as api_urls
+from .signals import bulk_saved
+
+'''BENCHMARK SUITE'''
+# 1. Testdaten: seed() legt beliebig viele Students, Employees, Blogs und Comments an (python manage.py seed_data)
+#    Die Daten sind deterministisch -> gleicher seed = gleiche Daten, damit verschiedene Läufe vergleichbar sind
+#    Die Anzahl der Kommentare pro Blog ist schief verteilt (Pareto): die meisten Blogs haben wenige, einige sehr viele Kommentare
+# 2. Benchmark: run_benchmark() ruft jede GET-Route aus api/urls.py in-process über den APIClient auf (python manage.py benchmark_api)
+#    und misst p50/p95/p99 Latenz, Requests pro Sekunde, Anzahl der Queries und den Speicher-Peak (tracemalloc)
+#    Das Ergebnis kann als JSON gespeichert und mit einem früheren Lauf verglichen werden
+
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Emma', 'Felix', 'Greta', 'Hannah', 'Jonas', 'Lena', 'Lukas', 'Mia', 'Noah', 'Paul', 'Sophie']
+LAST_NAMES = ['Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker', 'Schulz', 'Hoffmann', 'Koch', 'Richter']
+DESIGNATIONS = ['Software Engineer', 'Manager', 'Developer', 'Tester', 'Designer', 'Data Scientist', 'Team Lead', 'Intern']
+BRANCHES = ['Computer Science', 'Electrical Engineering', 'Mechanical Engineering', 'Mathematics', 'Physics']
+WORDS = (
+    'django rest framework api query index cache serializer pagination database performance latency '
+    'python async view model filter search blog comment student employee benchmark throughput'
+).split()
+
+BATCH_SIZE = 5000
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(model, objects, batch_size=BATCH_SIZE):
+    # bulk_create() pro Batch in einer eigenen Transaktion + bulk_saved Signal (Cache-Invalidierung usw., siehe signals.py)
+    created = 0
+    for batch in batched(objects, batch_size):
+        with transaction.atomic():
+            batch = model.objects.bulk_create(batch)
+        bulk_saved.send(sender=model, instances=batch, created=True)
+        created += len(batch)
+    return created
+
+
+def next_number(model, field, prefix):
+    # Nächste freie laufende Nummer für Schlüssel wie S0000042 / EMP0000042 (prefix + 7 Ziffern, siehe seed())
+    # Nicht count(): nach einem Löschen wäre count() kleiner als die höchste Nummer -> doppelte Schlüssel, der Unique Index schlägt fehl
+    # Die Nummern sind auf 7 Stellen aufgefüllt -> das größte Schlüssel-Textfeld hat auch die größte Nummer
+    last = model.objects.filter(**{f'{field}__regex': rf'^{prefix}[0-9]{{7}}$'}).aggregate(last=Max(field))['last']
+    return int(last[len(prefix):]) + 1 if last else 0
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def comment_counts(rng, blogs, mean, skew, maximum):
+    # Pareto-Verteilung: E[X - 1] = 1 / (skew - 1) -> skaliert auf den gewünschten Mittelwert
+    # Je kleiner skew, desto schiefer die Verteilung (wenige Blogs mit sehr vielen Kommentaren)
+    for _ in range(blogs):
+        yield min(int((rng.paretovariate(skew) - 1) * mean * (skew - 1)), maximum)
+
+
+def seed(students=0, employees=0, blogs=0, comments_mean=5, comments_skew=1.5, comments_max=5000, seed=0, batch_size=BATCH_SIZE, log=None):
+    # Legt die Testdaten an und gibt die Anzahl der neuen Zeilen pro Model zurück
+    # Die laufenden Nummern (student_id, emp_id, Titel) setzen bei bereits vorhandenen Daten fort (student_id/emp_id nach der höchsten Nummer)
+    # Eigener Zufallsgenerator pro Datenart -> die Daten hängen nicht von der Reihenfolge bzw. der batch_size ab
+    rng = random.Random(seed)
+    counts_rng, blogs_rng, comments_rng = (random.Random(f'{seed}-{name}') for name in ('counts', 'blogs', 'comments'))
+    log = log or (lambda message: None)
+    counts = {}
+
+    start = next_number(Student, 'student_id', 'S')
+    log(f'students: {students}')
+    counts['students'] = bulk_insert(Student, (
+        Student(student_id=f'S{start + i:07}', name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', branch=rng.choice(BRANCHES))
+        for i in range(students)
+    ), batch_size)
+
+    start = next_number(Employee, 'emp_id', 'EMP')
+    log(f'employees: {employees}')
+    counts['employees'] = bulk_insert(Employee, (
+        Employee(emp_id=f'EMP{start + i:07}', emp_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', designation=rng.choice(DESIGNATIONS))
+        for i in range(employees)
+    ), batch_size)
+
+    start = Blog.objects.count()
+    log(f'blogs: {blogs}')
+    counts['blogs'] = 0
+    counts['comments'] = 0
+    # Blogs und ihre Kommentare batchweise -> die IDs der Blogs stehen nach bulk_create() fest
+    numbers = iter(range(start, start + blogs))
+    for batch in batched(comment_counts(counts_rng, blogs, comments_mean, comments_skew, comments_max), batch_size):
+        blog_objects = [
+            Blog(blog_title=f'Blog {number}: {sentence(blogs_rng, 4)}', blog_body=sentence(blogs_rng, blogs_rng.randint(20, 200)))
+            for number in (next(numbers) for _ in batch)
+        ]
+        counts['blogs'] += bulk_insert(Blog, blog_objects, batch_size)
+        counts['comments'] += bulk_insert(Comment, (
+            Comment(blog=blog, comment=sentence(comments_rng, comments_rng.randint(3, 30)))
+            for blog, count in zip(blog_objects, batch) for _ in range(count)
+        ), batch_size)
+        log(f'blogs: {counts["blogs"]}/{blogs}, comments: {counts["comments"]}')
+    return counts
+
+
+'''ROUTES'''
+# Zusätzliche Queryparameter für einzelne Routen (URL-Name -> Parameter), z.B. für Routen, die ohne Parameter nichts tun
+ROUTE_PARAMS = {
+    'employees-export': {'output': 'ndjson'},
+    'blogs_Export_View': {'output': 'ndjson'},
+    # 100 Schlüssel, verteilt über die Nummern aus seed()
+    'employees-by-emp-id': {'ids': ','.join(f'EMP{i:07}' for i in range(0, 100000, 1000))},
+    'students_By_Key_View': {'ids': ','.join(f'S{i:07}' for i in range(0, 100000, 1000))},
+}
+
+# Weitere Szenarien neben den Routen selbst: Filter, Suche, Sortierung und die verschiedenen Paginations
+SCENARIOS = [
+    ('students_View', {'limit': 100}),
+    ('students_View', {'limit': 100, 'offset': 50000}),
+    ('employees-list', {'designation': 'manager'}),
+    ('employees-list', {'emp_name': 'müller', 'page_size': 100}),
+    ('employees-list', {'pagination': 'keyset', 'page_size': 100}),
+    ('employees-list', {'order-by': '-emp_name'}),
+    ('blogs_View', {'limit': 20}),
+    ('blogs_View', {'q': 'django cache'}),
+    ('blogs_View', {'limit': 20, 'comments_limit': 3}),
+    ('blogs_View', {'pagination': 'keyset', 'page_size': 20}),
+    ('blogs_View', {'limit': 20, 'order-by': '-comment_count', 'exclude': 'comments'}),
+    ('blogs_View', {'limit': 20, 'comments_min': 50}),
+    ('comments_View', {'limit': 100}),
+    ('employees-export', {'output': 'csv'}),
+    ('employees-facets', {'emp_name': 'a'}),
+    ('employees_Autocomplete_View', {'q': 'mü'}),
+    ('employees_Autocomplete_View', {'q': 'hans m'}),
+    ('employees_Changes_View', {'since': 0, 'limit': 100}),
+    ('blogs_Changes_View', {'since': 0, 'limit': 100}),
+    ('blogs_Export_View', {'output': 'csv', 'fields': 'id,blog_title,comment_count'}),
+]
+
+# Welches Model zu einer Route gehört -> für den <pk> in Detail-Routen
+RESOURCE_MODELS = {'students': Student, 'employees': Employee, 'blogs': Blog, 'comments': Comment}
+
+# Detail-Routen über den fachlichen Schlüssel (siehe lookups.py) -> URL-Parameter: Model
+KEY_MODELS = {'emp_id': Employee, 'student_id': Student}
+
+
+def iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield prefix + str(pattern.pattern), pattern
+
+
+def get_sample_pk(model, field='pk'):
+    # Ein Objekt aus der Mitte der Tabelle -> nicht der erste Eintrag, der evtl. schon im Page Cache von SQLite liegt
+    # field: statt des Primary Keys z.B. die emp_id desselben Objekts
+    count = model.objects.count()
+    if not count:
+        return None
+    return model.objects.order_by('pk').values_list(field, flat=True)[count // 2]
+
+
+def get_routes():
+    # Alle benannten Routen aus api/urls.py -> (Name, Pfad)
+    # Varianten mit Format-Suffix (z.B. employees.json) werden übersprungen, Detail-Routen bekommen einen existierenden <pk> bzw. Schlüssel
+    routes = {}
+    for route, pattern in iter_patterns(api_urls.urlpatterns):
+        kwargs = {}
+        groups = set(pattern.pattern.regex.groupindex)
+        if 'format' in groups or pattern.name in routes:
+            continue
+        if 'pk' in groups:
+            model = next((model for resource, model in RESOURCE_MODELS.items() if resource in route), None)
+            pk = get_sample_pk(model) if model is not None else None
+            if pk is None:
+                continue
+            kwargs['pk'] = pk
+        if groups & set(KEY_MODELS):
+            # z.B. employees/by-emp-id/<emp_id>/ -> emp_id eines existierenden Employees
+            field = (groups & set(KEY_MODELS)).pop()
+            value = get_sample_pk(KEY_MODELS[field], field)
+            if value is None:
+                continue
+            kwargs[field] = value
+        routes[pattern.name] = reverse(pattern.name, kwargs=kwargs)
+    return routes
+
+
+def get_scenarios():
+    routes = get_routes()
+    scenarios = [(name, path, ROUTE_PARAMS.get(name, {})) for name, path in routes.items()]
+    scenarios += [(name, routes[name], params) for name, params in SCENARIOS if name in routes]
+    return scenarios
+
+
+'''MESSUNG'''
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def fetch(client, path, params):
+    # Streaming Responses (z.B. die Exporte) erzeugen ihren Inhalt erst beim Lesen -> komplett lesen, damit die Zeit mitgemessen wird
+    response = client.get(path, params)
+    if response.streaming:
+        response.body_bytes = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        response.body_bytes = len(response.content)
+    return response
+
+
+def measure(client, path, params, iterations, warmup=1):
+    for _ in range(warmup):
+        response = fetch(client, path, params)
+    if response.status_code == 405:
+        # Route ohne GET (z.B. employees/bulk/) -> wird nicht gemessen
+        return None
+
+    latencies = []
+    queries = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = fetch(client, path, params)
+            latencies.append(time.perf_counter() - started)
+        queries = len(context.captured_queries)
+
+    # Speicher-Peak in einem eigenen Request -> tracemalloc verlangsamt die Ausführung und würde sonst die Latenz verfälschen
+    tracemalloc.start()
+    fetch(client, path, params)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'requests_per_second': round(iterations / total, 1) if total else None,
+        'queries': queries,
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_bytes': response.body_bytes,
+    }
+
+
+def run_benchmark(iterations=20, use_cache=False, only=None, log=None):
+    # Führt alle Szenarien aus und gibt das Ergebnis als Dictionary zurück (kann direkt als JSON gespeichert werden)
+    # use_cache=False -> Response Cache aus, damit jeder Request die Datenbank abfragt
+    # only: Liste von Routennamen, die gemessen werden sollen (None -> alle)
+    log = log or (lambda message: None)
+    client = APIClient()
+    results = []
+    # ALLOWED_HOSTS -> der APIClient schickt den Host 'testserver'
+    with override_settings(API_CACHE={'ENABLED': use_cache}, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, path, params in get_scenarios():
+            if only and name not in only:
+                continue
+            measurement = measure(client, path, params, iterations)
+            if measurement is None:
+                continue
+            result = {'route': name, 'path': path, 'params': params, **measurement}
+            results.append(result)
+            log(result)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'cache': use_cache,
+            'rows': {resource: model.objects.count() for resource, model in RESOURCE_MODELS.items()},
+        },
+        'results': results,
+    }
+
+
+def compare(previous, current):
+    # Vergleicht zwei Läufe -> (Route, Parameter, p95 vorher, p95 jetzt, Faktor) für alle Szenarien, die in beiden vorkommen
+    key = lambda result: (result['route'], json.dumps(result['params'], sort_keys=True))
+    before = {key(result): result for result in previous['results']}
+    for result in current['results']:
+        old = before.get(key(result))
+        if old is not None and old['p95_ms']:
+            yield result['route'], result['params'], old['p95_ms'], result['p95_ms'], result['p95_ms'] / old['p95_ms']
@@ -0,0 +1,179 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+# Server-seitiger Response Cache für die Lese-Endpunkte (GET) der API
+# Die Daten ändern sich viel seltener, als sie gelesen werden -> statt bei jedem Request die DB abzufragen und zu serialisieren,
+# wird das Ergebnis (response.data) zwischengespeichert und beim nächsten identischen Request direkt zurückgegeben
+#
+# Cache-Key: View + komplette URL inkl. Schema, Host und Query String (Filter, Suche, Sortierung, Pagination) + Versionen der beteiligten Models
+# Invalidierung: Jedes Model hat eine Versionsnummer im Cache. Ändert sich ein Student, Employee, Blog oder Comment (post_save/post_delete,
+# siehe signals.py), bekommt das Model eine neue Version -> alle Keys mit der alten Version werden nie mehr gelesen und fallen
+# irgendwann per LRU/TTL aus dem Cache
+#
+# Backend: Der Cache-Alias aus API_CACHE['ALIAS'] (settings.py). Standardmäßig LocMemCache -> läuft im Prozess ohne externen Dienst,
+# mit LRU-Verdrängung (MAX_ENTRIES) und TTL (TIMEOUT). Bei mehreren Worker-Prozessen sollte ein gemeinsamer Cache (Redis, Memcached)
+# eingetragen werden, da die Invalidierung sonst nur den eigenen Prozess erreicht
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[get_setting('ALIAS')]
+
+
+# Header, die zusammen mit den Daten gespeichert werden (Validatoren für Conditional GET, siehe conditional.py)
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+'''Hit/Miss-Zähler'''
+# Die Zähler gelten pro Prozess und werden unter /api/v1/cache/stats/ ausgegeben
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+def get_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        for counter in _stats:
+            _stats[counter] = 0
+
+
+'''Versionen pro Model'''
+def version_key(model):
+    return f'api:version:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Noch keine Version vorhanden (oder aus dem Cache verdrängt) -> neue, eindeutige Version anlegen
+            # Durch den Zeitstempel kann eine neue Version nie mit einer alten übereinstimmen
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_model(model, using=None):
+    # Neue Version setzen -> alle gecachten Responses, die von diesem Model abhängen, sind ab sofort ungültig
+    # Innerhalb einer Transaktion zusätzlich nach dem Commit: ein GET zwischen der ersten neuen Version und dem Commit liest noch
+    # die alten Zeilen und würde sie unter der neuen Version cachen -> die zweite Version nach dem Commit macht diesen Eintrag ungültig
+    bump_version(model)
+    record('invalidations')
+    using = using or router.db_for_write(model)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: bump_version(model), using=using)
+
+
+def bump_version(model):
+    get_cache().set(version_key(model), time.time_ns(), None)
+
+
+'''Cache-Lookup'''
+def get_media_type(request):
+    # Von DRF ausgehandelt (z.B. 'application/json'), sonst der Accept-Header
+    return getattr(request, 'accepted_media_type', None) or request.META.get('HTTP_ACCEPT', '')
+
+
+def make_key(name, request, models):
+    # Schema und Host gehören dazu -> gecachte Seiten enthalten absolute next/previous Links
+    # Der ausgehandelte Media Type (JSON oder Browsable API) auch -> der ETag hängt davon ab (siehe conditional.py)
+    versions = ':'.join(str(version) for version in get_versions(models))
+    url = f'{request.scheme}://{request.get_host()}{request.get_full_path()}'
+    digest = hashlib.md5(f'{versions}:{url}:{get_media_type(request)}'.encode()).hexdigest()
+    return f'api:response:{name}:{digest}'
+
+
+def cached_response(name, request, models, get_response):
+    # Nur GET-Requests werden gecacht, und nur erfolgreiche Antworten (200)
+    if not get_setting('ENABLED') or request.method != 'GET':
+        return get_response()
+
+    cache = get_cache()
+    key = make_key(name, request, models)
+    cached = cache.get(key)
+    if cached is not None:
+        record('hits')
+        # ETag und Last-Modified werden mit gecacht -> auch ein 304 Not Modified kommt dann ohne Datenbankzugriff aus
+        response = Response(cached['data'])
+        for header, value in cached['headers'].items():
+            response[header] = value
+        response['X-Cache'] = 'HIT'
+        return get_conditional_response(
+            request, etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified', '')), response=response,
+        )
+
+    record('misses')
+    response = get_response()
+    if isinstance(response, Response) and response.status_code == 200:
+        headers = {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+        cache.set(key, {'data': response.data, 'headers': headers}, get_setting('TIMEOUT'))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+# Mixin für Generic Views und Viewsets -> cacht list() und retrieve()
+# cache_models: Models, von denen die Antwort abhängt (z.B. Blogs enthalten auch die Kommentare -> (Blog, Comment))
+class ResponseCacheMixin:
+    cache_models = ()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.get_queryset().model,)
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            f'{self.__class__.__name__}.list', request, self.get_cache_models(),
+            lambda: super(ResponseCacheMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            f'{self.__class__.__name__}.retrieve', request, self.get_cache_models(),
+            lambda: super(ResponseCacheMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+
+# Decorator für Function Based Views -> muss unter @api_view stehen, damit request ein DRF-Request ist
+# Beispiel: @cache_response(Student)
+def cache_response(*models):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # Gestreamte Antworten (?stream=...) werden nicht gecacht
+            if 'stream' in request.query_params:
+                return view(request, *args, **kwargs)
+            return cached_response(view.__name__, request, models, lambda: view(request, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,196 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from blogs.models import Blog, Comment
+from blogs.serializers import BlogSerializer, CommentSerializer
+from employees.models import Employee
+from students.models import Student
+
+from .models import ChangeLogEntry, ChangeLogWatermark
+
+'''DELTA SYNC'''
+# Clients (z.B. die Mobile App) laden eine Liste einmal komplett und holen danach nur noch die Änderungen:
+#   GET /api/v1/employees/changes/            -> {"changes": [], "next": 1234, "has_more": false}   (Startpunkt vor dem vollen Download)
+#   GET /api/v1/employees/changes/?since=1234 -> {"changes": [{"seq": 1240, "id": 7, "action": "update", "data": {...}}, ...],
+#                                                 "next": 1240, "has_more": false}
+# "next" ist das ?since= für den nächsten Aufruf. Pro Objekt kommt nur der neueste Stand (data = aktuelle Repräsentation wie in der
+# Liste), gelöschte Objekte kommen als Tombstone mit action "delete" und data null -> create/update beim Client als Upsert behandeln
+# Liegt ?since= unter der Marke der Kompaktierung (python manage.py compact_changes), antwortet der Feed mit 410 Gone
+# -> der Client muss die Liste neu laden
+#
+# Aufgezeichnet wird über die Signals (post_save, post_delete und die Bulk-Signals, verbunden in signals.py)
+# Änderungen an Kommentaren zählen auch als Änderung ihres Blogs (die Blogs enthalten ihre Kommentare und comment_count)
+# Die Reihenfolge der seq entspricht der Reihenfolge der Commits, weil SQLite immer nur einen Schreiber gleichzeitig zulässt
+
+# Ressource (wie in der URL) -> Model
+RESOURCE_MODELS = {'students': Student, 'employees': Employee, 'blogs': Blog, 'comments': Comment}
+MODEL_RESOURCES = {model: resource for resource, model in RESOURCE_MODELS.items()}
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Einträge, die älter sind, werden von compact_changes entfernt
+RETENTION_DAYS = 30
+
+
+'''AUFZEICHNUNG'''
+
+
+def record(model, instances, action):
+    entries = [ChangeLogEntry(resource=MODEL_RESOURCES[model], object_id=instance.pk, action=action) for instance in instances]
+    if model is Comment:
+        # Ein Eintrag pro Blog, auch wenn mehrere seiner Kommentare geändert wurden
+        entries += [
+            ChangeLogEntry(resource='blogs', object_id=blog_id, action=ChangeLogEntry.UPDATE)
+            for blog_id in dict.fromkeys(instance.blog_id for instance in instances)
+        ]
+    ChangeLogEntry.objects.bulk_create(entries)
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    # raw -> loaddata (Fixtures), keine echte Änderung durch einen Client
+    if not raw:
+        record(sender, [instance], ChangeLogEntry.CREATE if created else ChangeLogEntry.UPDATE)
+
+
+def record_delete(sender, instance, **kwargs):
+    record(sender, [instance], ChangeLogEntry.DELETE)
+
+
+def record_bulk_save(sender, instances, created, **kwargs):
+    record(sender, instances, ChangeLogEntry.CREATE if created else ChangeLogEntry.UPDATE)
+
+
+def record_bulk_delete(sender, instances, **kwargs):
+    record(sender, instances, ChangeLogEntry.DELETE)
+
+
+'''FEED'''
+
+
+def get_resource_serializer(resource):
+    # api.serializers importiert signals.py, das wiederum diese Datei importiert -> erst hier importieren
+    from .serializers import EmployeeSerializer, StudentSerializer
+
+    return {'students': StudentSerializer, 'employees': EmployeeSerializer, 'blogs': BlogSerializer, 'comments': CommentSerializer}[resource]
+
+
+def get_resource_queryset(resource):
+    queryset = RESOURCE_MODELS[resource].objects.all()
+    return queryset.prefetch_comments() if resource == 'blogs' else queryset
+
+
+def get_watermark(resource):
+    return ChangeLogWatermark.objects.filter(resource=resource).values_list('seq', flat=True).first() or 0
+
+
+def get_latest_seq(resource):
+    # Startpunkt für neue Clients -> alles, was danach passiert, kommt über den Feed
+    latest = ChangeLogEntry.objects.aggregate(seq=Max('seq'))['seq'] or 0
+    return max(latest, get_watermark(resource))
+
+
+def get_changes(resource, since, limit=DEFAULT_LIMIT):
+    # Einträge nach since, pro Objekt nur der neueste -> ([Änderungen], next, has_more)
+    from .streaming import iter_representations
+
+    entries = list(
+        ChangeLogEntry.objects.filter(resource=resource, seq__gt=since).order_by('seq').values_list('seq', 'object_id', 'action')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for seq, object_id, action in entries:
+        # pop() -> das Objekt rückt an die Position seiner letzten Änderung
+        latest.pop(object_id, None)
+        latest[object_id] = (seq, action)
+
+    # Aktuelle Repräsentation aller geänderten (nicht gelöschten) Objekte mit einer Query (bzw. zwei bei Blogs mit Kommentaren)
+    ids = [object_id for object_id, (seq, action) in latest.items() if action != ChangeLogEntry.DELETE]
+    queryset = get_resource_queryset(resource).filter(pk__in=ids)
+    data = {item['id']: item for item in iter_representations(queryset, get_resource_serializer(resource))} if ids else {}
+
+    changes = []
+    for object_id, (seq, action) in latest.items():
+        # Inzwischen gelöscht (der Tombstone folgt erst auf einer späteren Seite) -> gleich als gelöscht melden
+        if object_id not in data:
+            action = ChangeLogEntry.DELETE
+        changes.append({'seq': seq, 'id': object_id, 'action': action, 'data': data.get(object_id)})
+    return changes, entries[-1][0] if entries else since, has_more
+
+
+# GET /api/v1/<resource>/changes/?since=<next>&limit=<n>
+# resource wird in urls.py gesetzt: ChangesView.as_view(resource='employees')
+class ChangesView(APIView):
+    resource = None
+
+    def get_int_param(self, name, default, minimum, maximum=None):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+            if value < minimum or (maximum is not None and value > maximum):
+                raise ValueError
+        except ValueError:
+            bounds = f'between {minimum} and {maximum}' if maximum is not None else f'at least {minimum}'
+            raise ValidationError({name: f'An integer {bounds} is required.'})
+        return value
+
+    def get(self, request):
+        since = self.get_int_param('since', None, 0)
+        limit = self.get_int_param('limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        if since is None:
+            return Response({'changes': [], 'next': get_latest_seq(self.resource), 'has_more': False})
+
+        watermark = get_watermark(self.resource)
+        if since < watermark:
+            return Response(
+                {'detail': 'Changes before this token have been compacted, reload the full list.', 'watermark': watermark},
+                status=status.HTTP_410_GONE,
+            )
+        changes, next_seq, has_more = get_changes(self.resource, since, limit)
+        return Response({'changes': changes, 'next': next_seq, 'has_more': has_more})
+
+
+'''KOMPAKTIERUNG'''
+# python manage.py compact_changes
+# 1. Pro Objekt bleibt nur der neueste Eintrag -> immer sicher, ein Client bekommt pro Objekt ohnehin nur den neuesten Stand
+# 2. Einträge älter als RETENTION_DAYS werden gelöscht, die Marke der Ressource wird auf die höchste gelöschte seq gesetzt
+# -> die Größe des Logs hängt von der Anzahl der geänderten Objekte im Aufbewahrungszeitraum ab, nicht von der Historie
+
+
+def compact(retention_days=RETENTION_DAYS, batch_size=10000):
+    # Gibt die Anzahl der gelöschten Einträge zurück: {'superseded': ..., 'expired': ...}
+    superseded = 0
+    newer = ChangeLogEntry.objects.filter(resource=OuterRef('resource'), object_id=OuterRef('object_id'), seq__gt=OuterRef('seq'))
+    bounds = ChangeLogEntry.objects.aggregate(first=Min('seq'), end=Max('seq'))
+    last = (bounds['first'] or 1) - 1
+    end = bounds['end'] or 0
+    # Batchweise über seq -> kurze Transaktionen, Writes der API müssen nicht lange warten
+    while last < end:
+        with transaction.atomic():
+            batch = ChangeLogEntry.objects.filter(seq__gt=last, seq__lte=last + batch_size)
+            superseded += batch.filter(Exists(newer))._raw_delete(batch.db)
+        last += batch_size
+
+    expired = 0
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    for resource in RESOURCE_MODELS:
+        old = ChangeLogEntry.objects.filter(resource=resource, created_at__lt=cutoff)
+        with transaction.atomic():
+            seq = old.aggregate(seq=Max('seq'))['seq']
+            if seq is None:
+                continue
+            # Erst die Marke, dann löschen -> ein Client sieht nie gelöschte Einträge ohne passende Marke
+            ChangeLogWatermark.objects.update_or_create(resource=resource, defaults={'seq': max(seq, get_watermark(resource))})
+            expired += old.filter(seq__lte=seq)._raw_delete(old.db)
+    return {'superseded': superseded, 'expired': expired}
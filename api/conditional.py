@@ -0,0 +1,104 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_media_type
+
+# Conditional GET mit ETag und Last-Modified
+# Clients, die eine Ressource regelmäßig abfragen, schicken die Validatoren der letzten Antwort mit (If-None-Match / If-Modified-Since)
+# Hat sich nichts geändert, antwortet der Server mit 304 Not Modified ohne Body
+#
+# Die Validatoren werden NICHT aus dem fertigen Body berechnet, sondern aus einer kleinen Aggregat-Query über die Daten:
+# MAX(updated_at) und COUNT(*) der (gefilterten) Zeilen, bei Blogs zusätzlich über die Kommentare
+# -> neue oder geänderte Zeilen ändern MAX(updated_at), gelöschte Zeilen ändern COUNT(*)
+# Bei einer 304-Antwort wird also weder das Queryset geladen noch serialisiert
+
+
+def get_state(queryset, related=()):
+    # Eine einzige Aggregat-Query -> z.B. SELECT MAX(updated_at), COUNT(DISTINCT id), MAX(comments.updated_at), COUNT(DISTINCT comments.id) ...
+    aggregates = {'count': Count('pk', distinct=bool(related)), 'last_modified': Max('updated_at')}
+    for name in related:
+        aggregates[f'{name}_count'] = Count(f'{name}__pk', distinct=True)
+        aggregates[f'{name}_last_modified'] = Max(f'{name}__updated_at')
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def get_validators(request, state):
+    # Der Query String (Filter, Pagination, ...) und der ausgehandelte Media Type (JSON oder Browsable API) gehören zur Repräsentation
+    # -> unterschiedliche URLs bekommen unterschiedliche ETags
+    fingerprint = ':'.join([request.get_full_path(), get_media_type(request)] + [
+        str(state[key]) for key in sorted(state)
+    ])
+    etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+    timestamps = [value for key, value in state.items() if key.endswith('last_modified') and value is not None]
+    last_modified = timegm(max(timestamps).utctimetuple()) if timestamps else None
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    if 200 <= response.status_code < 300:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def conditional_response(request, queryset, get_response, related=()):
+    # Nur GET und HEAD werden bedingt beantwortet
+    if request.method not in ('GET', 'HEAD'):
+        return get_response()
+
+    etag, last_modified = get_validators(request, get_state(queryset, related))
+
+    # Passt If-None-Match bzw. If-Modified-Since -> 304 Not Modified, get_response() wird gar nicht erst aufgerufen
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    return set_validators(get_response(), etag, last_modified)
+
+
+# Mixin für Generic Views und Viewsets -> list() und retrieve() werden bedingt beantwortet
+# conditional_related: Relationen, die in der Antwort mit ausgeliefert werden (z.B. die Kommentare eines Blogs)
+class ConditionalGetMixin:
+    conditional_related = ()
+
+    def get_conditional_queryset(self):
+        # Gleiche Filter wie die eigentliche Liste (Filter, Suche), aber ohne Annotationen und Prefetches aus get_queryset()
+        return self.filter_queryset(self.queryset.all())
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_conditional_queryset(),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+            self.conditional_related,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return conditional_response(
+            request, queryset,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+            self.conditional_related,
+        )
+
+
+# Decorator für Function Based Views -> muss unter @api_view stehen
+# Bei Detail-Views (mit pk oder einem anderen Feld aus lookup_fields in der URL) wird nur das eine Objekt betrachtet
+# Beispiel: @conditional_get(Student), @conditional_get(Student, lookup_fields=('pk', 'student_id'))
+def conditional_get(model, related=(), lookup_fields=('pk',)):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            queryset = model.objects.filter(**{
+                name: value for name, value in kwargs.items() if name in lookup_fields and value is not None
+            })
+            return conditional_response(request, queryset, lambda: view(request, *args, **kwargs), related)
+        return wrapper
+    return decorator
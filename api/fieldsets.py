@@ -0,0 +1,110 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+# Sparse Fieldsets: Der Client wählt die Felder der Antwort selbst aus
+# ?fields=id,blog_title   -> nur diese Felder
+# ?exclude=blog_body      -> alle Felder außer diesen (kombinierbar mit ?fields=)
+# Die Auswahl wird bis in die Datenbank durchgereicht: nicht angeforderte Spalten werden per only() gar nicht erst gelesen,
+# bei den Blogs entfällt ohne 'comments' der Prefetch der Kommentare (siehe BlogCommentsMixin)
+# Gilt nur für lesende Requests (GET/HEAD) -> bei POST/PUT/PATCH wird immer die vollständige Repräsentation zurückgegeben
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+_readable_fields = {}
+
+
+def get_readable_field_names(serializer_class):
+    # Reihenfolge wie im Serializer -> die Antwort behält diese Reihenfolge, egal in welcher Reihenfolge ?fields= angegeben wird
+    if serializer_class not in _readable_fields:
+        _readable_fields[serializer_class] = tuple(field.field_name for field in serializer_class()._readable_fields)
+    return _readable_fields[serializer_class]
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def get_fieldset(query_params, serializer_class):
+    # Liefert die ausgewählten Feldnamen als Tuple oder None, wenn weder ?fields= noch ?exclude= gesetzt ist
+    fields = query_params.get(FIELDS_PARAM)
+    exclude = query_params.get(EXCLUDE_PARAM)
+    if fields is None and exclude is None:
+        return None
+
+    available = get_readable_field_names(serializer_class)
+    requested = set(parse_names(fields)) if fields is not None else set(available)
+    excluded = set(parse_names(exclude or ''))
+    for param, names in ((FIELDS_PARAM, requested), (EXCLUDE_PARAM, excluded)):
+        unknown = names - set(available)
+        if unknown:
+            raise ValidationError({param: f'Unknown field(s): {", ".join(sorted(unknown))}. Available: {", ".join(available)}.'})
+
+    fieldset = tuple(name for name in available if name in requested and name not in excluded)
+    if not fieldset:
+        raise ValidationError({FIELDS_PARAM: 'At least one field must be selected.'})
+    return fieldset
+
+
+def trim_serializer(serializer, fieldset):
+    # Entfernt alle nicht ausgewählten Felder aus dem Serializer (bei many=True aus dem Child-Serializer)
+    if fieldset is not None:
+        target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+        for name in list(target.fields):
+            if name not in fieldset:
+                target.fields.pop(name)
+    return serializer
+
+
+def get_columns(model, serializer_class, fieldset):
+    # Model-Felder, die für die ausgewählten Serializer-Felder gelesen werden müssen (+ Primary Key)
+    # Felder ohne eigene Spalte (Annotationen, Reverse Relations wie comments) werden hier übersprungen
+    serializer_fields = serializer_class().fields
+    columns = [model._meta.pk.name]
+    for name in fieldset:
+        source = serializer_fields[name].source
+        try:
+            model_field = model._meta.get_field(source.split('.')[0])
+        except FieldDoesNotExist:
+            continue
+        if model_field.concrete and not model_field.many_to_many and model_field.name not in columns:
+            columns.append(model_field.name)
+    return columns
+
+
+def get_ordering_columns(queryset):
+    # Spalten aus order_by() -> die Keyset Pagination liest die Sortierspalte aus jedem Objekt, sie muss also mitgeladen werden
+    # Sortierungen über Relationen (z.B. search_index__rank) und Ausdrücke werden übersprungen
+    names = (name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str))
+    return [name for name in names if '__' not in name and name not in ('?', 'pk')]
+
+
+def project_queryset(queryset, serializer_class, fieldset):
+    # only() -> SELECT nur mit den benötigten Spalten, der Rest wird nicht aus der Datenbank gelesen
+    if fieldset is None:
+        return queryset
+    columns = get_columns(queryset.model, serializer_class, fieldset)
+    columns += [name for name in get_ordering_columns(queryset) if name not in columns]
+    return queryset.only(*columns)
+
+
+# Mixin für Generic Views und Viewsets
+# Die Projektion wird nach den Filtern angewendet (filter_queryset) -> die Sortierung aus ?order-by= ist dann bekannt
+class SparseFieldsetMixin:
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = None
+            if self.request.method in SAFE_METHODS:
+                self._fieldset = get_fieldset(self.request.query_params, self.get_serializer_class())
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        # Die Browsable API baut ihre Formulare mit einer Kopie des Requests (POST/PUT) -> diese bleiben vollständig
+        if self.request.method not in SAFE_METHODS:
+            return serializer
+        return trim_serializer(serializer, self.get_fieldset())
+
+    def filter_queryset(self, queryset):
+        return project_queryset(super().filter_queryset(queryset), self.get_serializer_class(), self.get_fieldset())
@@ -0,0 +1,239 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import django
+from django.db import connection, connections, transaction
+from rest_framework import serializers
+
+from blogs.serializers import BlogSerializer
+
+from .serializers import EmployeeSerializer, StudentSerializer, find_unique_conflicts, pop_unique_validators
+from .signals import bulk_saved
+
+'''BULK IMPORT'''
+# Große CSV- oder NDJSON-Dateien in die Datenbank laden (python manage.py import_data employees employees.csv)
+# 1. Lesen:       die Datei wird zeilenweise gelesen, nie komplett in den Speicher -> beliebig große Dateien
+# 2. Validieren:  jede Zeile läuft durch den Serializer der API (gleiche Regeln wie bei POST), batchweise in einem Worker Pool
+#                 process (Standard): echte Parallelität auf mehreren Kernen, die Validierung ist reine Python-Arbeit (GIL)
+#                 thread: für Serializer, deren Validatoren viele Queries machen -> warten parallel auf die DB
+#                 Eindeutige Felder (z.B. emp_id) prüfen nicht die Worker, sondern der Hauptprozess direkt vor dem Schreiben, mit einer
+#                 Query pro Batch -> auch Duplikate zwischen Batches, die gleichzeitig validiert werden, fallen auf
+# 3. Schreiben:   die gültigen Zeilen eines Batches werden mit bulk_create() in einer eigenen Transaktion geschrieben
+#                 + bulk_saved Signal (Cache-Invalidierung usw., siehe signals.py)
+# 4. Checkpoint:  nach jedem Batch wird gespeichert, wie viele Zeilen der Datei verarbeitet sind
+#                 -> nach einem Abbruch macht --resume an dieser Stelle weiter
+# Felder, die im Serializer read-only sind (z.B. id oder die Kommentare eines Blogs), werden ignoriert
+# -> ein Export (employees/export/?output=csv) kann direkt wieder importiert werden
+
+# Ressource -> Serializer (das Model kommt aus Meta.model)
+IMPORT_SERIALIZERS = {
+    'students': StudentSerializer,
+    'employees': EmployeeSerializer,
+    'blogs': BlogSerializer,
+}
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Dateiendung -> Format
+EXTENSIONS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+IMPORT_POOLS = ('process', 'thread')
+
+BATCH_SIZE = 1000
+
+# Ein Kern bleibt für das Lesen der Datei und die Writes im Hauptprozess -> auf einem Rechner mit einem Kern ohne Pool
+WORKERS = min(4, (os.cpu_count() or 1) - 1)
+
+
+def guess_format(path):
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def iter_records(file, import_format):
+    # NDJSON: die Zeilen werden roh weitergegeben, json.loads() läuft erst in den Workern
+    # CSV: der Reader muss sequentiell laufen (Werte in Anführungszeichen können Zeilenumbrüche enthalten)
+    if import_format == 'csv':
+        yield from csv.DictReader(file)
+    else:
+        for line in file:
+            if line.strip():
+                yield line
+
+
+def batched(records, size, skip=0):
+    # Batches von (Nummer des Datensatzes, Datensatz) -> die ersten skip Datensätze (bereits importiert) werden übersprungen
+    batch = []
+    for number, record in enumerate(records):
+        if number < skip:
+            continue
+        batch.append((number, record))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse(record):
+    if not isinstance(record, str):
+        return record
+    try:
+        data = json.loads(record)
+    except ValueError as error:
+        raise serializers.ValidationError({'non_field_errors': [f'Invalid JSON: {error}']})
+    if not isinstance(data, dict):
+        raise serializers.ValidationError({'non_field_errors': ['Expected a JSON object.']})
+    return data
+
+
+def validate_batch(serializer_class, batch):
+    # Läuft im Worker -> ein eigener Serializer pro Batch, nicht pro Zeile (das Anlegen der Felder kostet)
+    # Ergebnis: ([(Nummer, validierte Daten)], [(Nummer, Fehler)], Nummer des letzten Datensatzes)
+    serializer = serializer_class()
+    pop_unique_validators(serializer)
+    valid = []
+    errors = []
+    for number, record in batch:
+        try:
+            valid.append((number, serializer.run_validation(parse(record))))
+        except serializers.ValidationError as error:
+            errors.append((number, error.detail))
+    if threading.current_thread() is not threading.main_thread():
+        # Eigene Datenbankverbindung des Worker-Threads (z.B. für Validatoren mit Queries) wieder schließen
+        connection.close()
+    return valid, errors, batch[-1][0]
+
+
+def get_executor(pool, workers):
+    if pool == 'thread':
+        return ThreadPoolExecutor(workers)
+    # Die Worker-Prozesse dürfen keine offenen Datenbankverbindungen erben (fork) -> vorher schließen
+    # django.setup() als Initializer -> funktioniert auch mit den Startmethoden spawn/forkserver
+    connections.close_all()
+    return ProcessPoolExecutor(workers, initializer=django.setup)
+
+
+def map_ordered(executor, func, items, window):
+    # Wie executor.map(), aber mit höchstens window Aufträgen gleichzeitig -> die Datei wird nicht schneller gelesen als geschrieben
+    # Die Ergebnisse kommen in der Reihenfolge der Datei zurück (wichtig für den Checkpoint)
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+'''CHECKPOINT'''
+# JSON-Datei neben der Importdatei: {"source": ..., "resource": ..., "rows": verarbeitete Datensätze, "created": ..., "invalid": ...}
+# Wird erst nach dem Commit eines Batches geschrieben -> bricht der Import genau dazwischen ab, wird dieser eine Batch beim
+# Fortsetzen erneut importiert
+
+
+def default_checkpoint_path(path):
+    return f'{path}.checkpoint'
+
+
+def read_checkpoint(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path, state):
+    # Erst in eine temporäre Datei, dann umbenennen -> die Datei ist nie halb geschrieben
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+class ImportResult:
+    def __init__(self, rows=0, created=0, invalid=0, skipped=0):
+        self.rows = rows
+        self.created = created
+        self.invalid = invalid
+        self.skipped = skipped
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        # Nur die in diesem Lauf verarbeiteten Zeilen (ohne die per --resume übersprungenen)
+        elapsed = self.elapsed
+        return (self.rows - self.skipped) / elapsed if elapsed else 0.0
+
+
+def import_file(resource, path, import_format=None, batch_size=BATCH_SIZE, workers=WORKERS, pool='process', checkpoint=None,
+                resume=False, max_errors=None, on_error=None, log=None):
+    # Importiert die Datei und gibt ein ImportResult zurück
+    # workers=0 -> Validierung im aktuellen Thread (ohne Pool)
+    # max_errors: Abbruch (ValueError), sobald mehr ungültige Zeilen gefunden wurden; die bis dahin geschriebenen Batches bleiben
+    # on_error(nummer, fehler) wird für jede ungültige Zeile aufgerufen
+    serializer_class = IMPORT_SERIALIZERS[resource]
+    model = serializer_class.Meta.model
+    unique = pop_unique_validators(serializer_class())
+    import_format = import_format or guess_format(path)
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f'Unknown format for {path}, use one of: {", ".join(IMPORT_FORMATS)}.')
+    checkpoint = checkpoint or default_checkpoint_path(path)
+    log = log or (lambda result: None)
+    on_error = on_error or (lambda number, errors: None)
+
+    result = ImportResult()
+    state = read_checkpoint(checkpoint) if resume else None
+    if state is not None:
+        if state['source'] != os.path.abspath(path) or state['resource'] != resource:
+            raise ValueError(f'Checkpoint {checkpoint} belongs to {state["resource"]} from {state["source"]}.')
+        result = ImportResult(state['rows'], state['created'], state['invalid'], skipped=state['rows'])
+
+    # partial statt lambda -> kann an die Worker-Prozesse übergeben (gepickelt) werden
+    validate = partial(validate_batch, serializer_class)
+    executor = get_executor(pool, workers) if workers else None
+    # utf-8-sig -> ein BOM am Anfang der Datei (z.B. CSV aus Excel) landet nicht im ersten Spaltennamen
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            batches = batched(iter_records(file, import_format), batch_size, skip=result.rows)
+            validated = map_ordered(executor, validate, batches, workers * 2) if executor else map(validate, batches)
+            for valid, errors, last in validated:
+                if unique:
+                    conflicts = find_unique_conflicts(model, unique, [attrs for number, attrs in valid])
+                    errors = sorted(errors + [(valid[index][0], detail) for index, detail in conflicts.items()], key=lambda error: error[0])
+                    valid = [item for index, item in enumerate(valid) if index not in conflicts]
+                for number, detail in errors:
+                    on_error(number, detail)
+                if valid:
+                    with transaction.atomic():
+                        objs = model.objects.bulk_create([model(**attrs) for number, attrs in valid])
+                    bulk_saved.send(sender=model, instances=objs, created=True)
+
+                result.rows = last + 1
+                result.created += len(valid)
+                result.invalid += len(errors)
+                write_checkpoint(checkpoint, {
+                    'source': os.path.abspath(path), 'resource': resource,
+                    'rows': result.rows, 'created': result.created, 'invalid': result.invalid,
+                })
+                log(result)
+                if max_errors is not None and result.invalid > max_errors:
+                    raise ValueError(f'More than {max_errors} invalid rows, stopped after row {result.rows}. Resume with --resume.')
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # Fertig -> der Checkpoint wird nicht mehr gebraucht
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return result
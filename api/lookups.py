@@ -0,0 +1,67 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .conditional import conditional_response
+from .fieldsets import get_fieldset, trim_serializer
+from .serializers import get_values_list_representation
+
+'''LOOKUP ÜBER DEN FACHLICHEN SCHLÜSSEL'''
+# Clients kennen Employees über die emp_id und Students über die student_id, nicht über den Primary Key
+# Vorher: ?emp_id= bzw. ?q= über die Liste -> Filter, Pagination und COUNT, nur um eine Zeile zu finden
+# Beide Spalten haben einen Unique Index -> ein Index-Lookup, höchstens eine Zeile:
+#   GET /api/v1/employees/by-emp-id/EMP001/           -> wie /employees/<pk>/ (auch PUT/PATCH/DELETE)
+#   GET /api/v1/students/by-student-id/S001/          -> wie /students/<pk>/ (auch PUT/DELETE)
+# Batch: viele Schlüssel mit einer einzigen Query (WHERE emp_id IN (...)) statt eines Requests pro Schlüssel
+#   GET /api/v1/employees/by-emp-id/?ids=EMP001,EMP002,EMP999
+#   -> {"results": [{...EMP001...}, {...EMP002...}], "missing": ["EMP999"]}
+# Reihenfolge wie in ?ids=, doppelte Schlüssel kommen nur einmal. ?fields= / ?exclude= funktionieren wie bei der Liste
+
+KEYS_PARAM = 'ids'
+
+# Höchstens so viele Schlüssel pro Request -> die Query bleibt unter dem Limit der Datenbank für Parameter
+MAX_KEYS = 1000
+
+
+def parse_keys(request):
+    # ?ids=EMP001,EMP002 oder ?ids=EMP001&ids=EMP002 -> ['EMP001', 'EMP002']
+    keys = {}
+    for value in request.query_params.getlist(KEYS_PARAM):
+        for key in value.split(','):
+            key = key.strip()
+            if key:
+                keys[key] = None
+    if not keys:
+        raise ValidationError({KEYS_PARAM: 'Provide a comma-separated list of keys.'})
+    if len(keys) > MAX_KEYS:
+        raise ValidationError({KEYS_PARAM: f'At most {MAX_KEYS} keys per request.'})
+    return list(keys)
+
+
+def lookup_by_keys(queryset, field, keys, serializer_class, fieldset=None):
+    # -> ([Repräsentationen in der Reihenfolge von keys], [nicht gefundene Schlüssel])
+    queryset = queryset.filter(**{f'{field}__in': keys}).order_by()
+    representation = get_values_list_representation(serializer_class, fieldset)
+    if representation is not None:
+        # Read-only Fast Path wie bei der Liste -> der Schlüssel wird als letzte Spalte mitgelesen, auch wenn ?fields= ihn weglässt
+        # (to_representation() ignoriert Spalten ohne Namen)
+        columns = representation.columns + (() if field in representation.columns else (field,))
+        position = columns.index(field)
+        to_representation = representation.bind()
+        found = {row[position]: to_representation(row) for row in queryset.values_list(*columns)}
+    else:
+        # Serializer ohne Fast Path -> normale Serialisierung der Model-Objekte
+        objects = {getattr(obj, field): obj for obj in queryset}
+        data = trim_serializer(serializer_class(list(objects.values()), many=True), fieldset).data
+        found = dict(zip(objects, data))
+    return [found[key] for key in keys if key in found], [key for key in keys if key not in found]
+
+
+def keys_response(request, queryset, field, serializer_class):
+    # ETag/Last-Modified nur über die angefragten Zeilen -> ein neuer Treffer oder ein gelöschter Schlüssel ändert die Validatoren
+    keys = parse_keys(request)
+    fieldset = get_fieldset(request.query_params, serializer_class)
+
+    def get_response():
+        results, missing = lookup_by_keys(queryset, field, keys, serializer_class, fieldset)
+        return Response({'results': results, 'missing': missing})
+    return conditional_response(request, queryset.filter(**{f'{field}__in': keys}), get_response)
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import compare, run_benchmark
+
+
+# python manage.py seed_data --employees 1000000 --blogs 100000
+# python manage.py benchmark_api --output before.json
+# python manage.py benchmark_api --output after.json --compare before.json
+# Ruft alle GET-Routen aus api/urls.py (plus einige Filter-/Pagination-Szenarien) in-process auf, siehe api/benchmarking.py
+class Command(BaseCommand):
+    help = 'Benchmarks every API route in-process and reports latency percentiles, throughput, queries and peak memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Requests per scenario.')
+        parser.add_argument('--route', action='append', help='Only benchmark this route name (can be repeated).')
+        parser.add_argument('--cache', action='store_true', help='Keep the response cache enabled.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--compare', help='JSON file of a previous run to compare p95 latencies against.')
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    previous = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Cannot read {options["compare"]}: {error}')
+
+        self.stdout.write(
+            f'{"route":<28} {"params":<40} {"status":>6} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"req/s":>8} {"queries":>7} {"peak KiB":>9}'
+        )
+        report = run_benchmark(iterations=options['iterations'], use_cache=options['cache'], only=options['route'], log=self.write_result)
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+        if previous is not None:
+            self.stdout.write(f'\np95 compared to {options["compare"]}:')
+            for route, params, before, after, ratio in compare(previous, report):
+                style = self.style.ERROR if ratio > 1.1 else self.style.SUCCESS if ratio < 0.9 else str
+                self.stdout.write(style(f'{route:<28} {json.dumps(params, ensure_ascii=False):<40} {before:9.2f} -> {after:9.2f} ms  ({ratio:.2f}x)'))
+
+    def write_result(self, result):
+        self.stdout.write(
+            f'{result["route"]:<28} {json.dumps(result["params"], ensure_ascii=False):<40} {result["status"]:>6} {result["p50_ms"]:>9.2f} '
+            f'{result["p95_ms"]:>9.2f} {result["p99_ms"]:>9.2f} {result["requests_per_second"]:>8} {result["queries"]:>7} '
+            f'{result["peak_memory_kb"]:>9}'
+        )
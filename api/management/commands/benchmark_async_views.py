@@ -0,0 +1,101 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+
+from blogs.models import Blog, Comment
+from employees.models import Employee
+from students.models import Student
+
+
+# python manage.py migrate && python manage.py benchmark_async_views --requests 400 --concurrency 20
+# Vergleicht die Latenz bei gleichzeitigen Requests:
+# wsgi       -> DRF-Views über den WSGI-Handler, ein Thread pro gleichzeitigem Request (wie ein Server mit Worker-Threads)
+# asgi-sync  -> DRF-Views über den ASGI-Handler -> jeder Request wird per sync_to_async in einen Thread geschickt
+# asgi-async -> async Views (api/async_views.py) über den ASGI-Handler -> laufen im Event Loop
+# Die Testdaten werden in die konfigurierte Datenbank geschrieben (die Threads müssen sie sehen können) und am Ende wieder gelöscht
+# Der Response Cache ist abgeschaltet, damit jeder Request wirklich die Datenbank abfragt
+# Hinweis: /api/v1/employees/ benutzt die CustomPagination (?page_size=) und ignoriert ?limit=
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent requests against the sync DRF views (WSGI and ASGI) and the async views.'
+
+    resources = ('students', 'employees', 'blogs', 'comments')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help='Number of requests per resource and mode.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Number of requests in flight at the same time.')
+        parser.add_argument('--rows', type=int, default=500, help='Number of rows to create per model.')
+        parser.add_argument('--limit', type=int, default=50, help='Page size (?limit=) of the list requests.')
+
+    def handle(self, *args, **options):
+        created = self.seed(options['rows'])
+        try:
+            # ALLOWED_HOSTS -> die Test-Clients schicken den Host 'testserver'
+            with override_settings(API_CACHE={'ENABLED': False}, ALLOWED_HOSTS=['testserver']):
+                for resource in self.resources:
+                    for mode, run in (('wsgi', self.run_wsgi), ('asgi-sync', self.run_asgi), ('asgi-async', self.run_asgi)):
+                        prefix = '/api/v1/async/' if mode == 'asgi-async' else '/api/v1/'
+                        path = f'{prefix}{resource}/?limit={options["limit"]}'
+                        started = time.perf_counter()
+                        latencies = run(path, options['requests'], options['concurrency'])
+                        elapsed = time.perf_counter() - started
+                        self.report(resource, mode, latencies, elapsed)
+        finally:
+            for model, pks in created:
+                model.objects.filter(pk__in=pks).delete()
+
+    def seed(self, rows):
+        students = Student.objects.bulk_create(
+            Student(student_id=f'B{i:07}', name=f'Student {i}', branch='Benchmark') for i in range(rows)
+        )
+        employees = Employee.objects.bulk_create(
+            Employee(emp_id=f'BENCH{i:07}', emp_name=f'Employee {i}', designation='Benchmark') for i in range(rows)
+        )
+        blogs = Blog.objects.bulk_create(Blog(blog_title=f'Benchmark {i}', blog_body='Lorem ipsum ' * 20) for i in range(rows))
+        comments = Comment.objects.bulk_create(Comment(blog=blog, comment=f'Kommentar {j}') for blog in blogs for j in range(3))
+        return [
+            (Comment, [comment.pk for comment in comments]),
+            (Blog, [blog.pk for blog in blogs]),
+            (Employee, [employee.pk for employee in employees]),
+            (Student, [student.pk for student in students]),
+        ]
+
+    def run_wsgi(self, path, requests, concurrency):
+        def request(_):
+            started = time.perf_counter()
+            response = Client().get(path)
+            assert response.status_code == 200, response.status_code
+            latency = time.perf_counter() - started
+            # Verbindung des Worker-Threads schließen -> sonst bleibt sie nach dem Benchmark offen
+            connection.close()
+            return latency
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(request, range(requests)))
+
+    def run_asgi(self, path, requests, concurrency):
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    assert response.status_code == 200, response.status_code
+                    return time.perf_counter() - started
+
+            return await asyncio.gather(*(request() for _ in range(requests)))
+
+        return asyncio.run(main())
+
+    def report(self, resource, mode, latencies, elapsed):
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{resource:<10} {mode:<11} {len(latencies) / elapsed:8.0f} req/s  '
+            f'p50 {quantiles[49] * 1000:7.1f} ms  p95 {quantiles[94] * 1000:7.1f} ms  p99 {quantiles[98] * 1000:7.1f} ms'
+        )
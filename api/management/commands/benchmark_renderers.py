@@ -0,0 +1,60 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.cache import get_cache
+from api.renderers import FastJSONRenderer, is_fast_path_supported
+from api.serializers import EmployeeSerializer
+from blogs.models import Blog, Comment
+from employees.models import Employee
+
+
+# python manage.py benchmark_renderers --rows 2000
+# Microbenchmark: JSONRenderer von DRF vs. FastJSONRenderer auf den Daten von /api/v1/employees/ und /api/v1/blogs/
+# Die Testdaten werden innerhalb einer Transaktion angelegt und am Ende wieder zurückgerollt
+class Command(BaseCommand):
+    help = 'Benchmarks JSONRenderer against FastJSONRenderer on employee and blog list payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Number of employees and blogs to create.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        rng = random.Random(0)
+        self.stdout.write(f"Fast path: {'orjson' if is_fast_path_supported() else 'json (fallback)'}")
+
+        with transaction.atomic():
+            # emp_id ist eindeutig -> eigenes Präfix, damit es keine Konflikte mit vorhandenen Employees gibt
+            Employee.objects.bulk_create(
+                Employee(emp_id=f'RENDER{i:07}', emp_name=f'Mitarbeiter {i}', designation=rng.choice(['Manager', 'Entwickler']))
+                for i in range(rows)
+            )
+            blogs = Blog.objects.bulk_create(Blog(blog_title=f'Blog {i}', blog_body='Lorem ipsum ' * 50) for i in range(rows))
+            Comment.objects.bulk_create(
+                Comment(blog=blog, comment=f'Kommentar {j} zu {blog.blog_title}') for blog in blogs for j in range(rng.randint(0, 5))
+            )
+            get_cache().clear()
+
+            client = APIClient(HTTP_HOST='localhost')
+            payloads = {
+                # Die Employee-Liste ist auf 2 Einträge pro Seite begrenzt -> die Daten der kompletten Liste direkt serialisieren
+                '/api/v1/employees/': EmployeeSerializer(Employee.objects.all(), many=True).data,
+                '/api/v1/blogs/': client.get('/api/v1/blogs/', {'limit': rows}).data,
+            }
+
+            for url, data in payloads.items():
+                expected = JSONRenderer().render(data)
+                assert FastJSONRenderer().render(data) == expected, f'Output differs for {url}'
+                for renderer in (JSONRenderer(), FastJSONRenderer()):
+                    seconds = min(timeit.repeat(lambda: renderer.render(data), number=1, repeat=options['repeat']))
+                    self.stdout.write(
+                        f'{url:<22} {renderer.__class__.__name__:<18} {seconds * 1000:8.2f} ms  '
+                        f'({len(expected) / 1024 / 1024 / seconds:7.1f} MB/s)'
+                    )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,127 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+
+# python manage.py benchmark_sqlite_concurrency --readers 8 --writers 2 --seconds 5
+# Lasttest mit mehreren Threads, die gleichzeitig lesen und schreiben (wie Worker-Threads eines Servers)
+# Verglichen werden zwei Profile auf einer temporären Datenbank-Datei (die echte db.sqlite3 wird nicht angefasst):
+# 'default'    -> Django ohne Anpassungen: Rollback Journal, DEFERRED Transaktionen, neue Verbindung für jeden "Request", timeout 5 s
+# 'configured' -> DATABASES['default'] aus den Settings, nur mit anderem NAME (bei SQLITE_PROFILE=tuned: init_command mit den Pragmas,
+#                 transaction_mode IMMEDIATE, timeout, CONN_MAX_AGE)
+# Beide laufen über die Datenbankverbindungen von Django (connections, transaction.atomic) -> gemessen wird genau das,
+# was die Settings konfigurieren. Nach jeder Operation wird wie am Ende eines Requests close_if_unusable_or_obsolete() aufgerufen
+class Command(BaseCommand):
+    help = 'Runs a concurrent read/write load test against the default and the configured SQLite settings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Number of reading threads.')
+        parser.add_argument('--writers', type=int, default=2, help='Number of writing threads.')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run.')
+        parser.add_argument('--rows', type=int, default=20000, help='Number of employees in the test table.')
+
+    def handle(self, *args, **options):
+        profiles = {
+            'default': {'ENGINE': 'django.db.backends.sqlite3'},
+            'configured': {**settings.DATABASES['default']},
+        }
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, database in profiles.items():
+                alias = f'benchmark_{name}'
+                # Eigener Alias für die temporäre Datei -> connections[alias] liefert wie bei 'default' eine Verbindung pro Thread
+                # configure_settings() ergänzt fehlende Schlüssel mit den Defaults von Django (verlangt dafür einen Eintrag 'default')
+                connections.settings[alias] = connections.configure_settings(
+                    {'default': {**database, 'NAME': str(Path(directory) / f'{name}.sqlite3')}}
+                )['default']
+                try:
+                    self.seed(alias, options['rows'])
+                    results[name] = LoadTest(alias, options).run()
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+                self.stdout.write(
+                    f"{name:<10} reads {results[name]['reads'] / options['seconds']:9.0f}/s  "
+                    f"writes {results[name]['writes'] / options['seconds']:7.0f}/s  "
+                    f"locked errors {results[name]['errors']}"
+                )
+
+        default, configured = results['default'], results['configured']
+        total = lambda result: result['reads'] + result['writes']
+        self.stdout.write(self.style.SUCCESS(
+            f'throughput (SQLITE_PROFILE={settings.SQLITE_PROFILE}): {total(configured) / max(total(default), 1):.1f}x'
+        ))
+
+    def seed(self, alias, rows):
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE employee (id INTEGER PRIMARY KEY, emp_id TEXT, emp_name TEXT, designation TEXT, updated_at REAL)'
+            )
+            cursor.execute('CREATE INDEX employee_designation ON employee (designation)')
+            cursor.executemany(
+                'INSERT INTO employee (emp_id, emp_name, designation, updated_at) VALUES (%s, %s, %s, %s)',
+                [(f'EMP{i:07}', f'Employee {i}', ('Manager', 'Developer', 'Tester')[i % 3], time.time()) for i in range(rows)],
+            )
+
+
+class LoadTest:
+    def __init__(self, alias, options):
+        self.alias = alias
+        self.options = options
+        self.counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def worker(self, operation, counter):
+        # connections[alias] ist pro Thread eine eigene Verbindung (wie bei Worker-Threads eines Servers)
+        connection = connections[self.alias]
+        done = errors = 0
+        try:
+            while not self.stop.is_set():
+                try:
+                    operation(connection, done)
+                    done += 1
+                except OperationalError:
+                    errors += 1
+                finally:
+                    # Ende des "Requests" -> mit CONN_MAX_AGE=0 wird die Verbindung geschlossen, sonst wiederverwendet
+                    connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+        with self.lock:
+            self.counts[counter] += done
+            self.counts['errors'] += errors
+
+    def read(self, connection, i):
+        # wie GET /api/v1/employees/?designation=... -> COUNT für die Pagination plus eine Seite
+        designation = ('Manager', 'Developer', 'Tester')[i % 3]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM employee WHERE designation = %s', [designation])
+            cursor.fetchone()
+            cursor.execute(
+                'SELECT id, emp_id, emp_name, designation FROM employee WHERE designation = %s ORDER BY id LIMIT 20 OFFSET %s',
+                [designation, (i * 20) % 1000],
+            )
+            cursor.fetchall()
+
+    def write(self, connection, i):
+        # wie PUT /api/v1/employees/<pk>/ -> kleine Transaktion mit einem UPDATE
+        # transaction.atomic() -> BEGIN bzw. BEGIN IMMEDIATE, je nach transaction_mode in den Settings
+        with transaction.atomic(using=self.alias), connection.cursor() as cursor:
+            cursor.execute('UPDATE employee SET emp_name = %s, updated_at = %s WHERE id = %s', [f'Updated {i}', time.time(), i % 1000 + 1])
+
+    def run(self):
+        threads = [threading.Thread(target=self.worker, args=(self.read, 'reads')) for _ in range(self.options['readers'])]
+        threads += [threading.Thread(target=self.worker, args=(self.write, 'writes')) for _ in range(self.options['writers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(self.options['seconds'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return self.counts
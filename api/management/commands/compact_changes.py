@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.changes import RETENTION_DAYS, compact
+
+
+# python manage.py compact_changes             -> z.B. täglich per Cron
+# python manage.py compact_changes --days 7
+# Kürzt das Change Log des Delta-Syncs (siehe api/changes.py): pro Objekt bleibt nur der neueste Eintrag,
+# Einträge älter als --days werden gelöscht (Clients mit älterem ?since= bekommen 410 und laden die Liste neu)
+class Command(BaseCommand):
+    help = 'Compacts the change log: keeps the latest entry per object and drops entries older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RETENTION_DAYS, help='Retention period in days.')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Sequence numbers per delete transaction.')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--days must not be negative and --batch-size must be at least 1.')
+        started = time.perf_counter()
+        deleted = compact(retention_days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {deleted["superseded"]} superseded and {deleted["expired"]} expired entries '
+            f'in {time.perf_counter() - started:.1f} s'
+        ))
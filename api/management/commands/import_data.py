@@ -0,0 +1,78 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importing import BATCH_SIZE, IMPORT_FORMATS, IMPORT_POOLS, IMPORT_SERIALIZERS, WORKERS, default_checkpoint_path, import_file
+
+
+# python manage.py import_data employees employees.csv
+# python manage.py import_data blogs blogs.ndjson --workers 8 --batch-size 5000 --errors invalid.ndjson
+# python manage.py import_data students students.csv --pool thread
+# python manage.py import_data blogs blogs.ndjson --resume   -> nach einem Abbruch ab dem letzten Checkpoint weitermachen
+# Lädt große CSV- oder NDJSON-Dateien über die Serializer der API in die Datenbank, siehe api/importing.py
+class Command(BaseCommand):
+    help = 'Imports students, employees or blogs from a CSV or NDJSON file in batches (streaming, resumable).'
+
+    # Höchstens so viele ungültige Zeilen werden ausgegeben, der Rest landet nur in --errors
+    printed_errors = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(IMPORT_SERIALIZERS))
+        parser.add_argument('path', help='CSV or NDJSON file.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='File format (default: from the file extension).')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per validation batch and transaction.')
+        parser.add_argument('--workers', type=int, default=WORKERS, help='Workers for parsing and validation (0 = no pool).')
+        parser.add_argument('--pool', choices=IMPORT_POOLS, default='process', help='Run the workers as processes or threads.')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint).')
+        parser.add_argument('--resume', action='store_true', help='Continue after the rows recorded in the checkpoint.')
+        parser.add_argument('--max-errors', type=int, help='Stop when more rows than this are invalid.')
+        parser.add_argument('--errors', help='Write the invalid rows with their errors as NDJSON to this file.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 0:
+            raise CommandError('--batch-size must be at least 1 and --workers must not be negative.')
+
+        self.error_file = open(options['errors'], 'a') if options['errors'] else None
+        self.error_count = 0
+        self.last_log = 0
+        checkpoint = options['checkpoint'] or default_checkpoint_path(options['path'])
+        try:
+            result = import_file(
+                options['resource'], options['path'],
+                import_format=options['format'],
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                pool=options['pool'],
+                checkpoint=checkpoint,
+                resume=options['resume'],
+                max_errors=options['max_errors'],
+                on_error=self.write_error,
+                log=self.write_progress,
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        finally:
+            if self.error_file is not None:
+                self.error_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} {options["resource"]} from {result.rows} rows ({result.invalid} invalid'
+            f'{f", {result.skipped} skipped by --resume" if result.skipped else ""}) '
+            f'in {result.elapsed:.1f} s, {result.rows_per_second:.0f} rows/s'
+        ))
+
+    def write_progress(self, result):
+        # Höchstens einmal pro Sekunde
+        now = time.perf_counter()
+        if now - self.last_log >= 1:
+            self.last_log = now
+            self.stdout.write(f'{result.rows} rows, {result.created} created, {result.invalid} invalid, {result.rows_per_second:.0f} rows/s')
+
+    def write_error(self, number, errors):
+        # number zählt ab 0 -> Ausgabe als Datenzeile ab 1 (ohne CSV-Kopfzeile)
+        self.error_count += 1
+        if self.error_count <= self.printed_errors:
+            self.stderr.write(f'Row {number + 1}: {json.dumps(errors)}')
+        if self.error_file is not None:
+            self.error_file.write(json.dumps({'row': number + 1, 'errors': errors}) + '\n')
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.cache import invalidate_model
+from employees.facets import install_designation_facets, rebuild_facets
+from employees.models import Employee
+
+
+# python manage.py rebuild_facets   -> DesignationFacet aus den Employees neu berechnen
+# Normalerweise nicht nötig (die Trigger halten die Facetten aktuell, siehe employees/facets.py), aber z.B. nach Änderungen direkt per SQL
+class Command(BaseCommand):
+    help = 'Recomputes the designation facet counts of the employees.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        # Fehlende oder veraltete Trigger gleich mit reparieren
+        install_designation_facets(connection)
+        designations = rebuild_facets()
+        # Der Neuaufbau verschickt keine Signals -> der Response Cache wird direkt invalidiert
+        invalidate_model(Employee)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the facets of {designations} designations in {time.perf_counter() - started:.1f} s'
+        ))
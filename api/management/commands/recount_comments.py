@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.cache import invalidate_model
+from blogs.counters import install_comment_counter, recount_comments
+from blogs.models import Blog
+
+
+# python manage.py recount_comments --dry-run   -> nur zählen, wie viele Blogs eine falsche Kommentaranzahl haben
+# python manage.py recount_comments             -> Blog.comment_count für alle abweichenden Blogs neu berechnen
+# python manage.py recount_comments --blog 1 --blog 2
+# Normalerweise nicht nötig (die Trigger halten die Zähler aktuell, siehe blogs/counters.py), aber z.B. nach Änderungen direkt per SQL
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized Blog.comment_count from the comments in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blog', type=int, action='append', help='Only recount this blog id (can be repeated).')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Blogs per UPDATE.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many blogs have a wrong count.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        queryset = Blog.objects.all()
+        if options['blog']:
+            queryset = queryset.filter(pk__in=options['blog'])
+
+        started = time.perf_counter()
+        if not options['dry_run']:
+            # Fehlende Trigger (z.B. nach einer Migration, die blogs_comment neu anlegt) gleich mit reparieren
+            install_comment_counter(connection)
+        wrong = recount_comments(queryset, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        if options['dry_run']:
+            self.stdout.write(f'{wrong} blogs have a wrong comment_count ({elapsed:.1f} s)')
+            return
+        if wrong:
+            # Die Korrektur läuft per queryset.update() -> keine Signals, der Response Cache wird direkt invalidiert
+            invalidate_model(Blog)
+        self.stdout.write(self.style.SUCCESS(f'Fixed comment_count of {wrong} blogs in {elapsed:.1f} s'))
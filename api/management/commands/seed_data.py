@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import BATCH_SIZE, seed
+
+
+# python manage.py seed_data --employees 1000000 --blogs 100000
+# Legt deterministische Testdaten für die Benchmarks an (siehe api/benchmarking.py)
+# Mehrfach ausführen hängt weitere Daten an, mit --seed bekommt man andere (aber wieder reproduzierbare) Daten
+class Command(BaseCommand):
+    help = 'Seeds deterministic synthetic students, employees, blogs and comments for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=0)
+        parser.add_argument('--employees', type=int, default=0)
+        parser.add_argument('--blogs', type=int, default=0)
+        parser.add_argument('--comments-mean', type=float, default=5, help='Average number of comments per blog.')
+        parser.add_argument('--comments-skew', type=float, default=1.5, help='Pareto shape; smaller values give a more skewed distribution.')
+        parser.add_argument('--comments-max', type=int, default=5000, help='Maximum number of comments per blog.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        # Pareto-Verteilung nur mit skew > 1 -> sonst ist der Mittelwert unendlich (siehe comment_counts)
+        if options['comments_skew'] <= 1:
+            raise CommandError('--comments-skew must be greater than 1.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        started = time.perf_counter()
+        counts = seed(
+            students=options['students'],
+            employees=options['employees'],
+            blogs=options['blogs'],
+            comments_mean=options['comments_mean'],
+            comments_skew=options['comments_skew'],
+            comments_max=options['comments_max'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary} in {elapsed:.1f} s'))
@@ -0,0 +1,142 @@
+import cProfile
+import logging
+import random
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from . import profiling
+
+slow_query_logger = logging.getLogger('api.slow_queries')
+logger = logging.getLogger('api.profiling')
+
+
+# Profiling Middleware (opt-in) -> in settings.py über API_PROFILING = {'ENABLED': True, ...} bzw. API_PROFILING=1 einschalten
+# Misst pro Request, wie viel Zeit auf SQL, Filter, Serialisierung und Rendering entfällt, und schickt das als Server-Timing Header mit
+# (wird z.B. in den DevTools des Browsers unter "Timing" angezeigt):
+#   Server-Timing: db;dur=12.4;desc="7 queries", filter;dur=0.8, serialize;dur=20.1, render;dur=3.2, total;dur=41.0
+# Zusätzlich:
+# - Slow Query Log: Queries über SLOW_QUERY_MS werden mit ihrem EXPLAIN-Plan in den Logger 'api.slow_queries' geschrieben
+# - cProfile: für die Routen aus PROFILE_ROUTES wird ein Teil der Requests (PROFILE_SAMPLE_RATE) komplett profiliert,
+#   die .prof-Dateien landen in PROFILE_DIR (ansehen z.B. mit python -m pstats oder snakeviz)
+# Ausgeschaltet wirft die Middleware MiddlewareNotUsed -> Django entfernt sie beim Start aus der Kette, es entstehen keine Kosten
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not profiling.get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_query_seconds = profiling.get_setting('SLOW_QUERY_MS') / 1000
+        self.explain = profiling.get_setting('EXPLAIN')
+        self.profile_routes = set(profiling.get_setting('PROFILE_ROUTES'))
+        self.sample_rate = profiling.get_setting('PROFILE_SAMPLE_RATE')
+        self.profile_dir = Path(profiling.get_setting('PROFILE_DIR'))
+        profiling.instrument()
+
+    def __call__(self, request):
+        profile, token = profiling.start()
+        request.profile = profile
+        profiler = self.get_profiler(request)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # execute_wrapper misst jede Query -> für alle Datenbankverbindungen des aktuellen Threads
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(QueryTimer(profile, connection.alias, self.slow_query_seconds)))
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            profiling.stop(token)
+
+        profile.add('total', time.perf_counter() - started)
+        response['Server-Timing'] = self.server_timing(profile)
+        if profiler is not None:
+            self.dump(profiler, request)
+        if profile.slow_queries:
+            self.log_slow_queries(request, profile.slow_queries)
+        return response
+
+    def process_template_response(self, request, response):
+        # Wird direkt vor response.render() aufgerufen (DRF Response ist eine TemplateResponse)
+        # -> Start der Render-Phase, das Ende kommt über den Post-Render-Callback
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda response: profile.add('render', time.perf_counter() - started))
+        return response
+
+    def server_timing(self, profile):
+        metrics = []
+        for phase in ('db', 'filter', 'serialize', 'render', 'total'):
+            if phase not in profile.phases:
+                continue
+            metric = f'{phase};dur={profile.phases[phase] * 1000:.1f}'
+            if phase == 'db':
+                metric += f';desc="{profile.counts[phase]} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def get_profiler(self, request):
+        if not self.profile_routes or random.random() >= self.sample_rate:
+            return None
+        try:
+            route = resolve(request.path_info).url_name
+        except Resolver404:
+            return None
+        if route not in self.profile_routes:
+            return None
+        request.profile_route = route
+        return cProfile.Profile()
+
+    def dump(self, profiler, request):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f'{request.profile_route}-{time.strftime("%Y%m%d-%H%M%S")}-{random.randrange(16 ** 6):06x}.prof'
+        profiler.dump_stats(path)
+        logger.info('cProfile of %s %s written to %s', request.method, request.get_full_path(), path)
+
+    def log_slow_queries(self, request, slow_queries):
+        # EXPLAIN erst nach dem Request -> nicht innerhalb des execute_wrapper, dort ist der Cursor der eigentlichen Query noch offen
+        for alias, sql, params, seconds in slow_queries:
+            plan = self.get_plan(alias, sql, params) if self.explain else None
+            slow_query_logger.warning(
+                'Slow query (%.1f ms) during %s %s: %s; params=%r%s',
+                seconds * 1000, request.method, request.get_full_path(), sql, params,
+                f'\nplan:\n{plan}' if plan else '',
+            )
+
+    def get_plan(self, alias, sql, params):
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+        except Exception as error:
+            return f'(EXPLAIN failed: {error})'
+
+
+# execute_wrapper: wird um jede Query gelegt, die über die Verbindung läuft
+class QueryTimer:
+    def __init__(self, profile, alias, slow_query_seconds):
+        self.profile = profile
+        self.alias = alias
+        self.slow_query_seconds = slow_query_seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            self.profile.add('db', seconds)
+            if seconds >= self.slow_query_seconds and not many:
+                self.profile.slow_queries.append((self.alias, sql, params, seconds))
@@ -1,3 +1,42 @@
 from django.db import models
 
 # Create your models here.
+
+
+# Change Log für die Delta-Synchronisation (siehe api/changes.py)
+# Jede Änderung an Students, Employees, Blogs und Kommentaren wird mit einer fortlaufenden Nummer (seq) festgehalten
+# Gelöschte Objekte bleiben als Tombstone (action='delete') im Log -> Clients erfahren auch von Löschungen
+class ChangeLogEntry(models.Model):
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = [(CREATE, 'Create'), (UPDATE, 'Update'), (DELETE, 'Delete')]
+
+    # AutoField -> auf SQLite mit AUTOINCREMENT, Nummern werden also auch nach dem Löschen (Kompaktierung) nie wiederverwendet
+    seq = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Feed einer Ressource: WHERE resource = ... AND seq > ... ORDER BY seq -> Range-Scan über diesen Index
+        # Kompaktierung: neuester Eintrag pro Objekt -> (resource, object_id, seq)
+        indexes = [
+            models.Index(fields=['resource', 'seq'], name='changelog_resource_seq_idx'),
+            models.Index(fields=['resource', 'object_id', 'seq'], name='changelog_object_seq_idx'),
+            models.Index(fields=['created_at'], name='changelog_created_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.seq} {self.action} {self.resource}/{self.object_id}'
+
+
+# Bis zu welcher Nummer das Log einer Ressource gekürzt wurde (python manage.py compact_changes)
+# Ein Client mit ?since= unterhalb dieser Marke hat Änderungen verpasst -> 410 Gone, er muss die Liste komplett neu laden
+class ChangeLogWatermark(models.Model):
+    resource = models.CharField(max_length=20, primary_key=True)
+    seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.resource}: {self.seq}'
@@ -1,18 +1,428 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.paginator import InvalidPage, Page
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination, PageNumberPagination
 from rest_framework.response import Response
 
+from .cache import get_cache, get_versions
+from .cache import get_setting as get_cache_setting
+
+'''GESAMTANZAHL'''
+# LimitOffsetPagination und PageNumberPagination führen auf jeder Seite ein COUNT(*) über alle gefilterten Zeilen aus
+# Bei einer gefilterten Liste kostet das COUNT genauso viel wie die Seite selbst -> CountMixin macht die Gesamtanzahl billig:
+# 1. Cache: die Anzahl wird pro Filter-Kombination gecacht (Key: SQL der gefilterten Query ohne Sortierung und Spaltenauswahl + Versionen
+#    der Models wie beim Response Cache) -> weitere Seiten und andere Sortierungen zählen nicht erneut, jeder Write invalidiert (signals.py)
+# 2. Schwelle: gezählt wird höchstens bis COUNT_THRESHOLD (SELECT COUNT(*) FROM (... LIMIT COUNT_THRESHOLD + 1)) -> die Kosten sind begrenzt
+#    Liegt die Anzahl darüber, wird sie geschätzt (nur ungefilterte Listen, aus der Statistik der Datenbank) oder weggelassen
+# 3. Opt-out: ?count=false -> gar kein COUNT
+# Ohne exakte Anzahl wird eine Zeile mehr als die Seite geladen (page_size + 1) -> daraus ergeben sich has_more und der next Link:
+#   {"count": null, "has_more": true, "next": "...", "previous": null, "results": [...]}
+#   {"count": 250000, "count_estimated": true, "has_more": true, ...}
+
+DEFAULTS = {
+    # None -> immer exakt zählen
+    'COUNT_THRESHOLD': 10000,
+    'COUNT_CACHE': True,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_PAGINATION', {}).get(name, DEFAULTS[name])
+
+
+def count_key(queryset, models):
+    # values('pk') -> ausgewählte Spalten (?fields=) und Annotationen spielen für die Anzahl keine Rolle, order_by() -> die Sortierung auch nicht
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    versions = ':'.join(str(version) for version in get_versions(models))
+    digest = hashlib.md5(f'{versions}:{sql}:{params!r}'.encode()).hexdigest()
+    return f'api:count:{digest}'
+
+
+def capped_count(queryset, threshold):
+    # Anzahl, höchstens threshold + 1 (-> "mehr als threshold")
+    if threshold is None:
+        return queryset.count()
+    return queryset.order_by()[:threshold + 1].count()
+
+
+def estimate_count(queryset):
+    # Geschätzte Anzahl aus der Statistik der Datenbank, nur für ungefilterte Querysets -> None, wenn es keine Schätzung gibt
+    if queryset.query.where or queryset.query.distinct:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        # sqlite_stat1 gibt es erst nach ANALYZE, die erste Zahl in stat ist die Anzahl der Zeilen
+        sql = 'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+def ensure_ordered(queryset):
+    # Ohne ORDER BY ist die Reihenfolge der Zeilen nicht festgelegt -> Seiten können sich überschneiden oder Zeilen auslassen
+    # Wie beim Export (streaming.py): unsortierte Querysets nach dem Primary Key sortieren
+    return queryset if queryset.ordered else queryset.order_by('pk')
+
+
+class CountMixin:
+    count_query_param = 'count'
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() not in ('0', 'false', 'no')
+
+    def get_total(self, queryset, request, view=None):
+        # -> (Anzahl oder None, exakt?)
+        if not self.count_requested(request):
+            return None, False
+        threshold = get_setting('COUNT_THRESHOLD')
+        if get_setting('COUNT_CACHE') and get_cache_setting('ENABLED'):
+            models = view.get_cache_models() if hasattr(view, 'get_cache_models') else (queryset.model,)
+            key = count_key(queryset, models)
+            count = get_cache().get(key)
+            if count is None:
+                count = capped_count(queryset, threshold)
+                get_cache().set(key, count, get_cache_setting('TIMEOUT'))
+        else:
+            count = capped_count(queryset, threshold)
+        if threshold is None or count <= threshold:
+            return count, True
+        return estimate_count(queryset), False
+
+    def add_count(self, response):
+        # count steht vorne wie bei DRF, count_estimated und has_more gibt es nur ohne exakte Anzahl
+        response = {'count': self.total, **response}
+        if not self.count_exact:
+            if self.total is not None:
+                response['count_estimated'] = True
+            response['has_more'] = self.has_more
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['required'] = [name for name in response_schema['required'] if name != 'count']
+        response_schema['properties']['count']['nullable'] = True
+        response_schema['properties']['count_estimated'] = {'type': 'boolean', 'example': True}
+        response_schema['properties']['has_more'] = {'type': 'boolean', 'example': True}
+        return response_schema
+
+
+# Globale Pagination (settings.py) -> LimitOffsetPagination mit billiger Gesamtanzahl (siehe oben)
+class CountingLimitOffsetPagination(CountMixin, LimitOffsetPagination):
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        queryset = ensure_ordered(queryset)
+        self.total, self.count_exact = self.get_total(queryset, request, view)
+        if self.count_exact:
+            self.count = self.total
+            self.has_more = self.offset + self.limit < self.count
+            if self.count > self.limit and self.template is not None:
+                self.display_page_controls = True
+            if self.count == 0 or self.offset > self.count:
+                return []
+            return list(queryset[self.offset:self.offset + self.limit])
+
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_more = len(page) > self.limit
+        # self.count benutzt DRF für die Links -> Untergrenze, mit der es genau dann einen next Link gibt, wenn has_more
+        self.count = self.offset + len(page)
+        return page[:self.limit]
+
+    def get_paginated_response(self, data):
+        return Response(self.add_count({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }))
+
+
 # Implementierung von Custom Pagination
 # https://www.django-rest-framework.org/api-guide/pagination/
-class CustomPagination(PageNumberPagination):
+# CountMixin -> die Gesamtanzahl kommt aus dem Cache, wird geschätzt oder weggelassen (siehe oben)
+class CustomPagination(CountMixin, PageNumberPagination):
     page_size_query_param = 'page_size'
     page_query_param = 'page-number'
     max_page_size = 1
 
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        queryset = ensure_ordered(queryset)
+        paginator = self.django_paginator_class(queryset, page_size)
+        self.total, self.count_exact = self.get_total(queryset, request, view)
+        if self.count_exact:
+            # Der Paginator übernimmt die (gecachte) Anzahl, statt selbst zu zählen
+            paginator.count = self.total
+            page_number = self.get_page_number(request, paginator)
+        else:
+            # Ohne Anzahl gibt es keine letzte Seite -> ?page-number=last würde zählen und ist hier ungültig
+            page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            if self.count_exact:
+                self.page = paginator.page(page_number)
+            else:
+                # Die Seite wird mit einer Zeile mehr geladen
+                number = self.get_number(page_number)
+                bottom = (number - 1) * page_size
+                rows = list(queryset[bottom:bottom + page_size + 1])
+                if number > 1 and not rows:
+                    raise InvalidPage(paginator.error_messages['no_results'])
+                # Untergrenze wie bei CountingLimitOffsetPagination -> has_next() und der next Link stimmen
+                paginator.count = bottom + len(rows)
+                self.page = Page(rows[:page_size], number, paginator)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.has_more = self.page.has_next()
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_number(self, page_number):
+        try:
+            number = int(page_number)
+        except (TypeError, ValueError):
+            raise InvalidPage('That page number is not an integer')
+        if number < 1:
+            raise InvalidPage('That page number is less than 1')
+        return number
+
     def get_paginated_response(self, data):
-        return Response({
-            'count': self.page.paginator.count,
+        return Response(self.add_count({
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'page_size': self.page_size,
             'results': data
-        })
\ No newline at end of file
+        }))
+
+
+# Keyset Pagination (Cursor Pagination)
+# Problem bei LimitOffsetPagination und PageNumberPagination: Die Datenbank muss bei OFFSET alle übersprungenen Zeilen trotzdem lesen
+# -> je tiefer die Seite, desto langsamer. Außerdem wird auf jeder Seite ein COUNT(*) über alle Zeilen ausgeführt
+# Keyset Pagination merkt sich stattdessen den Wert der Sortierspalte des letzten Eintrags (verpackt in einen undurchsichtigen Cursor)
+# und fragt die nächste Seite mit WHERE id > <letzter Wert> ORDER BY id LIMIT <page_size> ab -> das nutzt den Index und ist auf jeder Seite gleich schnell
+# Beispiel: http://127.0.0.1:8000/api/v1/employees/?pagination=keyset -> in der Antwort stehen 'next' und 'previous' als Links mit ?cursor=...
+class KeysetPagination(CursorPagination):
+    # Sortierung über den Primary Key -> eindeutig und indiziert
+    # Hat die View einen OrderingFilter, kann über ?order-by= auch nach einem anderen Feld sortiert werden
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    # Die Gesamtanzahl ist optional -> nur mit ?count=true wird ein COUNT(*) ausgeführt
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = queryset.count()
+
+        # Wie CursorPagination.paginate_queryset(), nur die Bedingung für die Position ist zusammengesetzt (siehe get_position_filter)
+        # DRF vergleicht nur die erste Sortierspalte und blättert bei gleichen Werten per OFFSET weiter -> bei ?order-by=emp_name
+        # wäre das innerhalb gleicher Namen wieder Offset Pagination
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            queryset = queryset.filter(self.get_position_filter(current_position, reverse))
+
+        # Eine Zeile mehr -> gibt es eine weitere Seite?
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+
+        if reverse:
+            # Rückwärts wurde umgekehrt sortiert -> Seite wieder in die richtige Reihenfolge bringen
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        # Der Primary Key wird immer als letztes Sortierkriterium angehängt -> die Position (alle Sortierspalten) ist eindeutig,
+        # auch bei gleichen Werten in der Sortierspalte (z.B. ?order-by=blog_title)
+        # Unter seinem Spaltennamen (id) -> so steht er auch in den Zeilen des Read-only Fast Path (values_list)
+        ordering = super().get_ordering(request, queryset, view)
+        pk = queryset.model._meta.pk.attname
+        ordering = tuple(pk if name == 'pk' else '-' + pk if name == '-pk' else name for name in ordering)
+        if not {pk, '-' + pk} & set(ordering):
+            ordering += ('-' + pk,) if ordering[0].startswith('-') else (pk,)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Position = Werte ALLER Sortierspalten, z.B. ["Anna Schmidt", "42"] bei ?order-by=emp_name
+        values = []
+        for name in ordering:
+            name = name.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(None if value is None else str(value))
+        return json.dumps(values)
+
+    def get_position_filter(self, position, reverse):
+        # Zeilen hinter der Position in Sortierrichtung (Keyset / "Row Value" Vergleich), z.B. für (emp_name, id):
+        # emp_name > 'Anna' OR (emp_name = 'Anna' AND id > 42)
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering) or None in values:
+            # Cursor aus einer anderen Sortierung bzw. NULL in einer Sortierspalte -> kein gültiger Vergleich möglich
+            raise NotFound(self.invalid_cursor_message)
+
+        # Q() ist bei | und & neutral
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            attr = name.lstrip('-')
+            # Cursor rückwärts XOR absteigend sortiert -> kleinere Werte
+            lookup = 'lt' if reverse != name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{attr}__{lookup}': value})
+            equal &= Q(**{attr: value})
+        return condition
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return response_schema
+
+
+def reverse_ordering(ordering):
+    return tuple(name[1:] if name.startswith('-') else '-' + name for name in ordering)
+
+
+# Mixin für Views, die zusätzlich zu ihrer normalen Pagination die Keyset Pagination anbieten
+# Mit ?pagination=keyset wird die KeysetPagination benutzt, ansonsten die pagination_class der View bzw. die globale Pagination
+# Der Parameter bleibt in den next/previous Links erhalten, der Client muss also nur den Links folgen
+# keyset_unsupported_params -> Query-Parameter, deren Sortierung die Keyset Pagination nicht abbilden kann (z.B. Relevanz der Volltextsuche,
+# die keine Spalte des Models ist). Zusammen mit ?pagination=keyset -> 400, statt die Sortierung stillschweigend zu ersetzen
+class KeysetPaginationMixin:
+    keyset_pagination_class = KeysetPagination
+    pagination_mode_query_param = 'pagination'
+    keyset_unsupported_params = ()
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            if request is not None and request.query_params.get(self.pagination_mode_query_param) == 'keyset':
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def paginate_queryset(self, queryset):
+        if isinstance(self.paginator, KeysetPagination):
+            for param in self.keyset_unsupported_params:
+                if self.request.query_params.get(param):
+                    raise ValidationError({param: f'Cannot be combined with {self.pagination_mode_query_param}=keyset, use the default pagination.'})
+        return super().paginate_queryset(queryset)
+
+
+# Limit/Offset Pagination für die async Views (siehe async_views.py)
+# Gleiche Parameter und gleiche Antwort wie LimitOffsetPagination, aber COUNT und Seite werden über das async ORM (acount, async for) geladen
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.count = await queryset.acount()
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset:self.offset + self.limit]]
+
+    def get_paginated_data(self, data):
+        return {
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+
+# Page Number Pagination für die async Employee-Liste -> gleiche Parameter wie die CustomPagination des EmployeeViewsets
+# (?page-number=, ?page_size=), COUNT und Seite über das async ORM
+class AsyncPageNumberPagination(PageNumberPagination):
+    page_size_query_param = CustomPagination.page_size_query_param
+    page_query_param = CustomPagination.page_query_param
+    max_page_size = CustomPagination.max_page_size
+
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        # Die Seite ist noch ein lazy Slice des Querysets -> hier asynchron laden
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def get_paginated_data(self, data):
+        return {
+            'count': self.page.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+            'results': data,
+        }
@@ -0,0 +1,26 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+# Schneller JSON-Parser -> Gegenstück zum FastJSONRenderer (siehe renderers.py)
+# Mit orjson wird der Request Body direkt als Bytes geparst, ansonsten wie beim JSONParser von DRF mit dem json-Modul
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        # orjson akzeptiert nur UTF-8 und lehnt NaN/Infinity immer ab -> nur im STRICT_JSON-Modus (Standard) gleichwertig
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
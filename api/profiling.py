@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+'''REQUEST PROFILING'''
+# Zeitmessung pro Request, aufgeteilt in Phasen (db, filter, serialize, render) -> wird von der ProfilingMiddleware (middleware.py)
+# als Server-Timing Header ausgegeben. Ohne aktive Messung (Middleware aus) sind die Hooks praktisch kostenlos:
+# sie werden erst installiert, wenn die Middleware eingeschaltet ist (instrument())
+
+DEFAULTS = {
+    'ENABLED': False,
+    # Queries, die länger dauern, landen mit ihrem EXPLAIN-Plan im Logger 'api.slow_queries'
+    'SLOW_QUERY_MS': 100,
+    'EXPLAIN': True,
+    # cProfile: URL-Namen (z.B. 'blogs_View'), die mit der Wahrscheinlichkeit PROFILE_SAMPLE_RATE profiliert werden
+    'PROFILE_ROUTES': [],
+    'PROFILE_SAMPLE_RATE': 0.01,
+    'PROFILE_DIR': 'profiles',
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_PROFILING', {}).get(name, DEFAULTS[name])
+
+
+# Messwerte des aktuellen Requests -> None, wenn gerade nicht gemessen wird
+_current = ContextVar('api_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.phases = {}
+        self.counts = {}
+        self.active = set()
+        self.slow_queries = []
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+
+def start():
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def get_current():
+    return _current.get()
+
+
+def timed(phase):
+    # Decorator: misst die Dauer der Funktion als Phase des aktuellen Requests
+    # Verschachtelte Aufrufe derselben Phase (z.B. ein Serializer in einem Serializer) werden nur einmal gezählt
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _current.get()
+            if profile is None or phase in profile.active:
+                return func(*args, **kwargs)
+            profile.active.add(phase)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add(phase, time.perf_counter() - started)
+                profile.active.discard(phase)
+        wrapper.__profiled__ = True
+        return wrapper
+    return decorator
+
+
+def _patch(cls, name, phase):
+    attribute = cls.__dict__[name]
+    if isinstance(attribute, property):
+        if getattr(attribute.fget, '__profiled__', False):
+            return
+        setattr(cls, name, property(timed(phase)(attribute.fget), attribute.fset, attribute.fdel, attribute.__doc__))
+    elif not getattr(attribute, '__profiled__', False):
+        setattr(cls, name, timed(phase)(attribute))
+
+
+def instrument():
+    # Installiert die Zeitmessung in DRF und im Read-only Fast Path (einmalig, wird von der ProfilingMiddleware aufgerufen)
+    # filter:    GenericAPIView.filter_queryset() -> Filter-Backends (django-filter, Suche, Sortierung)
+    # serialize: serializer.data bzw. ValuesListRepresentation.represent() -> enthält auch Queries, die dabei erst ausgeführt werden
+    # Die Render-Phase misst die Middleware selbst (process_template_response + Post-Render-Callback)
+    from rest_framework import generics, serializers
+
+    from .serializers import ValuesListRepresentation
+
+    _patch(generics.GenericAPIView, 'filter_queryset', 'filter')
+    _patch(serializers.Serializer, 'data', 'serialize')
+    _patch(serializers.ListSerializer, 'data', 'serialize')
+    _patch(ValuesListRepresentation, 'represent', 'serialize')
@@ -0,0 +1,69 @@
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+
+# orjson ist optional -> ist das Paket installiert (pip install orjson), wird damit serialisiert, sonst mit dem json-Modul von Python
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Schneller JSON-Renderer
+# Der JSONRenderer von DRF ruft für jede Antwort json.dumps(..., cls=JSONEncoder) auf -> dabei wird jedes Mal ein neuer Encoder erzeugt
+# FastJSONRenderer benutzt stattdessen orjson (in C/Rust implementiert) oder, wenn orjson fehlt, einen einmal erzeugten Encoder
+# Die Ausgabe ist Byte für Byte identisch mit dem JSONRenderer: kompakte Trennzeichen, UTF-8 ohne \u-Escapes,
+# U+2028/U+2029 werden escaped, Datum/Uhrzeit, Decimal, UUID usw. laufen über den JSONEncoder von DRF
+# Für Ausgaben mit Einrückung (z.B. Browsable API oder Accept: application/json; indent=4) wird der normale JSONRenderer verwendet
+# Einzige Abweichung: NaN/Infinity schreibt orjson als null, während der JSONRenderer (STRICT_JSON) mit einem Fehler abbricht
+
+
+# Zeichen, die in JSON erlaubt, in JavaScript-Strings aber nicht erlaubt sind -> werden wie beim JSONRenderer escaped
+LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+# Ein einziger Encoder für alle Aufrufe (pure Python Fallback) -> gleiche Einstellungen wie beim JSONRenderer
+_encoder = JSONRenderer.encoder_class(
+    ensure_ascii=JSONRenderer.ensure_ascii,
+    allow_nan=not JSONRenderer.strict,
+    separators=SHORT_SEPARATORS,
+)
+
+if orjson is not None:
+    # Datumswerte werden an den JSONEncoder von DRF durchgereicht (Format wie bei DRF, z.B. '...Z' statt '+00:00')
+    # Schlüssel, die keine Strings sind (z.B. Integer), werden wie bei json.dumps in Strings umgewandelt
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+
+def is_fast_path_supported():
+    # orjson kann nur kompakte UTF-8-Ausgabe erzeugen
+    return orjson is not None and not JSONRenderer.ensure_ascii and JSONRenderer.compact
+
+
+def dumps(data):
+    # Serialisiert data zu JSON-Bytes -> identische Ausgabe wie JSONRenderer().render(data)
+    if is_fast_path_supported():
+        try:
+            content = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            # z.B. Integer mit mehr als 64 Bit -> Fallback auf den Python-Encoder
+            pass
+        else:
+            for char, escaped in LINE_SEPARATORS:
+                content = content.replace(char, escaped)
+            return content
+
+    content = _encoder.encode(data)
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # Mit Einrückung oder abweichenden Einstellungen -> normaler JSONRenderer
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or (self.ensure_ascii, self.compact, self.strict) != (
+            JSONRenderer.ensure_ascii, JSONRenderer.compact, JSONRenderer.strict
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
@@ -1,6 +1,12 @@
-from rest_framework import serializers
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
 from students.models import Student
 from employees.models import Employee
+from .signals import bulk_saved
 
 '''Serialization: Objekte aus der Datenbank, also hier die Students, werden in ein Format umgewandelt, 
     das an das Frontend geschickt werden kann, meist JSON. Serializer sind sozusagen Übersetzer.
@@ -20,7 +26,284 @@ class StudentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+'''EINDEUTIGE FELDER'''
+# ModelSerializer hängt an Felder mit unique=True (z.B. Employee.emp_id) einen UniqueValidator -> eine Query pro Objekt
+# Bei Bulk-Operationen und beim Import (api/importing.py) wird stattdessen batchweise geprüft: eine Query pro Feld und 500 Werte
+# Dabei fallen auch Duplikate innerhalb derselben Liste auf (der UniqueValidator sieht nur die Datenbank)
+
+
+def pop_unique_validators(serializer):
+    # Entfernt die UniqueValidator aus den Feldern -> [(Feldname, Model-Feld, Fehlermeldung)]
+    unique = []
+    for name, field in serializer.fields.items():
+        for validator in [validator for validator in field.validators if isinstance(validator, UniqueValidator)]:
+            field.validators.remove(validator)
+            unique.append((name, field.source, validator.message))
+    return unique
+
+
+def find_unique_conflicts(model, unique, items, pks=None, batch_size=500):
+    # items: validierte Daten, pks: Primary Keys der jeweiligen Objekte bei Updates
+    # -> {Index: {Feldname: [Fehler]}} für Werte, die ein anderes Objekt schon hat oder die weiter vorne in items vorkommen
+    conflicts = {}
+    for name, source, message in unique:
+        values = [(index, attrs[source]) for index, attrs in enumerate(items) if source in attrs]
+        distinct = list({value for index, value in values})
+        existing = {}
+        for start in range(0, len(distinct), batch_size):
+            existing.update(model.objects.filter(**{f'{source}__in': distinct[start:start + batch_size]}).values_list(source, 'pk'))
+        seen = set()
+        for index, value in values:
+            own = pks[index] if pks else None
+            if value in seen or existing.get(value, own) != own:
+                conflicts.setdefault(index, {})[name] = [message]
+            seen.add(value)
+    return conflicts
+
+
+'''BULK SERIALIZER'''
+# ListSerializer für Bulk-Operationen (many=True) -> wird über Meta.list_serializer_class eingebunden
+# Standardmäßig legt ein ListSerializer jedes Objekt einzeln mit save() an -> eine INSERT-Query pro Objekt
+# Hier werden die Objekte stattdessen gesammelt und mit bulk_create()/bulk_update() in Batches geschrieben
+# Alle Batches laufen in EINER Transaktion -> scheitert ein Batch (z.B. ein gleichzeitiger Write mit derselben emp_id),
+# wird nichts geschrieben. Die bulk_saved Signals (ein Signal pro Batch) werden erst nach dem Commit verschickt
+class BulkListSerializer(serializers.ListSerializer):
+    batch_size = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Für Bulk Updates: Zuordnung id -> bestehendes Objekt
+        self.instance_map = {obj.pk: obj for obj in self.instance} if self.instance is not None else {}
+        # Eindeutige Felder werden nach der Validierung aller Elemente auf einmal geprüft (siehe find_unique_conflicts)
+        self.unique_fields = pop_unique_validators(self.child)
+
+    def run_child_validation(self, data):
+        # Bei Updates wird jedes Element gegen sein bestehendes Objekt validiert (wichtig z.B. für partial=True)
+        if self.instance is not None:
+            instance = self.instance_map.get(data.get('id')) if isinstance(data, dict) else None
+            if instance is None:
+                self.validated_items.append(None)
+                raise serializers.ValidationError({'id': ['Object with this id does not exist.']})
+            self.child.instance = instance
+        try:
+            attrs = super().run_child_validation(data)
+        except serializers.ValidationError:
+            self.validated_items.append(None)
+            raise
+        self.validated_items.append((attrs, self.child.instance.pk if self.child.instance is not None else None))
+        return attrs
+
+    def to_internal_value(self, data):
+        # validated_items: (Daten, pk) bzw. None pro Element, in der Reihenfolge des Requests
+        self.validated_items = []
+        try:
+            validated = super().to_internal_value(data)
+            errors = None
+        except serializers.ValidationError as exc:
+            validated, errors = None, exc.detail
+
+        valid = [(index, item) for index, item in enumerate(self.validated_items) if item is not None]
+        conflicts = find_unique_conflicts(
+            self.child.Meta.model, self.unique_fields, [attrs for index, (attrs, pk) in valid], [pk for index, (attrs, pk) in valid],
+        ) if self.unique_fields else {}
+        if not conflicts:
+            if errors is not None:
+                raise serializers.ValidationError(errors)
+            return validated
+
+        # Fehler der eindeutigen Felder zu den übrigen Fehlern pro Element hinzufügen (Liste oder Dictionary, siehe get_item_errors)
+        if errors is None:
+            errors = [{} for item in self.validated_items]
+        for position, item_errors in conflicts.items():
+            index = valid[position][0]
+            errors[index] = {**errors.get(index, {}), **item_errors} if isinstance(errors, dict) else {**errors[index], **item_errors}
+        raise serializers.ValidationError(errors)
+
+    def get_item_errors(self):
+        # Fehler pro Element mit Index im Request -> nur die fehlerhaften Elemente werden zurückgegeben
+        # Je nach LIST_SERIALIZER_ERRORS_AS_DICT liefert DRF die Fehler als Liste oder als Dictionary {index: fehler}
+        errors = self.errors
+        if isinstance(errors, list):
+            errors = dict(enumerate(errors))
+        if not all(isinstance(index, int) for index in errors):
+            # Fehler, die die ganze Liste betreffen (z.B. "Expected a list of items")
+            return [{'index': None, 'errors': dict(errors)}]
+        return [{'index': index, 'errors': item_errors} for index, item_errors in sorted(errors.items()) if item_errors]
+
+    def batches(self, items):
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+    def send_bulk_saved(self, model, objs, created):
+        # Bulk-Pfade verschicken keine post_save Signals -> ein Signal pro Batch (siehe api/signals.py), nach dem Commit
+        for batch in self.batches(objs):
+            transaction.on_commit(lambda batch=batch: bulk_saved.send(sender=model, instances=batch, created=created))
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        with transaction.atomic():
+            # batch_size -> bulk_create() schreibt trotzdem in Batches (ein INSERT pro Batch)
+            created = model.objects.bulk_create([model(**attrs) for attrs in validated_data], batch_size=self.batch_size)
+            self.send_bulk_saved(model, created, True)
+        return created
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        now = timezone.now()
+        fields = {'updated_at'}
+        updated = []
+        for attrs in validated_data:
+            # validated_data hat dieselbe Reihenfolge wie die übergebenen Objekte
+            instance = instances[len(updated)]
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            # bulk_update() ruft kein save() auf -> auto_now wird nicht gesetzt
+            instance.updated_at = now
+            updated.append(instance)
+
+        with transaction.atomic():
+            model.objects.bulk_update(updated, sorted(fields), batch_size=self.batch_size)
+            self.send_bulk_saved(model, updated, False)
+        return updated
+
+
 class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
-        fields = '__all__'
\ No newline at end of file
+        # emp_num wird intern aus emp_id abgeleitet (für die Filter id_min/id_max) -> nicht Teil der API
+        exclude = ['emp_num']
+
+        # EmployeeSerializer(many=True) -> Bulk Create/Update über bulk_create()/bulk_update() (siehe BulkListSerializer)
+        list_serializer_class = BulkListSerializer
+
+'''READ-ONLY FAST PATH'''
+# Bei Listen erzeugt DRF für jede Zeile ein Model-Objekt und ruft danach für jedes Feld to_representation() auf
+# -> bei großen Listen verbringt der Server die meiste Zeit damit
+# Für einfache ModelSerializer (nur Model-Felder, keine verschachtelten Serializer) geht es schneller:
+# Die Feldliste wird einmal pro Serializer "kompiliert", die Zeilen werden mit values_list() als Tupel aus der DB geholt
+# und direkt in Dictionaries umgewandelt -> es werden keine Model-Objekte erzeugt
+# Die Ausgabe ist identisch mit serializer.data
+
+# Felder, deren to_representation() den Wert aus der DB unverändert zurückgibt -> können direkt übernommen werden
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+def is_iso_datetime_field(field):
+    if type(field) is not serializers.DateTimeField or hasattr(field, 'timezone'):
+        return False
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+
+class DatetimeConverter:
+    # DRF ermittelt die Zeitzone bei jedem Wert neu (enforce_timezone() -> get_current_timezone())
+    # -> das kostet bei großen Listen mehr als die eigentliche Formatierung. Hier wird sie einmal pro Aufruf ermittelt
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self):
+        field_timezone = self.field.default_timezone()
+        fallback = self.field.to_representation
+        if field_timezone is None:
+            return fallback
+
+        def convert(value):
+            if value.tzinfo is None:
+                # naive Werte (z.B. aus Raw-SQL) -> wie DRF behandeln
+                return fallback(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+
+
+class ValuesListRepresentation:
+    def __init__(self, names, columns, converters):
+        self.names = names
+        self.columns = columns
+        self.converters = converters
+
+    @classmethod
+    def compile(cls, serializer_class, fieldset=None):
+        # Liefert None, wenn der Serializer nicht für den Fast Path geeignet ist -> dann wird der normale Weg benutzt
+        # fieldset: nur diese Felder (Sparse Fieldsets, siehe fieldsets.py) -> values_list() liest auch nur deren Spalten
+        serializer = serializer_class()
+        if not isinstance(serializer, serializers.ModelSerializer):
+            return None
+        if type(serializer).to_representation is not serializers.ModelSerializer.to_representation:
+            return None
+
+        opts = serializer.Meta.model._meta
+        names, columns, converters = [], [], []
+        for field in serializer._readable_fields:
+            if fieldset is not None and field.field_name not in fieldset:
+                continue
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and model_field.many_to_one and field.pk_field is None:
+                # Foreign Key -> der Wert ist die ID des verknüpften Objekts (z.B. blog_id)
+                converter = None
+            elif model_field.is_relation or isinstance(field, serializers.RelatedField) or isinstance(field, serializers.BaseSerializer):
+                return None
+            elif type(field) in PASSTHROUGH_FIELDS:
+                converter = None
+            elif is_iso_datetime_field(field):
+                # DateTimeField im ISO-8601 Format -> Zeitzone wird einmal pro Aufruf ermittelt (siehe bind())
+                converter = DatetimeConverter(field)
+            else:
+                # z.B. DateTimeField -> gleiche Formatierung wie DRF
+                converter = field.to_representation
+
+            names.append(field.field_name)
+            columns.append(model_field.attname)
+            converters.append(converter)
+
+        # Der Primary Key wird immer gelesen (die KeysetPagination sortiert darüber), auch wenn er bei ?fields= nicht ausgegeben wird
+        # -> als letzte Spalte, to_representation() ignoriert Spalten ohne Namen
+        if opts.pk.attname not in columns:
+            columns.append(opts.pk.attname)
+        return cls(tuple(names), tuple(columns), tuple(converters))
+
+    def values_list(self, queryset):
+        # named=True -> die Zeilen sind namedtuples, die KeysetPagination kann die Sortierspalte darüber auslesen
+        return queryset.values_list(*self.columns, named=True)
+
+    def bind(self):
+        # Löst die Converter für den aktuellen Request auf (z.B. die aktive Zeitzone) -> liefert eine Funktion für einzelne Zeilen
+        names = self.names
+        converters = tuple(
+            converter.bind() if isinstance(converter, DatetimeConverter) else converter
+            for converter in self.converters
+        )
+
+        def to_representation(row):
+            return {
+                name: value if converter is None or value is None else converter(value)
+                for name, converter, value in zip(names, converters, row)
+            }
+        return to_representation
+
+    def to_representation(self, row):
+        return self.bind()(row)
+
+    def represent(self, rows):
+        to_representation = self.bind()
+        return [to_representation(row) for row in rows]
+
+
+_compiled_representations = {}
+
+
+def get_values_list_representation(serializer_class, fieldset=None):
+    # Die Feldliste wird nur einmal pro Serializer-Klasse (und Auswahl an Feldern) kompiliert
+    key = (serializer_class, fieldset)
+    if key not in _compiled_representations:
+        _compiled_representations[key] = ValuesListRepresentation.compile(serializer_class, fieldset)
+    return _compiled_representations[key]
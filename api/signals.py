@@ -0,0 +1,86 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal
+
+from blogs import counters
+from blogs.models import Blog, Comment
+from employees import facets
+from employees.models import Employee
+from students.models import Student
+
+from . import autocomplete, changes
+from .cache import invalidate_model
+
+# Models, deren Änderungen den Response Cache invalidieren (siehe cache.py)
+CACHED_MODELS = (Student, Employee, Blog, Comment)
+
+
+'''BULK SIGNALS'''
+# bulk_create(), bulk_update() und Bulk Deletes verschicken keine post_save/post_delete Signals pro Zeile
+# Die Bulk-Pfade (z.B. BulkListSerializer in serializers.py) verschicken stattdessen pro Batch eines dieser Signals
+# bulk_saved:   sender=Model, instances=[...], created=True/False
+# bulk_deleted: sender=Model, instances=[...] (Zustand vor dem Löschen)
+bulk_saved = Signal()
+bulk_deleted = Signal()
+
+
+# Wird bei jedem save() und delete() eines der Models aufgerufen (auch bei Cascade Deletes) und pro Batch bei den Bulk-Pfaden
+def invalidate_response_cache(sender, using=None, **kwargs):
+    invalidate_model(sender, using)
+
+
+# Die Receiver werden gezielt pro Model registriert -> für alle anderen Models kann Django weiterhin schnell löschen,
+# ohne vorher jede Zeile zu laden, um Signals zu verschicken
+for model in CACHED_MODELS:
+    for signal in (post_save, post_delete, bulk_saved, bulk_deleted):
+        signal.connect(invalidate_response_cache, sender=model, dispatch_uid=f'invalidate_response_cache_{model._meta.label_lower}')
+
+
+'''KOMMENTARANZAHL'''
+# Blog.comment_count wird auf SQLite von Triggern gepflegt (siehe blogs/counters.py)
+# Nur ohne Trigger (andere Datenbanken) übernehmen das diese Receiver -> auf SQLite entstehen keine Kosten pro Kommentar
+if not counters.uses_triggers(Comment):
+    for signal, receiver in (
+        (post_init, counters.remember_blog),
+        (post_save, counters.comment_saved),
+        (post_delete, counters.comment_deleted),
+        (bulk_saved, counters.comments_bulk_saved),
+        (bulk_deleted, counters.comments_bulk_deleted),
+    ):
+        signal.connect(receiver, sender=Comment, dispatch_uid=f'comment_counter_{receiver.__name__}')
+
+
+'''DESIGNATION-FACETTEN'''
+# DesignationFacet wird auf SQLite von Triggern gepflegt (siehe employees/facets.py), sonst von diesen Receivern
+if not facets.uses_triggers(Employee):
+    for signal, receiver in (
+        (post_init, facets.remember_designation),
+        (post_save, facets.employee_saved),
+        (post_delete, facets.employee_deleted),
+        (bulk_saved, facets.employees_bulk_saved),
+        (bulk_deleted, facets.employees_bulk_deleted),
+    ):
+        signal.connect(receiver, sender=Employee, dispatch_uid=f'designation_facets_{receiver.__name__}')
+
+
+'''CHANGE LOG'''
+# Jede Änderung landet mit fortlaufender Nummer im Change Log -> Delta-Sync über /api/v1/<resource>/changes/ (siehe changes.py)
+for model in changes.RESOURCE_MODELS.values():
+    for signal, receiver in (
+        (post_save, changes.record_save),
+        (post_delete, changes.record_delete),
+        (bulk_saved, changes.record_bulk_save),
+        (bulk_deleted, changes.record_bulk_delete),
+    ):
+        signal.connect(receiver, sender=model, dispatch_uid=f'changes_{receiver.__name__}_{model._meta.label_lower}')
+
+
+'''AUTOCOMPLETE'''
+# Der Prefix-Index im Speicher (siehe autocomplete.py) wird bei jeder Änderung eines Namens bzw. Titels nachgeführt
+for model in autocomplete.MODEL_INDEXES:
+    for signal, receiver in (
+        (post_save, autocomplete.index_save),
+        (post_delete, autocomplete.index_delete),
+        (bulk_saved, autocomplete.index_bulk_save),
+        (bulk_deleted, autocomplete.index_bulk_delete),
+    ):
+        signal.connect(receiver, sender=model, dispatch_uid=f'autocomplete_{receiver.__name__}_{model._meta.label_lower}')
@@ -0,0 +1,150 @@
+import csv
+
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from .fieldsets import SparseFieldsetMixin, get_readable_field_names, project_queryset, trim_serializer
+from .renderers import dumps
+from .serializers import get_values_list_representation
+
+# Streaming Responses
+# Normalerweise wird das komplette Queryset in den Speicher geladen, serialisiert und erst dann als Ganzes an den Client geschickt
+# Bei einer StreamingHttpResponse wird die Antwort Stück für Stück erzeugt und gesendet -> der Speicherverbrauch bleibt konstant,
+# egal wie viele Zeilen die Tabelle hat, und der Client bekommt die ersten Bytes sofort
+# https://docs.djangoproject.com/en/5.2/ref/request-response/#streaminghttpresponse-objects
+
+# Anzahl der Zeilen, die pro Datenbankabfrage geholt werden (queryset.iterator(chunk_size=...))
+CHUNK_SIZE = 2000
+
+# Unterstützte Formate und deren Content-Type
+# json   -> ein einziges JSON-Array, das Element für Element geschrieben wird
+# ndjson -> ein JSON-Objekt pro Zeile (Newline Delimited JSON), praktisch für Pipelines, die zeilenweise lesen
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Formate der Export-Endpunkte (siehe ExportMixin)
+# csv -> eine Zeile pro Objekt, verschachtelte Werte (z.B. die Kommentare eines Blogs) stehen als JSON in der Zelle
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Die Zeilen werden zu Blöcken dieser Größe zusammengefasst, bevor sie geschrieben werden -> weniger, dafür größere Writes
+BUFFER_SIZE = 64 * 1024
+
+
+def get_stream_format(request, param='stream', formats=STREAM_FORMATS, default=None):
+    # ?stream=json oder ?stream=ndjson -> None (bzw. default), wenn nicht gestreamt werden soll
+    stream_format = request.query_params.get(param, default)
+    if stream_format is None:
+        return None
+    if stream_format not in formats:
+        raise ValidationError({param: f'Must be one of: {", ".join(formats)}.'})
+    return stream_format
+
+
+def iter_representations(queryset, serializer_class, chunk_size=CHUNK_SIZE, fieldset=None):
+    # iterator() umgeht den Queryset-Cache, es liegen also nie mehr als chunk_size Zeilen gleichzeitig im Speicher
+    # Wenn möglich über den Read-only Fast Path (values_list, siehe serializers.py), sonst mit einem einzigen Serializer für alle Zeilen
+    # -> die Felder werden nur einmal aufgebaut, nicht für jedes Objekt neu
+    # fieldset: nur diese Felder ausgeben und lesen (?fields= / ?exclude=, siehe fieldsets.py)
+    representation = get_values_list_representation(serializer_class, fieldset)
+    if representation is not None:
+        to_representation = representation.bind()
+        for row in representation.values_list(queryset).iterator(chunk_size=chunk_size):
+            yield to_representation(row)
+        return
+
+    serializer = trim_serializer(serializer_class(), fieldset)
+    for instance in project_queryset(queryset, serializer_class, fieldset).iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(instance)
+
+
+def iter_json_array(items):
+    yield b'['
+    for index, item in enumerate(items):
+        # dumps() -> gleiche Ausgabe wie der FastJSONRenderer (siehe renderers.py)
+        yield (b',' if index else b'') + dumps(item)
+    yield b']'
+
+
+def iter_ndjson(items):
+    for item in items:
+        yield dumps(item) + b'\n'
+
+
+# csv.writer schreibt in ein Objekt mit write() -> Echo gibt die fertige Zeile einfach zurück, statt sie zu speichern
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode()
+    return value
+
+
+def iter_csv(items, fieldnames):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fieldnames).encode()
+    for item in items:
+        yield writer.writerow([csv_value(item.get(name)) for name in fieldnames]).encode()
+
+
+def iter_buffered(chunks, size=BUFFER_SIZE):
+    # Der erste Block (z.B. die CSV-Kopfzeile) geht sofort raus -> schnelles erstes Byte, danach in Blöcken von ca. size Bytes
+    buffer = []
+    length = 0
+    first = True
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if first or length >= size:
+            yield b''.join(buffer)
+            buffer = []
+            length = 0
+            first = False
+    if buffer:
+        yield b''.join(buffer)
+
+
+def streaming_response(items, stream_format):
+    content = iter_ndjson(items) if stream_format == 'ndjson' else iter_json_array(items)
+    return StreamingHttpResponse(content, content_type=STREAM_FORMATS[stream_format])
+
+
+def export_response(items, export_format, fieldnames, filename):
+    content = iter_csv(items, fieldnames) if export_format == 'csv' else iter_ndjson(items)
+    response = StreamingHttpResponse(iter_buffered(content), content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    # Reverse Proxies (z.B. nginx) sollen die Antwort nicht puffern, sondern direkt weiterreichen
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Export der kompletten (gefilterten) Liste als Stream, ohne Pagination
+# Es gelten alle Filter der View (Filter, Suche, Sortierung) und ?fields= / ?exclude=
+# ?output=ndjson (Standard) oder ?output=csv
+# Die Zeilen werden per iterator(chunk_size=...) gelesen -> konstanter Speicherverbrauch, Prefetches (z.B. die Kommentare der Blogs)
+# werden pro Chunk ausgeführt, also ohne N+1-Queries
+class ExportMixin:
+    export_format_query_param = 'output'
+    export_chunk_size = CHUNK_SIZE
+    export_filename = 'export'
+
+    def export_response(self, request):
+        export_format = get_stream_format(request, self.export_format_query_param, EXPORT_FORMATS, default='ndjson')
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
+
+        serializer_class = self.get_serializer_class()
+        fieldset = self.get_fieldset() if isinstance(self, SparseFieldsetMixin) else None
+        items = iter_representations(queryset, serializer_class, self.export_chunk_size, fieldset)
+        fieldnames = fieldset or get_readable_field_names(serializer_class)
+        return export_response(items, export_format, fieldnames, self.export_filename)
@@ -0,0 +1,23 @@
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from .cache import get_cache
+
+'''BASISKLASSEN FÜR TESTS'''
+# Die Datenbank wird nach jedem Test zurückgesetzt, der Response Cache (LocMemCache im Prozess) aber nicht
+# -> ohne Leeren bekäme ein Test womöglich die gecachte Antwort eines vorherigen Tests mit anderen Daten
+# Die Basisklassen leeren den Cache vor jedem Test, self.client ist wie bei DRF ein APIClient
+# Eigene setUp()-Methoden müssen super().setUp() aufrufen
+
+
+class ResponseCacheResetMixin:
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+
+
+class ApiTestCase(ResponseCacheResetMixin, APITestCase):
+    pass
+
+
+class ApiTransactionTestCase(ResponseCacheResetMixin, APITransactionTestCase):
+    pass
@@ -1,3 +1,935 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from blogs.models import Blog, Comment
+from blogs.serializers import BlogSerializer, CommentSerializer
+from employees.models import Employee
+from students.models import Student
+
+from . import autocomplete, renderers
+from .autocomplete import INDEXES
+from .benchmarking import run_benchmark, seed
+from .cache import get_cache, get_stats, reset_stats
+from .changes import compact
+from .importing import import_file, write_checkpoint
+from .models import ChangeLogEntry, ChangeLogWatermark
+from .renderers import FastJSONRenderer
+from .serializers import EmployeeSerializer, StudentSerializer, get_values_list_representation
+from .testing import ApiTestCase, ApiTransactionTestCase
+
+
+class ResponseCacheTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_stats()
+        self.employee = Employee.objects.create(emp_id='EMP001', emp_name='John Doe', designation='Manager')
+
+    def test_hit_after_miss(self):
+        response = self.client.get('/api/v1/employees/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/employees/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['emp_name'], 'John Doe')
+        self.assertEqual(get_stats()['hits'], 1)
+        self.assertEqual(get_stats()['misses'], 1)
+
+    def test_query_string_is_part_of_the_key(self):
+        self.client.get('/api/v1/employees/?designation=manager')
+        response = self.client.get('/api/v1/employees/?designation=developer')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_media_type_is_part_of_the_key(self):
+        json_response = self.client.get('/api/v1/employees/', HTTP_ACCEPT='application/json')
+        html_response = self.client.get('/api/v1/employees/', HTTP_ACCEPT='text/html')
+        self.assertEqual(html_response['X-Cache'], 'MISS')
+        self.assertNotEqual(html_response['ETag'], json_response['ETag'])
+        response = self.client.get('/api/v1/employees/', HTTP_ACCEPT='text/html')
+        self.assertEqual((response['X-Cache'], response['ETag']), ('HIT', html_response['ETag']))
+        # Gleicher ausgehandelter Media Type -> gleicher Key und gleicher ETag, auch ohne Cache
+        response = self.client.get('/api/v1/employees/', HTTP_ACCEPT='*/*')
+        self.assertEqual((response['X-Cache'], response['ETag']), ('HIT', json_response['ETag']))
+        get_cache().clear()
+        self.assertEqual(self.client.get('/api/v1/employees/', HTTP_ACCEPT='*/*')['ETag'], json_response['ETag'])
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_host_is_part_of_the_key(self):
+        # Seiten enthalten absolute next/previous Links -> pro Host (und Schema) ein eigener Eintrag
+        Employee.objects.create(emp_id='EMP002', emp_name='Jane Doe', designation='Manager')
+        Employee.objects.create(emp_id='EMP003', emp_name='Max Doe', designation='Manager')
+        self.client.get('/api/v1/employees/', HTTP_HOST='a.example.com')
+        response = self.client.get('/api/v1/employees/', HTTP_HOST='b.example.com')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.data['next'].startswith('http://b.example.com/'))
+
+    def test_version_is_bumped_again_on_commit(self):
+        # Ein GET zwischen der Änderung und dem Commit cacht die alten Zeilen -> nach dem Commit muss dieser Eintrag ungültig sein
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.employee.emp_name = 'Jane Doe'
+                self.employee.save()
+                self.client.get('/api/v1/employees/')
+        self.assertEqual(self.client.get('/api/v1/employees/')['X-Cache'], 'MISS')
+
+    def test_invalidated_on_save_and_delete(self):
+        self.client.get(f'/api/v1/employees/{self.employee.pk}/')
+        self.employee.emp_name = 'Jane Doe'
+        self.employee.save()
+        response = self.client.get(f'/api/v1/employees/{self.employee.pk}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['emp_name'], 'Jane Doe')
+
+        pk = self.employee.pk
+        self.employee.delete()
+        self.assertEqual(self.client.get(f'/api/v1/employees/{pk}/').status_code, 404)
+
+    def test_other_models_do_not_invalidate(self):
+        self.client.get('/api/v1/employees/')
+        Student.objects.create(student_id='S001', name='Max', branch='Informatik')
+        self.assertEqual(self.client.get('/api/v1/employees/')['X-Cache'], 'HIT')
+
+    def test_blog_cache_depends_on_comments(self):
+        blog = Blog.objects.create(blog_title='Blog', blog_body='Body')
+        self.client.get('/api/v1/blogs/')
+        Comment.objects.create(blog=blog, comment='Neu')
+        response = self.client.get('/api/v1/blogs/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results'][0]['comments']), 1)
+
+    def test_function_based_views_and_stats_endpoint(self):
+        self.client.get('/api/v1/students/')
+        self.assertEqual(self.client.get('/api/v1/students/')['X-Cache'], 'HIT')
+        self.assertNotIn('X-Cache', self.client.get('/api/v1/students/?stream=json'))
+        self.assertEqual(self.client.get('/api/v1/cache/stats/').data['hits'], 1)
+
+
+class ConditionalGetTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog = Blog.objects.create(blog_title='Blog', blog_body='Body')
+        self.comment = Comment.objects.create(blog=self.blog, comment='Kommentar')
+
+    def test_etag_not_modified(self):
+        response = self.client.get('/api/v1/employees/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual(self.client.get('/api/v1/employees/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Neue Zeile -> neuer ETag
+        Employee.objects.create(emp_id='EMP001', emp_name='John Doe', designation='Manager')
+        response = self.client.get('/api/v1/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified_without_serialization(self):
+        url = f'/api/v1/blogs/{self.blog.pk}/'
+        etag = self.client.get(url)['ETag']
+        get_cache().clear()
+        # Nur das Aggregat, kein Laden und Serialisieren des Blogs
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_cached_response_answers_conditional_requests(self):
+        etag = self.client.get('/api/v1/blogs/')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/v1/blogs/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_comment_changes_blog_etag(self):
+        url = f'/api/v1/blogs/{self.blog.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.comment.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_query_string_changes_etag(self):
+        self.assertNotEqual(
+            self.client.get('/api/v1/comments/?limit=1')['ETag'],
+            self.client.get('/api/v1/comments/?limit=2')['ETag'],
+        )
+
+    def test_if_modified_since(self):
+        response = self.client.get('/api/v1/students/')
+        Student.objects.create(student_id='S001', name='Max', branch='Informatik')
+        response = self.client.get('/api/v1/students/')
+        last_modified = response['Last-Modified']
+        get_cache().clear()
+        self.assertEqual(self.client.get('/api/v1/students/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+
+class FastJSONRendererTest(ApiTestCase):
+    def assertSameOutput(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_identical_to_json_renderer(self):
+        self.assertSameOutput({
+            'text': 'Grüße   "quoted" \\ </script>', 'int': 2 ** 70, 'float': 1.5, 'none': None,
+            'list': [True, False, {'nested': []}], 1: 'integer key',
+            'date': timezone.now(), 'decimal': Decimal('1.10'), 'uuid': uuid.uuid4(),
+        })
+
+    @unittest.skipUnless(renderers.orjson, 'orjson is not installed')
+    def test_orjson_identical_to_json_renderer(self):
+        # Der Fast Path muss wirklich über orjson laufen, nicht über den Fallback
+        self.assertTrue(renderers.is_fast_path_supported())
+        data = {
+            'text': 'Grüße \u2028 \u2029 "quoted" \\ </script>', 'int': 2 ** 63 - 1, 'float': 0.1, 'none': None,
+            'list': [True, False, {'nested': [], 'empty': {}}], 1: 'integer key',
+            'date': timezone.now(), 'day': timezone.now().date(), 'decimal': Decimal('1.10'), 'uuid': uuid.uuid4(),
+        }
+        with mock.patch.object(renderers.orjson, 'dumps', wraps=renderers.orjson.dumps) as dumps:
+            self.assertSameOutput(data)
+        dumps.assert_called_once()
+        # Zu große Integer kann orjson nicht -> Fallback mit derselben Ausgabe
+        self.assertSameOutput({'int': 2 ** 70})
+
+    def test_identical_on_endpoints(self):
+        blog = Blog.objects.create(blog_title='Blög', blog_body='Ümlaut  ')
+        Comment.objects.create(blog=blog, comment='Kommentar')
+        Employee.objects.create(emp_id='EMP001', emp_name='Jürgen', designation='Manager')
+        for url in ('/api/v1/employees/', '/api/v1/blogs/', f'/api/v1/blogs/{blog.pk}/'):
+            response = self.client.get(url)
+            self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_indent_falls_back(self):
+        response = self.client.get('/api/v1/comments/', HTTP_ACCEPT='application/json; indent=4')
+        self.assertIn(b'\n    ', response.content)
+
+    def test_parser(self):
+        response = self.client.post(
+            '/api/v1/employees/', b'{"emp_id": "EMP002", "emp_name": "J\\u00fcrgen", "designation": "Dev"}',
+            content_type='application/json',
+        )
+        self.assertEqual(response.data['emp_name'], 'Jürgen')
+        response = self.client.post('/api/v1/employees/', b'{"emp_id": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ValuesListRepresentationTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        blog = Blog.objects.create(blog_title='Blog', blog_body='Body')
+        Comment.objects.create(blog=blog, comment='Kommentar')
+        Employee.objects.create(emp_id='EMP001', emp_name='Jürgen', designation='Manager')
+        Student.objects.create(student_id='S001', name='Max', branch='Informatik')
+
+    def test_output_identical_to_serializer(self):
+        for serializer_class in (StudentSerializer, EmployeeSerializer, CommentSerializer):
+            queryset = serializer_class.Meta.model.objects.order_by('pk')
+            representation = get_values_list_representation(serializer_class)
+            self.assertEqual(
+                representation.represent(representation.values_list(queryset)),
+                serializer_class(queryset, many=True).data,
+            )
+
+    def test_nested_serializers_use_regular_path(self):
+        self.assertIsNone(get_values_list_representation(BlogSerializer))
+
+    def test_list_endpoints(self):
+        response = self.client.get('/api/v1/comments/')
+        self.assertEqual(response.data['results'], CommentSerializer(Comment.objects.all(), many=True).data)
+        response = self.client.get('/api/v1/employees/?pagination=keyset')
+        self.assertEqual(response.data['results'], EmployeeSerializer(Employee.objects.all(), many=True).data)
+
+
+class AsyncViewsTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Student.objects.create(student_id='S001', name='Anna', branch='CS')
+        Student.objects.create(student_id='S002', name='Ben', branch='EE')
+        Employee.objects.create(emp_id='EMP001', emp_name='John Doe', designation='Manager')
+        Employee.objects.create(emp_id='EMP002', emp_name='Jane Roe', designation='Developer')
+        cls.blog = Blog.objects.create(blog_title='Async Django', blog_body='Event loop')
+        Blog.objects.create(blog_title='Other', blog_body='Nothing')
+        Comment.objects.create(blog=cls.blog, comment='First')
+        Comment.objects.create(blog=cls.blog, comment='Second')
+
+    async def test_lists_match_sync_views(self):
+        for resource in ('students', 'comments', 'blogs'):
+            with self.subTest(resource=resource):
+                response = await self.async_client.get(f'/api/v1/async/{resource}/', {'limit': 10})
+                self.assertEqual(response.status_code, 200)
+                expected = await sync_to_async(APIClient().get)(f'/api/v1/{resource}/', {'limit': 10})
+                self.assertEqual(response.json()['results'], json.loads(expected.content)['results'])
+                self.assertEqual(response.json()['count'], expected.data['count'])
+
+    async def test_employee_list_matches_viewset(self):
+        # Page Number Pagination wie beim EmployeeViewset -> gleiche Parameter und gleiche Antwort
+        for params in ({}, {'page-number': 2, 'page_size': 1}, {'page_size': 1}, {'designation': 'developer'}, {'page-number': 2}):
+            with self.subTest(params=params):
+                response = await self.async_client.get('/api/v1/async/employees/', params)
+                expected = await sync_to_async(APIClient().get)('/api/v1/employees/', params)
+                self.assertEqual(response.status_code, expected.status_code)
+                if expected.status_code != 200:
+                    continue
+                data = response.json()
+                expected = json.loads(expected.content)
+                for link in ('next', 'previous'):
+                    if expected[link] is not None:
+                        expected[link] = expected[link].replace('/api/v1/employees/', '/api/v1/async/employees/')
+                self.assertEqual(data, expected)
+
+    async def test_employee_filter(self):
+        response = await self.async_client.get('/api/v1/async/employees/', {'designation': 'MANAGER'})
+        self.assertEqual([employee['emp_id'] for employee in response.json()['results']], ['EMP001'])
+
+    async def test_invalid_employee_id_range(self):
+        # Die emp_id wird schon im Formular des Filters geprüft -> 400 statt 500, auch ohne DRF
+        response = await self.async_client.get('/api/v1/async/employees/', {'id_min': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id_min', response.json())
+        response = await self.async_client.get('/api/v1/async/employees/', {'id_min': 'EMP002'})
+        self.assertEqual([employee['emp_id'] for employee in response.json()['results']], ['EMP002'])
+
+    async def test_blog_search_and_detail(self):
+        response = await self.async_client.get('/api/v1/async/blogs/', {'q': 'async'})
+        self.assertEqual([blog['id'] for blog in response.json()['results']], [self.blog.pk])
+
+        response = await self.async_client.get(f'/api/v1/async/blogs/{self.blog.pk}/')
+        self.assertEqual(response.json()['comment_count'], 2)
+        self.assertEqual([comment['comment'] for comment in response.json()['comments']], ['First', 'Second'])
+
+    async def test_detail_not_found_and_read_only(self):
+        response = await self.async_client.get('/api/v1/async/students/999/')
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.post('/api/v1/async/students/', {})
+        self.assertEqual(response.status_code, 405)
+
+
+class BenchmarkSuiteTest(TestCase):
+    def test_seed_is_deterministic(self):
+        counts = seed(students=5, employees=20, blogs=30, comments_mean=3, seed=1, batch_size=7)
+        self.assertEqual(counts['employees'], 20)
+        self.assertEqual(Comment.objects.count(), counts['comments'])
+        first = list(Employee.objects.order_by('pk').values_list('emp_id', 'emp_name', 'designation'))
+        comments = list(Blog.objects.order_by('pk').annotate(n=Count('comments')).values_list('n', flat=True))
+
+        Student.objects.all().delete()
+        Employee.objects.all().delete()
+        Blog.objects.all().delete()
+        seed(students=5, employees=20, blogs=30, comments_mean=3, seed=1)
+        self.assertEqual(list(Employee.objects.order_by('pk').values_list('emp_id', 'emp_name', 'designation')), first)
+        self.assertEqual(list(Blog.objects.order_by('pk').annotate(n=Count('comments')).values_list('n', flat=True)), comments)
+
+    def test_reseed_after_delete(self):
+        # Die laufenden Nummern setzen nach der höchsten vorhandenen Nummer fort, nicht nach der Anzahl der Zeilen
+        seed(students=3, employees=3)
+        Student.objects.order_by('pk').first().delete()
+        Employee.objects.order_by('pk').first().delete()
+        counts = seed(students=2, employees=2)
+        self.assertEqual((counts['students'], counts['employees']), (2, 2))
+        self.assertEqual(list(Student.objects.order_by('pk').values_list('student_id', flat=True)), [f'S{i:07}' for i in range(1, 5)])
+        self.assertEqual(list(Employee.objects.order_by('pk').values_list('emp_id', flat=True))[-1], 'EMP0000004')
+
+    def test_seed_data_rejects_invalid_skew(self):
+        for skew in ('1', '0.5', '-2'):
+            with self.subTest(skew=skew), self.assertRaisesMessage(CommandError, '--comments-skew'):
+                call_command('seed_data', '--blogs', '3', '--comments-skew', skew, stdout=io.StringIO())
+        self.assertEqual(Blog.objects.count(), 0)
+        call_command('seed_data', '--blogs', '3', '--comments-skew', '1.1', stdout=io.StringIO())
+        self.assertEqual(Blog.objects.count(), 3)
+
+    def test_benchmark_covers_all_get_routes(self):
+        seed(students=3, employees=3, blogs=3, seed=2)
+        report = run_benchmark(iterations=2)
+        routes = {result['route'] for result in report['results']}
+        self.assertTrue({'students_View', 'student_Detail_View', 'employees-list', 'employees-detail', 'blogs_View',
+                         'blog_Detail_View', 'comments_View', 'comment_Detail_View', 'async_blogs_View'} <= routes)
+        self.assertNotIn('employees-bulk', routes)
+        for result in report['results']:
+            self.assertEqual(result['status'], 200, result)
+            self.assertGreater(result['p99_ms'], 0)
+        self.assertEqual(report['meta']['rows']['employees'], 3)
+        json.dumps(report)
+
+
+class ProfilingMiddlewareTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        blog = Blog.objects.create(blog_title='Profiling', blog_body='Server-Timing')
+        Comment.objects.create(blog=blog, comment='Slow?')
+
+    def setUp(self):
+        super().setUp()
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+
+    def settings_enabled(self, **overrides):
+        return self.settings(API_PROFILING={
+            'ENABLED': True, 'SLOW_QUERY_MS': 10_000, 'PROFILE_ROUTES': [], 'PROFILE_DIR': self.profile_dir.name, **overrides,
+        })
+
+    def test_disabled_by_default(self):
+        response = APIClient().get('/api/v1/blogs/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_server_timing_phases(self):
+        with self.settings_enabled():
+            response = APIClient().get('/api/v1/blogs/?q=profiling')
+        metrics = {metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')}
+        self.assertEqual(set(metrics), {'db', 'filter', 'serialize', 'render', 'total'})
+        self.assertIn('desc="', metrics['db'])
+
+    def test_slow_query_log_with_plan(self):
+        with self.settings_enabled(SLOW_QUERY_MS=0), self.assertLogs('api.slow_queries', 'WARNING') as logs:
+            APIClient().get('/api/v1/comments/')
+        self.assertTrue(any('plan:' in line for line in logs.output))
+
+    def test_sampled_cprofile_dump(self):
+        with self.settings_enabled(PROFILE_ROUTES=['blogs_View'], PROFILE_SAMPLE_RATE=1.0):
+            APIClient().get('/api/v1/comments/')
+            self.assertEqual(os.listdir(self.profile_dir.name), [])
+            with self.assertLogs('api.profiling', 'INFO'):
+                APIClient().get('/api/v1/blogs/')
+        self.assertEqual(len(os.listdir(self.profile_dir.name)), 1)
+
+
+class SparseFieldsetTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create(student_id='S001', name='Anna', branch='CS')
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'EMP{i:03}', emp_name=f'Employee {i}', designation='Manager') for i in range(1, 6)
+        )
+
+    def test_fast_path_selects_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/v1/employees/?fields=emp_id&page_size=5')
+        self.assertEqual(response.data['results'][0], {'emp_id': 'EMP001'})
+        sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('emp_name', sql)
+        self.assertNotIn('designation', sql)
+
+    def test_keyset_pagination_without_id_field(self):
+        response = self.client.get('/api/v1/employees/?pagination=keyset&page_size=3&fields=emp_name')
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['emp_name'] for item in response.data['results']], ['Employee 4', 'Employee 5'])
+
+    def test_students_function_views_and_stream(self):
+        response = self.client.get('/api/v1/students/?exclude=updated_at,branch')
+        self.assertEqual(response.data['results'][0], {'id': self.student.pk, 'student_id': 'S001', 'name': 'Anna'})
+        response = self.client.get(f'/api/v1/students/{self.student.pk}/?fields=name')
+        self.assertEqual(response.data, {'name': 'Anna'})
+        response = self.client.get('/api/v1/students/?stream=ndjson&fields=student_id')
+        self.assertEqual(b''.join(response.streaming_content), b'{"student_id":"S001"}\n')
+
+    def test_different_fields_are_cached_separately(self):
+        self.assertEqual(list(self.client.get('/api/v1/employees/?fields=id').data['results'][0]), ['id'])
+        self.assertEqual(list(self.client.get('/api/v1/employees/?fields=emp_id').data['results'][0]), ['emp_id'])
+
+    async def test_async_views(self):
+        response = await self.async_client.get('/api/v1/async/students/', {'fields': 'name'})
+        self.assertEqual(response.json()['results'], [{'name': 'Anna'}])
+        response = await self.async_client.get('/api/v1/async/employees/', {'fields': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportDataTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def test_csv_with_worker_pools(self):
+        rows = ''.join(f'S{i:03},"Student, {i}",CS\n' for i in range(25))
+        path = self.write('students.csv', '\ufeffstudent_id,name,branch\n' + rows)
+        for pool in ('thread', 'process'):
+            Student.objects.all().delete()
+            result = import_file('students', path, batch_size=4, workers=3, pool=pool)
+            self.assertEqual((result.rows, result.created, result.invalid), (25, 25, 0))
+            self.assertEqual(list(Student.objects.order_by('pk').values_list('name', flat=True)[:2]), ['Student, 0', 'Student, 1'])
+            self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_ndjson_invalid_rows_are_reported(self):
+        path = self.write('employees.ndjson', '\n'.join([
+            json.dumps({'emp_id': 'EMP001', 'emp_name': 'John', 'designation': 'Manager', 'id': 999}),
+            '{broken',
+            json.dumps({'emp_id': 'EMP002', 'emp_name': 'x' * 51, 'designation': 'Manager'}),
+            json.dumps({'emp_id': 'EMP003', 'emp_name': 'Jane', 'designation': 'Developer'}),
+        ]))
+        errors = []
+        result = import_file('employees', path, batch_size=2, workers=0, on_error=lambda number, detail: errors.append(number))
+        self.assertEqual((result.created, result.invalid), (2, 2))
+        self.assertEqual(errors, [1, 2])
+        # id ist read-only -> wird ignoriert
+        self.assertFalse(Employee.objects.filter(pk=999).exists())
+
+    def test_duplicate_emp_ids_are_invalid(self):
+        Employee.objects.create(emp_id='EMP001', emp_name='John', designation='Manager')
+        path = self.write('employees.ndjson', '\n'.join(
+            json.dumps({'emp_id': emp_id, 'emp_name': 'Jane', 'designation': 'Developer'})
+            for emp_id in ('EMP001', 'EMP002', 'EMP003', 'EMP002', 'EMP004')
+        ))
+        errors = []
+        result = import_file('employees', path, batch_size=2, workers=0, on_error=lambda number, detail: errors.append((number, list(detail))))
+        self.assertEqual((result.created, result.invalid), (3, 2))
+        self.assertEqual(errors, [(0, ['emp_id']), (3, ['emp_id'])])
+        self.assertEqual(list(Employee.objects.order_by('emp_num').values_list('emp_num', flat=True)), [1, 2, 3, 4])
+
+    def test_resume_from_checkpoint(self):
+        path = self.write('blogs.ndjson', ''.join(json.dumps({'blog_title': f'Blog {i}', 'blog_body': 'Body'}) + '\n' for i in range(6)))
+        write_checkpoint(f'{path}.checkpoint', {'source': os.path.abspath(path), 'resource': 'blogs', 'rows': 4, 'created': 4, 'invalid': 0})
+        result = import_file('blogs', path, resume=True)
+        self.assertEqual((result.rows, result.created, result.skipped), (6, 6, 4))
+        self.assertEqual(list(Blog.objects.values_list('blog_title', flat=True)), ['Blog 4', 'Blog 5'])
+
+    def test_command_stops_after_max_errors(self):
+        path = self.write('students.csv', 'student_id,name,branch\nS1,,CS\nS2,,CS\nS3,Anna,CS\n')
+        errors = os.path.join(self.directory.name, 'errors.ndjson')
+        with self.assertRaises(CommandError):
+            call_command('import_data', 'students', path, '--batch-size', '2', '--max-errors', '1', '--errors', errors, stdout=io.StringIO(), stderr=io.StringIO())
+        with open(errors) as file:
+            self.assertEqual([json.loads(line)['row'] for line in file], [1, 2])
+        self.assertTrue(os.path.exists(f'{path}.checkpoint'))
+
+        out = io.StringIO()
+        call_command('import_data', 'students', path, '--resume', stdout=out)
+        self.assertIn('Imported 1 students from 3 rows', out.getvalue())
+        self.assertEqual(list(Student.objects.values_list('name', flat=True)), ['Anna'])
+
+
+class BatchRequestTest(ApiTestCase):
+    url = '/api/v1/batch/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.blog = Blog.objects.create(blog_title='Blog', blog_body='Body')
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'EMP{i:03}', emp_name=f'Employee {i}', designation='Manager' if i % 2 else 'Developer') for i in range(1, 6)
+        )
+
+    def batch(self, requests, **options):
+        response = self.client.post(self.url, {'requests': requests, **options}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(response.content)['responses']
+
+    def test_sequential_writes_and_reads(self):
+        responses = self.batch([
+            {'id': 'create', 'method': 'POST', 'path': '/api/v1/comments/', 'body': {'blog': self.blog.pk, 'comment': 'Hallo'}},
+            {'id': 'blog', 'path': f'/api/v1/blogs/{self.blog.pk}/?fields=comment_count'},
+            {'id': 'managers', 'path': '/api/v1/employees/?designation=manager&fields=emp_id'},
+            {'id': 'missing', 'path': '/api/v1/blogs/999999/'},
+        ])
+        self.assertEqual([(item['id'], item['status']) for item in responses], [('create', 201), ('blog', 200), ('managers', 200), ('missing', 404)])
+        self.assertEqual(responses[1]['body'], {'comment_count': 1})
+        self.assertEqual(responses[2]['body']['count'], 3)
+        self.assertEqual(responses[2]['body']['results'], [{'emp_id': 'EMP001'}, {'emp_id': 'EMP003'}])
+        self.assertIn('ETag', responses[1]['headers'])
+
+    def test_head_has_no_body(self):
+        responses = self.batch([{'method': 'HEAD', 'path': f'/api/v1/blogs/{self.blog.pk}/'}])
+        self.assertEqual(responses[0]['status'], 200)
+        self.assertIsNone(responses[0]['body'])
+        self.assertIn('ETag', responses[0]['headers'])
+
+    def test_invalid_filter_is_client_error(self):
+        responses = self.batch([{'path': '/api/v1/async/employees/?id_min=abc'}, {'path': '/api/v1/employees/?id_max=abc'}])
+        self.assertEqual([item['status'] for item in responses], [400, 400])
+
+    def test_conditional_headers_per_item(self):
+        path = f'/api/v1/blogs/{self.blog.pk}/'
+        etag = self.batch([{'path': path}])[0]['headers']['ETag']
+        responses = self.batch([{'path': path, 'headers': {'If-None-Match': etag}}, {'path': path}])
+        self.assertEqual([item['status'] for item in responses], [304, 200])
+        self.assertIsNone(responses[0]['body'])
+
+    def test_invalid_batches(self):
+        for requests in ([], [{'path': '/admin/'}], [{'path': '/api/v1/nope/'}], [{'path': self.url}], [{'path': '/api/v1/students/'}] * 26):
+            response = self.client.post(self.url, {'requests': requests}, format='json')
+            self.assertEqual(response.status_code, 400, requests)
+
+    def test_streaming_and_async_routes(self):
+        responses = self.batch([{'path': '/api/v1/employees/export/'}, {'path': f'/api/v1/async/blogs/{self.blog.pk}/'}])
+        self.assertEqual([item['status'] for item in responses], [400, 200])
+        self.assertEqual(responses[1]['body']['blog_title'], 'Blog')
+
+
+# Parallele Sub-Requests laufen in eigenen Threads mit eigener Datenbankverbindung -> die Testdaten müssen committed sein
+class ParallelBatchRequestTest(ApiTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        Student.objects.create(student_id='S001', name='Anna', branch='CS')
+        self.blog = Blog.objects.create(blog_title='Blog', blog_body='Body')
+
+    def test_parallel_reads(self):
+        requests = [{'id': str(i), 'path': path} for i, path in enumerate(['/api/v1/students/', f'/api/v1/blogs/{self.blog.pk}/'] * 3)]
+        response = APIClient().post('/api/v1/batch/', {'requests': requests, 'parallel': True}, format='json')
+        responses = json.loads(response.content)['responses']
+        self.assertEqual([item['id'] for item in responses], [str(i) for i in range(6)])
+        self.assertTrue(all(item['status'] == 200 for item in responses))
+        self.assertEqual(responses[0]['body']['results'][0]['name'], 'Anna')
+        self.assertEqual(responses[5]['body']['blog_title'], 'Blog')
+
+
+class ChangesFeedTest(ApiTestCase):
+    def changes(self, resource, since, **params):
+        response = self.client.get(f'/api/v1/{resource}/changes/', {'since': since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_delta_with_tombstones(self):
+        Employee.objects.create(emp_id='EMP001', emp_name='Old', designation='Manager')
+        token = self.client.get('/api/v1/employees/changes/').data['next']
+        self.assertEqual(self.changes('employees', token)['changes'], [])
+
+        first = Employee.objects.create(emp_id='EMP002', emp_name='John', designation='Manager')
+        second = Employee.objects.create(emp_id='EMP003', emp_name='Jane', designation='Developer')
+        first.emp_name = 'Johnny'
+        first.save()
+        second_pk = second.pk
+        second.delete()
+
+        feed = self.changes('employees', token)
+        self.assertEqual([(change['id'], change['action']) for change in feed['changes']], [(first.pk, 'update'), (second_pk, 'delete')])
+        self.assertEqual(feed['changes'][0]['data']['emp_name'], 'Johnny')
+        self.assertIsNone(feed['changes'][1]['data'])
+        self.assertEqual(self.changes('employees', feed['next'])['changes'], [])
+
+    def test_bulk_paths_and_paging(self):
+        # bulk_saved kommt erst nach dem Commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/v1/employees/bulk/', [
+                {'emp_id': f'EMP{i:03}', 'emp_name': f'Employee {i}', 'designation': 'Manager'} for i in range(5)
+            ], format='json')
+        feed = self.changes('employees', 0, limit=3)
+        self.assertEqual([change['action'] for change in feed['changes']], ['create'] * 3)
+        self.assertTrue(feed['has_more'])
+        feed = self.changes('employees', feed['next'], limit=3)
+        self.assertEqual(len(feed['changes']), 2)
+        self.assertFalse(feed['has_more'])
+
+        self.client.delete('/api/v1/employees/bulk/?designation=manager')
+        self.assertEqual({change['action'] for change in self.changes('employees', feed['next'])['changes']}, {'delete'})
+
+    def test_comments_update_their_blog(self):
+        blog = Blog.objects.create(blog_title='Blog', blog_body='Body')
+        token = self.changes('blogs', 0)['next']
+        Comment.objects.create(blog=blog, comment='Hallo')
+        feed = self.changes('blogs', token)
+        self.assertEqual(feed['changes'][0]['data']['comment_count'], 1)
+        self.assertEqual(len(self.changes('comments', 0)['changes']), 1)
+
+    def test_compaction(self):
+        student = Student.objects.create(student_id='S001', name='Anna', branch='CS')
+        for name in ('Ben', 'Clara'):
+            student.name = name
+            student.save()
+        result = compact()
+        self.assertEqual(result, {'superseded': 2, 'expired': 0})
+        self.assertEqual(self.changes('students', 0)['changes'][0]['data']['name'], 'Clara')
+
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timezone.timedelta(days=31))
+        Student.objects.create(student_id='S002', name='Ben', branch='CS')
+        self.assertEqual(compact(), {'superseded': 0, 'expired': 1})
+        watermark = ChangeLogWatermark.objects.get(resource='students').seq
+        response = self.client.get('/api/v1/students/changes/', {'since': 0})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.data['watermark'], watermark)
+        self.assertEqual(len(self.changes('students', watermark)['changes']), 1)
+
+    def test_compact_command(self):
+        student = Student.objects.create(student_id='S001', name='Anna', branch='CS')
+        student.save()
+        out = io.StringIO()
+        call_command('compact_changes', stdout=out)
+        self.assertIn('Removed 1 superseded and 0 expired entries', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('compact_changes', days=-1, stdout=io.StringIO())
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get('/api/v1/blogs/changes/?since=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/blogs/changes/?since=0&limit=5000').status_code, 400)
+
+
+class CountPaginationTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Blog.objects.create(blog_title=f'Blog {i}', blog_body='Body')
+
+    def test_count_is_cached_per_filter_set(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get('/api/v1/blogs/?limit=2&exclude=comments')
+        self.assertEqual(response.data['count'], 5)
+        self.assertNotIn('has_more', response.data)
+        # Andere Seite und Sortierung -> gleiche Filter, das COUNT kommt aus dem Cache
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get('/api/v1/blogs/?limit=2&offset=2&order-by=-id&exclude=comments')
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertEqual(response.data['count'], 5)
+
+        Blog.objects.create(blog_title='Blog 5', blog_body='Body')
+        self.assertEqual(self.client.get('/api/v1/blogs/?limit=2&offset=4').data['count'], 6)
+
+    def test_unordered_queryset_is_paged_by_pk(self):
+        # EmployeeViewset hat ein unsortiertes Queryset -> die Seiten werden nach dem Primary Key gebildet
+        employees = Employee.objects.bulk_create(Employee(emp_id=f'EMP{i:03}', emp_name=f'E {i}', designation='Dev') for i in range(5))
+        ids = []
+        for number in (1, 2, 3):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/v1/employees/', {'count': 'false', 'page-number': number})
+            ids += [employee['id'] for employee in response.data['results']]
+            self.assertIn('ORDER BY', queries.captured_queries[-1]['sql'])
+        self.assertEqual(ids, [employee.pk for employee in employees])
+
+    def test_opt_out(self):
+        response = self.client.get('/api/v1/blogs/?limit=2&count=false')
+        self.assertIsNone(response.data['count'])
+        self.assertTrue(response.data['has_more'])
+        self.assertIn('offset=2', response.data['next'])
+        response = self.client.get('/api/v1/blogs/?limit=2&offset=4&count=false')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertFalse(response.data['has_more'])
+        self.assertIsNone(response.data['next'])
+
+    @override_settings(API_PAGINATION={'COUNT_THRESHOLD': 3})
+    def test_threshold(self):
+        response = self.client.get('/api/v1/blogs/?limit=2')
+        self.assertIsNone(response.data['count'])
+        self.assertTrue(response.data['has_more'])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE blogs_blog')
+        get_cache().clear()
+        response = self.client.get('/api/v1/blogs/?limit=2')
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(response.data['count_estimated'])
+        # Gefiltert gibt es keine Schätzung
+        response = self.client.get('/api/v1/blogs/?limit=2&comments_max=0')
+        self.assertIsNone(response.data['count'])
+        # Unter der Schwelle -> exakt
+        self.assertEqual(self.client.get('/api/v1/blogs/?limit=2&q=Blog+1').data['count'], 1)
+
+    def test_page_number_pagination(self):
+        for i in range(3):
+            Employee.objects.create(emp_id=f'EMP{i:03}', emp_name=f'Employee {i}', designation='Manager')
+        response = self.client.get('/api/v1/employees/?page-number=2')
+        self.assertEqual(response.data['count'], 3)
+        response = self.client.get('/api/v1/employees/?page-number=2&count=false')
+        self.assertIsNone(response.data['count'])
+        self.assertFalse(response.data['has_more'])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertTrue(self.client.get('/api/v1/employees/?count=false').data['has_more'])
+        self.assertEqual(self.client.get('/api/v1/employees/?page-number=3&count=false').status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/employees/?page-number=last&count=false').status_code, 404)
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for index in INDEXES.values():
+            index.unload()
+        for i, name in enumerate(['Hans Müller', 'Anna Annabelle', 'Hannah Schmidt', 'Hans', 'Peter Hansen']):
+            Employee.objects.create(emp_id=f'EMP{i:03}', emp_name=name, designation='Developer')
+        self.index = INDEXES['employees']
+        self.index.load()
+
+    def names(self, prefix, limit=10):
+        return [label for pk, label in self.index.search(prefix, limit)]
+
+    def test_prefix_search_without_queries(self):
+        with self.assertNumQueries(0):
+            # Anfang des Namens vor späteren Wörtern, jeweils alphabetisch
+            self.assertEqual(self.names('han'), ['Hannah Schmidt', 'Hans', 'Hans Müller', 'Peter Hansen'])
+            self.assertEqual(self.names('hans'), ['Hans', 'Hans Müller', 'Peter Hansen'])
+            self.assertEqual(self.names('  HANS   m'), ['Hans Müller'])
+            self.assertEqual(self.names('mül'), ['Hans Müller'])
+            self.assertEqual(self.names('ann'), ['Anna Annabelle'])
+            self.assertEqual(self.names('h', limit=2), ['Hannah Schmidt', 'Hans'])
+            self.assertEqual(self.names('xyz'), [])
+            self.assertEqual(self.names(''), [])
+
+    def test_signals_update_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            employee = Employee.objects.create(emp_id='EMP010', emp_name='Hanna', designation='Intern')
+        self.assertEqual(self.names('hanna'), ['Hanna', 'Hannah Schmidt'])
+        self.assertEqual(self.names('h', limit=1), ['Hanna'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.emp_name = 'Ha'
+            employee.save()
+        self.assertEqual(self.names('h', limit=1), ['Ha'])
+        self.assertEqual(self.names('hanna'), ['Hannah Schmidt'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+        self.assertEqual(self.names('h', limit=1), ['Hannah Schmidt'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/v1/employees/bulk/', [
+                {'emp_id': f'NEW{i}', 'emp_name': f'Zoe {i}', 'designation': 'Intern'} for i in range(3)
+            ], format='json')
+        self.assertEqual(self.names('zoe'), ['Zoe 0', 'Zoe 1', 'Zoe 2'])
+
+    def test_rollback_is_not_indexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Employee.objects.create(emp_id='EMP010', emp_name='Ghost', designation='Intern')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(self.names('ghost'), [])
+
+    def test_sync_from_change_log(self):
+        # Änderung durch einen anderen Prozess -> kein Signal in diesem Prozess, aber ein Eintrag im Change Log
+        employee = Employee.objects.bulk_create([Employee(emp_id='EMP010', emp_name='Olga', designation='Intern')])[0]
+        ChangeLogEntry.objects.create(resource='employees', object_id=employee.pk, action=ChangeLogEntry.CREATE)
+        self.assertEqual(self.names('olga'), [])
+        autocomplete.sync_indexes()
+        self.assertEqual(self.names('olga'), ['Olga'])
+
+    def test_reload_after_compaction(self):
+        # Die Einträge seit dem letzten Abgleich wurden kompaktiert (Marke über self.seq) -> der Index wird neu geladen
+        Employee.objects.bulk_create([Employee(emp_id='EMP010', emp_name='Olga', designation='Intern')])
+        Employee.objects.filter(emp_name='Hans').delete()
+        watermark = ChangeLogWatermark.objects.create(resource='employees', seq=self.index.seq + 100).seq
+        autocomplete.sync_indexes()
+        self.assertEqual(self.names('olga'), ['Olga'])
+        self.assertEqual(self.names('hans'), ['Hans Müller', 'Peter Hansen'])
+        # Danach wieder normale Abgleiche über das Change Log
+        self.assertEqual(self.index.seq, watermark)
+
+    def test_warm_search_does_not_sync(self):
+        # Abgleich fällig, aber nicht im Request -> das macht der Sync-Thread
+        self.index.synced_at = 0
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/employees/autocomplete/', {'q': 'han'})
+
+    def test_sync_on_request(self):
+        employee = Employee.objects.bulk_create([Employee(emp_id='EMP010', emp_name='Olga', designation='Intern')])[0]
+        ChangeLogEntry.objects.create(resource='employees', object_id=employee.pk, action=ChangeLogEntry.CREATE)
+        with override_settings(API_AUTOCOMPLETE={'SYNC_ON_REQUEST': True}):
+            # Innerhalb von SYNC_INTERVAL -> keine Query
+            with self.assertNumQueries(0):
+                self.assertEqual(self.names('olga'), [])
+            self.index.synced_at = 0
+            self.assertEqual(self.names('olga'), ['Olga'])
+
+    def test_sync_thread(self):
+        called = threading.Event()
+        with mock.patch.object(autocomplete, 'sync_indexes', side_effect=called.set):
+            with override_settings(API_AUTOCOMPLETE={'SYNC_INTERVAL': 0.01}):
+                autocomplete.start_sync_thread()
+                self.addCleanup(autocomplete.stop_sync_thread)
+                # Läuft schon -> kein zweiter Thread
+                thread = autocomplete._sync_thread
+                autocomplete.start_sync_thread()
+                self.assertIs(autocomplete._sync_thread, thread)
+            self.assertTrue(called.wait(10))
+            autocomplete.stop_sync_thread()
+        self.assertIsNone(autocomplete._sync_thread)
+
+    def test_endpoints(self):
+        response = self.client.get('/api/v1/employees/autocomplete/', {'q': 'han', 'limit': 2})
+        self.assertEqual([item['emp_name'] for item in response.data['results']], ['Hannah Schmidt', 'Hans'])
+        self.assertEqual(self.client.get('/api/v1/employees/autocomplete/', {'q': 'han', 'limit': 500}).status_code, 400)
+
+        blog = Blog.objects.create(blog_title='Django Tipps', blog_body='Body')
+        response = self.client.get('/api/v1/blogs/autocomplete/', {'q': 'tip'})
+        self.assertEqual(response.data['results'], [{'id': blog.pk, 'blog_title': 'Django Tipps'}])
+
+
+class BusinessKeyLookupTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.employees = Employee.objects.bulk_create(
+            Employee(emp_id=f'EMP00{i}', emp_name=f'Employee {i}', designation='Manager') for i in range(1, 4)
+        )
+        self.student = Student.objects.create(student_id='S001', name='Anna', branch='CS')
+
+    def test_employee_detail(self):
+        response = self.client.get('/api/v1/employees/by-emp-id/EMP002/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], self.employees[1].pk)
+        self.assertIn('ETag', response)
+        self.assertEqual(self.client.get('/api/v1/employees/by-emp-id/EMP999/').status_code, 404)
+
+        response = self.client.patch('/api/v1/employees/by-emp-id/EMP002/', {'designation': 'Intern'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/employees/by-emp-id/EMP002/').data['designation'], 'Intern')
+        self.assertEqual(self.client.delete('/api/v1/employees/by-emp-id/EMP002/').status_code, 204)
+        self.assertFalse(Employee.objects.filter(emp_id='EMP002').exists())
+
+    def test_student_detail(self):
+        response = self.client.get('/api/v1/students/by-student-id/S001/', {'fields': 'name'})
+        self.assertEqual(response.data, {'name': 'Anna'})
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/v1/students/by-student-id/S001/?fields=name', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/v1/students/by-student-id/S999/').status_code, 404)
+
+    def test_batch_uses_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/employees/by-emp-id/', {'ids': 'EMP003,EMP999,EMP001,EMP003', 'fields': 'emp_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'results': [{'emp_name': 'Employee 3'}, {'emp_name': 'Employee 1'}], 'missing': ['EMP999']})
+        # Validatoren (Conditional GET) + die Zeilen selbst
+        self.assertEqual(len(queries), 2)
+
+        response = self.client.get('/api/v1/students/by-student-id/?ids=S001&ids=S002')
+        self.assertEqual([item['student_id'] for item in response.data['results']], ['S001'])
+        self.assertEqual(response.data['missing'], ['S002'])
+
+    def test_batch_validation(self):
+        self.assertEqual(self.client.get('/api/v1/employees/by-emp-id/').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/students/by-student-id/', {'ids': ' , '}).status_code, 400)
+        ids = ','.join(f'EMP{i}' for i in range(1001))
+        self.assertEqual(self.client.get('/api/v1/employees/by-emp-id/', {'ids': ids}).status_code, 400)
+
+    def test_student_id_is_unique(self):
+        response = self.client.post('/api/v1/students/', {'student_id': 'S001', 'name': 'Ben', 'branch': 'EE'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('student_id', response.data)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite' and settings.SQLITE_PROFILE == 'tuned', 'tuned SQLite profile only')
+class SQLiteProfileTest(TestCase):
+    # PRAGMA synchronous liefert eine Zahl statt des Namens
+    SYNCHRONOUS = {'OFF': 0, 'NORMAL': 1, 'FULL': 2, 'EXTRA': 3}
+
+    def pragma(self, cursor, name):
+        return cursor.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_pragmas_on_connection(self):
+        pragmas = settings.SQLITE_PRAGMAS
+        with connection.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, 'synchronous'), self.SYNCHRONOUS[pragmas['synchronous'].upper()])
+            self.assertEqual(self.pragma(cursor, 'foreign_keys'), 1)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_journal_mode_on_file_database(self):
+        # Die Testdatenbank liegt im Speicher und kennt kein WAL -> gleiche Settings, aber eine Datei als Datenbank
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = connections['default'].__class__({**connection.settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')})
+            try:
+                with wrapper.cursor() as cursor:
+                    self.assertEqual(self.pragma(cursor, 'journal_mode'), settings.SQLITE_PRAGMAS['journal_mode'].lower())
+                    self.assertEqual(self.pragma(cursor, 'synchronous'), self.SYNCHRONOUS[settings.SQLITE_PRAGMAS['synchronous'].upper()])
+            finally:
+                wrapper.close()
@@ -1,5 +1,5 @@
 from django.urls import path, include
-from . import views
+from . import async_views, autocomplete, batch, changes, views
 from rest_framework.routers import DefaultRouter
 
 # Viewset Routing -> mithilfe des DefaultRouter() Objekts werden die URLs für den Aufruf einzelner employees und der employeeListe automatisch erzeugt, sodass man nur noch
@@ -12,18 +12,55 @@ urlpatterns = [
     path('students/', views.studentsView, name='students_View'),
     path('students/<int:pk>/', views.studentDetailView, name='student_Detail_View'),
 
+    # Lookup über den fachlichen Schlüssel (siehe lookups.py)
+    path('students/by-student-id/', views.studentsByKeyView, name='students_By_Key_View'),
+    path('students/by-student-id/<str:student_id>/', views.studentDetailView, name='student_By_Key_View'),
+
     # Class Based View
     # path('employees/', views.Employees.as_view(), name='employees_View'),
     # path('employees/<int:pk>/', views.EmployeeDetailView.as_view(), name='employee_Detail_View'),
 
+    # Delta-Sync (siehe changes.py) -> vor dem Router, sonst würde 'changes' als <pk> von employees/<pk>/ gelesen
+    path('students/changes/', changes.ChangesView.as_view(resource='students'), name='students_Changes_View'),
+    path('employees/changes/', changes.ChangesView.as_view(resource='employees'), name='employees_Changes_View'),
+    path('blogs/changes/', changes.ChangesView.as_view(resource='blogs'), name='blogs_Changes_View'),
+    path('comments/changes/', changes.ChangesView.as_view(resource='comments'), name='comments_Changes_View'),
+
+    # Autocomplete aus dem Prefix-Index im Speicher (siehe autocomplete.py) -> ebenfalls vor dem Router
+    path('employees/autocomplete/', autocomplete.AutocompleteView.as_view(resource='employees'), name='employees_Autocomplete_View'),
+    path('blogs/autocomplete/', autocomplete.AutocompleteView.as_view(resource='blogs'), name='blogs_Autocomplete_View'),
+
+    # Einzelner Employee über die emp_id -> dasselbe Viewset, nur mit lookup_field='emp_id' (vor dem Router, siehe lookups.py)
+    # Die Batch-Variante employees/by-emp-id/?ids= ist eine Action des Viewsets
+    path('employees/by-emp-id/<str:emp_id>/', views.EmployeeViewset.as_view(
+        {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}, lookup_field='emp_id',
+    ), name='employee_By_Key_View'),
+
     # Viewset Routing
     path('', include(router.urls)),
 
     # Blogs
     path('blogs/', views.BlogView.as_view(), name='blogs_View'),
+    path('blogs/export/', views.BlogExportView.as_view(), name='blogs_Export_View'),
     path('comments/', views.CommentsView.as_view(), name='comments_View'),
 
     # Blog Detail
     path('blogs/<int:pk>/', views.BlogDetailView.as_view(), name='blog_Detail_View'),
     path('comments/<int:pk>/', views.CommentDetailView.as_view(), name='comment_Detail_View'),
+
+    # Async Views (nur GET) -> laufen unter ASGI direkt im Event Loop (siehe async_views.py)
+    path('async/students/', async_views.studentsView, name='async_students_View'),
+    path('async/students/<int:pk>/', async_views.studentDetailView, name='async_student_Detail_View'),
+    path('async/employees/', async_views.employeesView, name='async_employees_View'),
+    path('async/employees/<int:pk>/', async_views.employeeDetailView, name='async_employee_Detail_View'),
+    path('async/blogs/', async_views.blogsView, name='async_blogs_View'),
+    path('async/blogs/<int:pk>/', async_views.blogDetailView, name='async_blog_Detail_View'),
+    path('async/comments/', async_views.commentsView, name='async_comments_View'),
+    path('async/comments/<int:pk>/', async_views.commentDetailView, name='async_comment_Detail_View'),
+
+    # Mehrere Requests in einem (siehe batch.py)
+    path('batch/', batch.batchView, name='batch_View'),
+
+    # Response Cache
+    path('cache/stats/', views.cacheStatsView, name='cache_Stats_View'),
 ]
\ No newline at end of file
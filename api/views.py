@@ -4,16 +4,29 @@ from students.models import Student
 from .serializers import StudentSerializer
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from django.db import transaction
 from rest_framework.decorators import api_view
 from rest_framework.views import APIView
-from employees.models import Employee
-from .serializers import EmployeeSerializer
+from employees.models import DesignationFacet, Employee
+from .serializers import EmployeeSerializer, get_values_list_representation
 from django.http import Http404
 from rest_framework import mixins, generics, viewsets
 from blogs.models import Blog, Comment
 from blogs.serializers import BlogSerializer, CommentSerializer
-from .paginations import CustomPagination
+from .paginations import CustomPagination, KeysetPaginationMixin
+from .streaming import ExportMixin, get_stream_format, iter_representations, streaming_response
+from .cache import ResponseCacheMixin, cache_response, cached_response, get_stats
+from .conditional import ConditionalGetMixin, conditional_get, conditional_response
+from .signals import bulk_deleted
+from rest_framework.settings import api_settings
+from employees.facets import add_labels, count_designations
 from employees.filters import EmployeeFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from blogs.filters import BlogFilter, FullTextSearchFilter
+from .lookups import keys_response
+from .fieldsets import SparseFieldsetMixin, get_fieldset, get_ordering_columns, project_queryset, trim_serializer
 
 # SearchFilter und OrderingFilter
 from rest_framework.filters import SearchFilter, OrderingFilter
@@ -22,6 +35,8 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 '''FUNCTION BASED VIEWS'''
 # API-View, die get und post akzeptiert
 @api_view(['GET', 'POST'])
+@cache_response(Student)
+@conditional_get(Student)
 def studentsView(request):
     '''Serialization: Objekte aus der Datenbank, also hier die Students, werden in ein Format umgewandelt, 
     das an das Frontend geschickt werden kann, meist JSON. Serializer sind sozusagen Übersetzer.
@@ -44,11 +59,30 @@ def studentsView(request):
 
     if request.method == 'GET':
         # Get all students from DB -> Studenten werden als QuerySet aus DB gezogen
-        students = Student.objects.all()
+        # order_by('pk') -> stabile Reihenfolge für Pagination und Streaming
+        students = Student.objects.order_by('pk')
+
+        # Sparse Fieldsets: ?fields= / ?exclude= -> nur diese Felder werden ausgegeben und aus der DB gelesen (siehe fieldsets.py)
+        fieldset = get_fieldset(request.query_params, StudentSerializer)
+
+        # Streaming: ?stream=json oder ?stream=ndjson -> die Studenten werden in Chunks aus der DB gelesen und direkt geschrieben
+        # Der Speicherverbrauch bleibt dadurch konstant, egal wie groß die Tabelle ist (siehe streaming.py)
+        stream_format = get_stream_format(request)
+        if stream_format:
+            return streaming_response(iter_representations(students, StudentSerializer, fieldset=fieldset), stream_format)
+
+        # Die globale Pagination aus settings.py greift nur bei Generic Views und Viewsets
+        # -> bei Function Based Views muss der Paginator selbst erzeugt und aufgerufen werden
+        # Read-only Fast Path: die Zeilen werden per values_list() geholt und ohne Model-Objekte serialisiert (siehe serializers.py)
+        representation = get_values_list_representation(StudentSerializer, fieldset)
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        page = paginator.paginate_queryset(representation.values_list(students), request)
+        if page is not None:
+            return paginator.get_paginated_response(representation.represent(page))
 
         # many=True -> mehrere Students werden übergeben -> ohne many=True erwartet der Serializer ein einzelnes Objekt
         # In dieser Zeile macht der StudentSerializer aus den Studenten-QuerySet ein Serializer-Objekt. Die Daten sind als Dictionary-Liste in serializer.data
-        serializer = StudentSerializer(students, many=True)
+        serializer = trim_serializer(StudentSerializer(project_queryset(students, StudentSerializer, fieldset), many=True), fieldset)
 
         # serializer.data = Liste aus Dictionaries
         # Daten werden als JSON zurückgeben
@@ -69,11 +103,18 @@ def studentsView(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
+# Lookup über den Primary Key (students/<pk>/) oder die student_id (students/by-student-id/<student_id>/, siehe lookups.py)
 @api_view(['GET', 'PUT', 'DELETE'])
-def studentDetailView(request, pk):
+@cache_response(Student)
+@conditional_get(Student, lookup_fields=('pk', 'student_id'))
+def studentDetailView(request, pk=None, student_id=None):
+    # Sparse Fieldsets beim Lesen: ?fields= / ?exclude= -> nur diese Felder werden ausgegeben und aus der DB gelesen
+    fieldset = get_fieldset(request.query_params, StudentSerializer) if request.method == 'GET' else None
+
     try:
-        # Student mit dem entsprechenden Primary Key als einzelnes Objekt aus der DB ziehen
-        student = Student.objects.get(pk=pk)
+        # Student mit dem entsprechenden Primary Key bzw. der student_id (Unique Index) als einzelnes Objekt aus der DB ziehen
+        lookup = {'pk': pk} if student_id is None else {'student_id': student_id}
+        student = project_queryset(Student.objects.all(), StudentSerializer, fieldset).get(**lookup)
     
     # Student mit PK nicht existent -> 404
     except Student.DoesNotExist:
@@ -82,7 +123,7 @@ def studentDetailView(request, pk):
     # Student lesen/Infos aus DB ziehen
     if request.method == 'GET':
         # In dieser Zeile macht der StudentSerializer aus dem Student ein Serializer-Objekt. Die Daten sind als Dictionary in serializer.data
-        serializer = StudentSerializer(student)
+        serializer = trim_serializer(StudentSerializer(student), fieldset)
 
         # Rückgabe der Daten im JSON-Format
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -110,6 +151,14 @@ def studentDetailView(request, pk):
     
     
 
+# Viele Students über ihre student_id mit einer Query -> students/by-student-id/?ids=S001,S002 (siehe lookups.py)
+@api_view(['GET'])
+@cache_response(Student)
+def studentsByKeyView(request):
+    return keys_response(request, Student.objects.all(), 'student_id', StudentSerializer)
+
+
+
 '''CLASS BASED VIEWS'''
 # Class Based Views akzeptieren keinen Decorator. Stattdessen wird innnerhalb der Klasse in Form von Methoden definiert, 
 # was bei den jeweiligen HTTP-Methoden passieren soll
@@ -274,13 +323,48 @@ class EmployeeViewset(viewsets.ViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 '''
 
-class EmployeeViewset(viewsets.ModelViewSet):
+# KeysetPaginationMixin -> mit ?pagination=keyset wird statt der CustomPagination die Keyset Pagination verwendet (siehe paginations.py)
+# Read-only Fast Path für list() -> die Zeilen werden per values_list() geholt und direkt in Dictionaries umgewandelt,
+# ohne Model-Objekte zu erzeugen (siehe ValuesListRepresentation in serializers.py). Filter und Pagination funktionieren wie gewohnt
+# Ist der Serializer dafür nicht geeignet (z.B. verschachtelte Serializer wie beim BlogSerializer), wird das normale list() benutzt
+# Mit ?fields= / ?exclude= (SparseFieldsetMixin) wird nur für die ausgewählten Felder kompiliert -> values_list() liest nur deren Spalten
+class ValuesListMixin:
+    def list(self, request, *args, **kwargs):
+        fieldset = self.get_fieldset() if isinstance(self, SparseFieldsetMixin) else None
+        representation = get_values_list_representation(self.get_serializer_class(), fieldset)
+        if representation is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if fieldset is not None and not set(get_ordering_columns(queryset)) <= set(representation.columns):
+            # Die Keyset Pagination braucht die Sortierspalte in jeder Zeile -> fehlt sie in ?fields=, normaler Weg
+            return super().list(request, *args, **kwargs)
+
+        rows = representation.values_list(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(representation.represent(page))
+        return Response(representation.represent(rows))
+
+
+# ResponseCacheMixin -> GET-Requests auf Liste und Detail werden gecacht, bis sich ein Employee ändert (siehe cache.py)
+# ConditionalGetMixin -> ETag/Last-Modified, bei unveränderten Daten 304 Not Modified (siehe conditional.py)
+# ValuesListMixin -> schneller Read-only Pfad für die Liste
+# ExportMixin -> Export der kompletten gefilterten Liste als Stream unter employees/export/ (siehe streaming.py)
+class EmployeeViewset(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, ValuesListMixin, KeysetPaginationMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    cache_models = (Employee,)
 
     # Custom Pagination implementieren -> festglegt in .paginations.py
     pagination_class = CustomPagination
 
+    # Neben dem globalen DjangoFilterBackend (EmployeeFilter) kann die Liste über ?order-by= sortiert und über ?q= durchsucht werden
+    # Die Keyset Pagination übernimmt diese Sortierung für ihre Cursor
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    search_fields = ['emp_id', 'emp_name', 'designation']
+    ordering_fields = ['id', 'emp_id', 'emp_name']
+
     # Global Filtering implementieren -> festglegt in settings.py
     # Filterung der Employee-Liste nach Designation
     # Problem mit dieser Version: Die Filterung funktioniert nur, wenn der gewünschte Wert 1:1 eingegeben wird
@@ -290,17 +374,187 @@ class EmployeeViewset(viewsets.ModelViewSet):
     # Custom Filter -> implementiert in employees.filters.py
     filterset_class = EmployeeFilter
 
+    # EXPORT
+    # Die komplette Liste in einem Request statt Seite für Seite -> http://127.0.0.1:8000/api/v1/employees/export/?output=csv
+    # Filter, Suche und Sortierung wie bei der Liste, z.B. /employees/export/?designation=manager&order-by=emp_name
+    # ETag/Last-Modified wie bei der Liste -> ein nächtlicher Job bekommt 304, wenn sich nichts geändert hat
+    export_filename = 'employees'
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        return conditional_response(request, self.get_conditional_queryset(), lambda: self.export_response(request))
+
+    # FACETTEN
+    # Anzahl der Employees pro Designation für das Dropdown des Designation-Filters -> http://127.0.0.1:8000/api/v1/employees/facets/
+    # {"designation": [{"value": "manager", "label": "Manager", "count": 12}, ...]} -> value kann direkt als ?designation= benutzt werden
+    # Die übrigen Filter (emp_name, emp_name_prefix, id_min/id_max, ?q=) schränken die Zahlen ein, der Designation-Filter selbst nicht
+    # -> auch bei ausgewählter Designation zeigt das Dropdown die Anzahl der anderen Designations
+    # Ohne Filter kommen die Zahlen aus der vorberechneten Tabelle DesignationFacet (siehe employees/facets.py)
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        return cached_response(
+            f'{self.__class__.__name__}.facets', request, self.get_cache_models(),
+            lambda: Response({'designation': self.get_designation_facets(request)}),
+        )
+
+    def get_designation_facets(self, request):
+        params = request.query_params.copy()
+        params.pop('designation', None)
+        filterset = self.get_valid_filterset(request, params)
+
+        filtered = request.query_params.get(api_settings.SEARCH_PARAM) or self.has_filter_values(filterset)
+        if not filtered:
+            return [
+                {'value': facet.designation, 'label': facet.label, 'count': facet.count}
+                for facet in DesignationFacet.objects.order_by('-count', 'designation')
+            ]
+        # Gefiltert -> GROUP BY lower(designation) über die gefilterten Employees
+        queryset = SearchFilter().filter_queryset(request, filterset.qs, self)
+        return [{'value': item['key'], 'label': item['label'], 'count': item['count']} for item in add_labels(count_designations(queryset))]
+
+    def get_valid_filterset(self, request, params):
+        filterset = self.filterset_class(params, queryset=Employee.objects.all(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset
+
+    @staticmethod
+    def has_filter_values(filterset):
+        # django-filter ignoriert leere Werte (?designation=) -> nur Filter mit Wert zählen
+        return any(value not in (None, '') for value in filterset.form.cleaned_data.values())
+
+    # LOOKUP ÜBER DIE EMP_ID
+    # Einzeln: /employees/by-emp-id/<emp_id>/ -> dieses Viewset mit lookup_field='emp_id' (siehe urls.py), sonst wie /employees/<pk>/
+    # Batch:   /employees/by-emp-id/?ids=EMP001,EMP002 -> alle Employees mit einer Query, nicht gefundene emp_ids unter "missing"
+    @action(detail=False, methods=['get'], url_path='by-emp-id')
+    def by_emp_id(self, request):
+        return cached_response(
+            f'{self.__class__.__name__}.by_emp_id', request, self.get_cache_models(),
+            lambda: keys_response(request, Employee.objects.all(), 'emp_id', self.get_serializer_class()),
+        )
+
+    # BULK OPERATIONEN
+    # Statt tausender einzelner Requests (jeweils mit eigener Transaktion) können viele Employees mit einem Request
+    # angelegt, geändert oder gelöscht werden -> http://127.0.0.1:8000/api/v1/employees/bulk/
+    # POST:         [{"emp_id": "EMP001", ...}, ...]            -> bulk_create()
+    # PUT/PATCH:    [{"id": 1, "designation": "Manager"}, ...]  -> bulk_update(), PATCH = partielle Updates
+    # DELETE:       {"ids": [1, 2, 3]} oder Filter als Queryparameter (z.B. ?designation=intern)
+    # Validiert wird die komplette Liste in einem Durchlauf mit EmployeeSerializer(many=True) -> geschrieben wird nur,
+    # wenn alle Elemente gültig sind. Die Fehler werden pro Element mit dem Index im Request zurückgegeben
+    bulk_max_items = 50000
+    bulk_delete_batch_size = 1000
+
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        data = request.data
+        if not isinstance(data, list) or not data:
+            return Response({'detail': 'Expected a non-empty list of items.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.bulk_max_items:
+            return Response({'detail': f'At most {self.bulk_max_items} items per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=data, many=True)
+        else:
+            # Alle betroffenen Employees mit einer einzigen Query laden, Reihenfolge wie im Request
+            ids = [item.get('id') for item in data if isinstance(item, dict)]
+            existing = Employee.objects.in_bulk([pk for pk in ids if isinstance(pk, int)])
+            instances = [existing[pk] for pk in ids if pk in existing]
+            serializer = self.get_serializer(instances, data=data, many=True, partial=request.method == 'PATCH')
+
+        if not serializer.is_valid():
+            return Response({'errors': serializer.get_item_errors()}, status=status.HTTP_400_BAD_REQUEST)
+
+        objs = serializer.save()
+        if request.method == 'POST':
+            return Response({'created': len(objs), 'ids': [obj.pk for obj in objs]}, status=status.HTTP_201_CREATED)
+        return Response({'updated': len(objs)}, status=status.HTTP_200_OK)
+
+    def bulk_destroy(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return Response({'ids': 'Expected a list of integer ids.'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = Employee.objects.filter(pk__in=ids)
+        else:
+            # Ohne ids muss mindestens ein Filter mit Wert gesetzt sein -> verhindert, dass versehentlich alle Employees gelöscht werden
+            # (auch bei ?designation= ohne Wert, den django-filter einfach ignorieren würde)
+            if not self.has_filter_values(self.get_valid_filterset(request, request.query_params)):
+                return Response({'detail': 'Provide "ids" or at least one filter.'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = self.filter_queryset(self.get_queryset())
+
+        # Batchweise löschen, jeder Batch in einer eigenen Transaktion
+        # _raw_delete() löscht direkt per DELETE ... WHERE id IN (...), ohne jede Zeile einzeln zu laden und post_delete zu verschicken
+        # -> stattdessen ein bulk_deleted Signal pro Batch (Employee hat keine abhängigen Models, Cascades gibt es also nicht)
+        # Bewusst die private API: queryset.delete() würde für Employee (es gibt post_delete Receiver, siehe signals.py) jede Zeile
+        # laden und pro Zeile post_delete verschicken -> genau die Kosten, die der Bulk-Pfad vermeiden soll
+        # _raw_delete() gibt es seit Django 1.x unverändert, bei einem Django-Upgrade deckt EmployeeBulkTest diesen Pfad ab
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                batch = list(queryset.order_by('pk')[:self.bulk_delete_batch_size])
+                if not batch:
+                    break
+                deleted += Employee.objects.filter(pk__in=[obj.pk for obj in batch])._raw_delete(Employee.objects.db)
+            bulk_deleted.send(sender=Employee, instances=batch)
+        return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+
 
 '''BLOG VIEWS'''
+# Die Blogs werden mit ihren Kommentaren ausgeliefert -> damit nicht für jeden Blog eine eigene Kommentar-Query ausgeführt wird (N+1-Problem),
+# werden die Kommentare über BlogQuerySet.prefetch_comments() für die ganze Seite auf einmal geladen
+# Über ?comments_limit= und ?comments_offset= kann die Anzahl der eingebetteten Kommentare pro Blog begrenzt bzw. durchgeblättert werden
+class BlogCommentsMixin:
+    comments_limit_query_param = 'comments_limit'
+    comments_offset_query_param = 'comments_offset'
+
+    def get_comments_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            value = int(value)
+            if value < 0:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({name: 'A non-negative integer is required.'})
+        return value
+
+    def get_queryset(self):
+        limit = self.get_comments_param(self.comments_limit_query_param)
+        offset = self.get_comments_param(self.comments_offset_query_param) or 0
+
+        # Sparse Fieldsets: ohne 'comments' in ?fields= (bzw. mit ?exclude=comments) werden die Kommentare gar nicht erst geladen
+        # -> z.B. ?exclude=comments liefert nur die Anzahl (comment_count) statt aller Kommentare
+        fieldset = self.get_fieldset()
+        queryset = Blog.objects.all()
+        if fieldset is None or 'comments' in fieldset:
+            queryset = queryset.prefetch_comments(limit=limit, offset=offset)
+        return queryset
+
+
 # Wir wollen für Blog und Kommentare nur zwei CRUD-Operationen realisieren: Create (neuen Blog oder Kommentar erstellen) und List (alle Blogs und Kommentare anzeigen)
-class BlogView(generics.ListCreateAPIView):
+class BlogView(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, BlogCommentsMixin, KeysetPaginationMixin, generics.ListCreateAPIView):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
 
+    # Die Blogs enthalten auch ihre Kommentare -> der Cache muss bei Änderungen an beiden Models invalidiert werden
+    # und der ETag muss auch die Kommentare berücksichtigen
+    cache_models = (Blog, Comment)
+    conditional_related = ('comments',)
+
     # SearchFilter und OrderingFilter
-    filter_backends = [SearchFilter, OrderingFilter]
+    # FullTextSearchFilter ersetzt den SearchFilter -> gleicher Queryparameter, aber Suche über den FTS5-Index statt LIKE '%...%'
+    # Ohne ?order-by= werden die Treffer nach Relevanz sortiert (siehe blogs/filters.py)
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
+
+    # Die Relevanz ist keine Spalte -> die Keyset Pagination könnte nur nach id sortieren, ?q= mit ?pagination=keyset gibt deshalb 400
+    keyset_unsupported_params = (api_settings.SEARCH_PARAM,)
 
     # Search Filter implementieren -> die Felder 'blog_title' und 'blog_body' können caseinsensitive durchsucht werden
+    # Beim FullTextSearchFilter werden search_fields nur noch für den Fallback auf andere Datenbanken als SQLite benötigt
     # Die angegebenen Feldnamen müssen mit den Feldnamen im Blog-Model identisch sein
     # Standardmäßig heißt der Queryparameter in der URL 'search' -> http://127.0.0.1:8000/api/v1/blogs/?search=Blog
     # Dies kann aber in settings.py geändert werden
@@ -310,18 +564,44 @@ class BlogView(generics.ListCreateAPIView):
     # Ordering Filter
     # Standardmäßig heißt der Queryparameter in der URL 'ordering' -> http://127.0.0.1:8000/api/v1/blogs/?ordering=blog_title
     # Auch das kann in settings.py geändert werden
-    ordering_fields = ['id', 'blog_title']
+    # comment_count -> ?order-by=-comment_count liefert die meistkommentierten Blogs zuerst (Index auf Blog.comment_count)
+    ordering_fields = ['id', 'blog_title', 'comment_count']
+
+    # BlogFilter -> ?comments_min= und ?comments_max= (siehe blogs/filters.py)
+    filterset_class = BlogFilter
+
+# Export aller (gefilterten) Blogs inklusive Kommentare -> http://127.0.0.1:8000/api/v1/blogs/export/?output=ndjson
+# Gleiche Filter, Suche (?q=) und Sortierung wie BlogView; die Kommentare werden pro Chunk per Prefetch geladen (kein N+1)
+class BlogExportView(ExportMixin, BlogView):
+    http_method_names = ['get', 'head', 'options']
+    export_filename = 'blogs'
 
-class CommentsView(generics.ListCreateAPIView):
+    def get(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_conditional_queryset(), lambda: self.export_response(request), self.conditional_related,
+        )
+
+class CommentsView(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, ValuesListMixin, KeysetPaginationMixin, generics.ListCreateAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    cache_models = (Comment,)
 
-class BlogDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BlogDetailView(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, BlogCommentsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
     lookup_field = 'pk'
+    cache_models = (Blog, Comment)
+    conditional_related = ('comments',)
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailView(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
-    lookup_field = 'pk'
\ No newline at end of file
+    lookup_field = 'pk'
+    cache_models = (Comment,)
+
+
+'''CACHE'''
+# Hit/Miss-Zähler des Response Caches (pro Prozess) -> http://127.0.0.1:8000/api/v1/cache/stats/
+@api_view(['GET'])
+def cacheStatsView(request):
+    return Response(get_stats(), status=status.HTTP_200_OK)
\ No newline at end of file
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class BlogsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blogs'
+
+    def ready(self):
+        # Trigger der Kommentaranzahl und der Volltextsuche vor Migrationen der Blogs entfernen und danach wieder anlegen
+        # (siehe blogs/counters.py und blogs/search.py)
+        from . import counters, search
+
+        pre_migrate.connect(counters.drop_before_migrate, sender=self, dispatch_uid='blogs_drop_comment_counter')
+        post_migrate.connect(counters.install_after_migrate, sender=self, dispatch_uid='blogs_install_comment_counter')
+        pre_migrate.connect(search.drop_before_migrate, sender=self, dispatch_uid='blogs_drop_search_index')
+        post_migrate.connect(search.install_after_migrate, sender=self, dispatch_uid='blogs_install_search_index')
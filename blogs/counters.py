@@ -0,0 +1,173 @@
+# Denormalisierte Kommentaranzahl: Blog.comment_count wird bei jeder Änderung an den Kommentaren mitgepflegt
+# Vorher wurde die Anzahl bei jedem Request per COUNT über die Kommentare berechnet (annotate(Count('comments')))
+# -> mit der Spalte kann die Blog-Liste ohne JOIN/GROUP BY nach der Anzahl sortiert und gefiltert werden (Index auf comment_count)
+#
+# SQLite: Trigger auf blogs_comment erhöhen bzw. verringern den Zähler in derselben Transaktion wie das INSERT/UPDATE/DELETE
+# -> immer konsistent, auch bei gleichzeitigen Writes, bulk_create(), queryset.update()/delete() und Cascade Deletes
+# Andere Datenbanken: die Receiver unten (verbunden in api/signals.py) machen dasselbe per F()-Update, inklusive der Bulk-Signals
+# Falls die Zähler trotzdem einmal abweichen (z.B. Daten per SQL direkt geändert): python manage.py recount_comments
+import collections
+
+from django.db import connections, router
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .search import is_supported
+
+CREATE_TRIGGERS_SQL = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS blogs_comment_count_ai AFTER INSERT ON blogs_comment BEGIN
+        UPDATE blogs_blog SET comment_count = comment_count + 1 WHERE id = new.blog_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS blogs_comment_count_ad AFTER DELETE ON blogs_comment BEGIN
+        UPDATE blogs_blog SET comment_count = comment_count - 1 WHERE id = old.blog_id;
+    END
+    ''',
+    # Kommentar wird einem anderen Blog zugeordnet -> feuert nur, wenn sich blog_id tatsächlich ändert
+    '''
+    CREATE TRIGGER IF NOT EXISTS blogs_comment_count_au AFTER UPDATE OF blog_id ON blogs_comment
+    WHEN old.blog_id IS NOT new.blog_id BEGIN
+        UPDATE blogs_blog SET comment_count = comment_count - 1 WHERE id = old.blog_id;
+        UPDATE blogs_blog SET comment_count = comment_count + 1 WHERE id = new.blog_id;
+    END
+    ''',
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS blogs_comment_count_ai',
+    'DROP TRIGGER IF EXISTS blogs_comment_count_ad',
+    'DROP TRIGGER IF EXISTS blogs_comment_count_au',
+]
+
+
+def install_comment_counter(connection):
+    # Legt die Trigger an, falls sie fehlen
+    # Wie bei der Volltextsuche: wird blogs_comment durch eine Migration neu angelegt, gehen die Trigger verloren
+    # -> solche Migrationen müssen diese Funktion danach erneut aufrufen
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in CREATE_TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+def drop_comment_counter(connection):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SQL:
+            cursor.execute(statement)
+
+
+'''MIGRATIONEN'''
+# Die Trigger hängen an blogs_comment, schreiben aber in blogs_blog. Legt eine Migration blogs_blog neu an (bei SQLite z.B. jedes
+# AlterField), bricht SQLite das Umbenennen der neuen Tabelle ab ("error in trigger ...: no such table: main.blogs_blog")
+# -> vor Migrationen der blogs-App werden die Trigger entfernt und danach wieder angelegt (verbunden in BlogsConfig.ready())
+# Während der Migration ändern sich die Zähler nicht -> danach werden sie einmal neu berechnet
+
+
+def migrates_blogs(plan):
+    return any(migration.app_label == 'blogs' for migration, backwards in plan or ())
+
+
+def drop_before_migrate(sender, using, plan=None, **kwargs):
+    if migrates_blogs(plan):
+        drop_comment_counter(connections[using])
+
+
+def install_after_migrate(sender, using, plan=None, apps=None, **kwargs):
+    if not migrates_blogs(plan):
+        return
+    # Zurück vor Migration 0005 migriert -> die Spalte comment_count gibt es nicht mehr, die Trigger werden nicht gebraucht
+    if not any(field.name == 'comment_count' for field in apps.get_model('blogs', 'Blog')._meta.get_fields()):
+        return
+    from .models import Blog
+
+    install_comment_counter(connections[using])
+    recount_comments(Blog.objects.using(using).all())
+
+
+def uses_triggers(model):
+    return is_supported(connections[router.db_for_write(model)])
+
+
+def actual_count():
+    # Tatsächliche Anzahl der Kommentare eines Blogs als Subquery (0, wenn es keine gibt)
+    from .models import Comment
+
+    counts = Comment.objects.filter(blog=OuterRef('pk')).order_by().values('blog').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def recount_comments(queryset, batch_size=10000, dry_run=False):
+    # Vergleicht comment_count mit der tatsächlichen Anzahl, batchweise über den Primary Key
+    # Korrigiert werden nur abweichende Blogs (updated_at wird gesetzt -> neuer ETag) -> gibt die Anzahl der abweichenden Blogs zurück
+    fixed = 0
+    last = 0
+    while True:
+        pks = list(queryset.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return fixed
+        last = pks[-1]
+        wrong = queryset.filter(pk__in=pks).alias(actual=actual_count()).exclude(comment_count=F('actual'))
+        if dry_run:
+            fixed += wrong.count()
+        else:
+            fixed += queryset.filter(pk__in=list(wrong.values_list('pk', flat=True))).update(
+                comment_count=actual_count(), updated_at=timezone.now(),
+            )
+
+
+'''FALLBACK OHNE TRIGGER'''
+# Receiver für post_init/post_save/post_delete und die Bulk-Signals von Comment
+# Werden in api/signals.py nur verbunden, wenn die Datenbank keine Trigger hat (uses_triggers() -> False)
+
+
+def adjust(blog_id, delta):
+    from .models import Blog
+
+    # F() -> das UPDATE rechnet in der Datenbank (comment_count = comment_count + 1), gleichzeitige Writes gehen nicht verloren
+    Blog.objects.filter(pk=blog_id).update(comment_count=F('comment_count') + delta)
+
+
+def remember_blog(sender, instance, **kwargs):
+    # post_init: Blog beim Laden merken -> beim Speichern lässt sich erkennen, ob der Kommentar umgezogen ist
+    instance._loaded_blog_id = instance.__dict__.get('blog_id')
+
+
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust(instance.blog_id, 1)
+    elif instance._loaded_blog_id not in (None, instance.blog_id):
+        adjust(instance._loaded_blog_id, -1)
+        adjust(instance.blog_id, 1)
+    instance._loaded_blog_id = instance.blog_id
+
+
+def comment_deleted(sender, instance, **kwargs):
+    adjust(instance.blog_id, -1)
+
+
+def comments_bulk_saved(sender, instances, created, **kwargs):
+    from .models import Blog
+
+    if created:
+        # Ein UPDATE pro Blog statt pro Kommentar
+        for blog_id, count in collections.Counter(instance.blog_id for instance in instances).items():
+            adjust(blog_id, count)
+    else:
+        # Bei Bulk Updates kann sich der Blog geändert haben -> alter und neuer Blog werden neu gezählt
+        blog_ids = {instance.blog_id for instance in instances} | {instance._loaded_blog_id for instance in instances}
+        recount_comments(Blog.objects.filter(pk__in=blog_ids - {None}))
+        for instance in instances:
+            instance._loaded_blog_id = instance.blog_id
+
+
+def comments_bulk_deleted(sender, instances, **kwargs):
+    for blog_id, count in collections.Counter(instance.blog_id for instance in instances).items():
+        adjust(blog_id, -count)
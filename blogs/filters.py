@@ -0,0 +1,35 @@
+import django_filters
+from django.db import connections
+from rest_framework.filters import SearchFilter
+
+from .models import Blog
+from .search import build_match_expression, is_supported
+
+
+# Filter nach der Anzahl der Kommentare -> ?comments_min=10&comments_max=100
+# Benutzt die Spalte Blog.comment_count (mit Index) -> kein COUNT/GROUP BY über die Kommentare
+class BlogFilter(django_filters.FilterSet):
+    comments_min = django_filters.NumberFilter(field_name='comment_count', lookup_expr='gte', label='Minimum number of comments')
+    comments_max = django_filters.NumberFilter(field_name='comment_count', lookup_expr='lte', label='Maximum number of comments')
+
+    class Meta:
+        model = Blog
+        fields = ['comments_min', 'comments_max']
+
+
+# Drop-in Ersatz für den SearchFilter -> gleicher Queryparameter (SEARCH_PARAM aus settings.py, bei uns 'q')
+# Statt LIKE '%begriff%' über alle Zeilen wird der FTS5-Index abgefragt (siehe blogs/search.py)
+# Ist die Datenbank kein SQLite, wird auf das normale Verhalten des SearchFilters zurückgefallen
+class FullTextSearchFilter(SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        if not is_supported(connections[queryset.db]):
+            return super().filter_queryset(request, queryset, view)
+
+        match = build_match_expression(self.get_search_terms(request))
+        if not match:
+            return queryset
+
+        # JOIN mit der FTS-Tabelle über BlogSearchIndex -> SQLite liest zuerst die Treffer aus dem Index
+        # und holt danach nur die passenden Blogs über den Primary Key
+        # Sortierung nach Relevanz; wird zusätzlich der OrderingFilter benutzt (?order-by=...), überschreibt dieser die Sortierung
+        return queryset.filter(search_index__match=match).order_by('search_index__rank', 'pk')
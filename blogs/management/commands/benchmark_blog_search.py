@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from blogs.filters import FullTextSearchFilter
+from blogs.models import Blog
+
+
+# python manage.py benchmark_blog_search --blogs 100000
+# Vergleicht den SearchFilter von DRF (LIKE '%...%') mit dem FullTextSearchFilter (FTS5)
+# Die Testdaten werden innerhalb einer Transaktion angelegt und am Ende wieder zurückgerollt -> die Datenbank bleibt unverändert
+class Command(BaseCommand):
+    help = 'Benchmarks blog search: SearchFilter (LIKE) vs. FullTextSearchFilter (FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blogs', type=int, default=100_000, help='Number of synthetic blogs to create.')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of runs per query.')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = self.build_vocabulary(rng)
+
+        # Häufige, mittlere und seltene Begriffe sowie eine Kombination aus zwei Begriffen
+        queries = [vocabulary[0], vocabulary[50], vocabulary[-1], f'{vocabulary[1]} {vocabulary[20]}']
+
+        with transaction.atomic():
+            self.seed(rng, vocabulary, options['blogs'])
+            self.stdout.write(f"Seeded {options['blogs']} blogs.\n")
+
+            view = type('BenchmarkView', (), {'search_fields': ['blog_title', 'blog_body']})()
+            factory = APIRequestFactory()
+            for query in queries:
+                request = Request(factory.get('/api/v1/blogs/', {'q': query}))
+                for backend in (SearchFilter(), FullTextSearchFilter()):
+                    timings, count = self.measure(backend, request, view, options['repeat'], options['page_size'])
+                    self.stdout.write(
+                        f'{backend.__class__.__name__:<22} q={query!r:<24} matches={count:<7} '
+                        f'median={statistics.median(timings):8.2f} ms  min={min(timings):8.2f} ms'
+                    )
+
+            transaction.set_rollback(True)
+
+    def build_vocabulary(self, rng):
+        syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'bra', 'dex', 'fin', 'gor', 'hul', 'jas']
+        words = set()
+        while len(words) < 2000:
+            words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+        return sorted(words, key=lambda word: (len(word), word))
+
+    def seed(self, rng, vocabulary, count, batch_size=5000):
+        # Zipf-ähnliche Verteilung -> wenige Wörter kommen sehr oft vor, die meisten selten
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        for start in range(0, count, batch_size):
+            Blog.objects.bulk_create(
+                Blog(
+                    blog_title=' '.join(rng.choices(vocabulary, weights, k=5)).title(),
+                    blog_body=' '.join(rng.choices(vocabulary, weights, k=80)),
+                )
+                for _ in range(start, min(start + batch_size, count))
+            )
+
+    def measure(self, backend, request, view, repeat, page_size):
+        timings = []
+        count = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = backend.filter_queryset(request, Blog.objects.all(), view)
+            # Wie bei der Pagination: Gesamtanzahl + erste Seite
+            count = queryset.count()
+            list(queryset[:page_size])
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, count
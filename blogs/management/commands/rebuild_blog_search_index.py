@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blogs.search import is_supported, rebuild_search_index
+
+
+# python manage.py rebuild_blog_search_index
+# Baut den FTS5-Index für die Blog-Suche komplett neu auf, z.B. nachdem Daten direkt in die Datenbank geschrieben wurden
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for blogs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild the index for.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not is_supported(connection):
+            raise CommandError('The blog search index requires SQLite with FTS5.')
+
+        rebuild_search_index(connection)
+        self.stdout.write(self.style.SUCCESS('Blog search index rebuilt.'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# FTS5-Tabelle und Trigger legt der post_migrate Hook an (siehe blogs/search.py) -> hier nur das unmanaged Model
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0002_rename_blog_titel_blog_blog_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogSearchIndex',
+            fields=[
+                ('blog', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blogs.blog')),
+                ('blog_title', models.TextField()),
+                ('blog_body', models.TextField()),
+                ('match', models.TextField(db_column='blogs_blog_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blogs_blog_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:00
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    # Bestehende Blogs: Anzahl einmalig aus den Kommentaren berechnen
+    # Die Trigger, die den Zähler danach aktuell halten, werden erst nach der Migration angelegt (post_migrate, siehe blogs/counters.py)
+    Blog = apps.get_model('blogs', 'Blog')
+    Comment = apps.get_model('blogs', 'Comment')
+    counts = Comment.objects.filter(blog=models.OuterRef('pk')).order_by().values('blog').annotate(count=models.Count('pk')).values('count')
+    Blog.objects.update(comment_count=Coalesce(models.Subquery(counts), models.Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0004_blog_updated_at_comment_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='comment_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,44 @@
 from django.db import models
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
+
+
+# Custom QuerySet für Blogs
+# Problem: Der BlogSerializer serialisiert über 'comments' alle Kommentare eines Blogs. Ohne Prefetching feuert Django dabei
+# für jeden Blog eine eigene Query ab (N+1-Problem)
+class BlogQuerySet(models.QuerySet):
+    # Blogs mit eingebetteten Kommentaren -> die Kommentaranzahl steht direkt in Blog.comment_count
+    def prefetch_comments(self, limit=None, offset=0):
+        # prefetch_related lädt die Kommentare aller Blogs der aktuellen Seite mit einer einzigen zusätzlichen Query
+        comments = Comment.objects.order_by('id')
+
+        # Mit limit/offset wird die Anzahl der eingebetteten Kommentare pro Blog begrenzt
+        # Die Position eines Kommentars innerhalb seines Blogs wird über eine Window-Funktion (ROW_NUMBER) berechnet,
+        # dadurch bleibt es bei einer einzigen Query für alle Blogs der Seite
+        if limit is not None or offset:
+            comments = comments.annotate(
+                position=Window(RowNumber(), partition_by=F('blog'), order_by=F('id').asc())
+            ).filter(position__gt=offset)
+            if limit is not None:
+                comments = comments.filter(position__lte=offset + limit)
+
+        return self.prefetch_related(Prefetch('comments', queryset=comments))
+
 
 # Create your models here.
 class Blog(models.Model):
     blog_title = models.CharField(max_length=100)
     blog_body = models.TextField()
+
+    # Zeitpunkt der letzten Änderung -> wird bei jedem save() automatisch gesetzt (auto_now)
+    # Dient als Validator für ETag/Last-Modified (Conditional GET, siehe api/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Gesamtzahl der Kommentare (denormalisiert) -> wird von Triggern auf blogs_comment gepflegt, nie direkt gesetzt (siehe blogs/counters.py)
+    # Index -> Sortieren und Filtern nach der Anzahl (?order-by=-comment_count, ?comments_min=10) ohne COUNT über die Kommentare
+    comment_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+
+    objects = BlogQuerySet.as_manager()
     
     def __str__(self):
         return self.blog_title
@@ -15,5 +50,30 @@ class Comment(models.Model):
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='comments')
     comment = models.TextField()
 
+    # Zeitpunkt der letzten Änderung -> wird bei jedem save() automatisch gesetzt (auto_now)
+    # Dient als Validator für ETag/Last-Modified (Conditional GET, siehe api/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     def __str__(self):
-        return self.comment
\ No newline at end of file
+        return self.comment
+
+
+# Read-only Model für die FTS5-Tabelle der Volltextsuche (siehe blogs/search.py)
+# managed = False -> Django legt die Tabelle nicht selbst an, das übernimmt die Migration 0003 per SQL
+# Über das Model kann die FTS-Tabelle per JOIN an die Blogs angebunden werden: Blog.objects.filter(search_index__match='...')
+class BlogSearchIndex(models.Model):
+    # rowid der FTS-Tabelle = Primary Key des Blogs
+    blog = models.OneToOneField(
+        Blog, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_index'
+    )
+    blog_title = models.TextField()
+    blog_body = models.TextField()
+
+    # Versteckte Spalten von FTS5: Die Spalte mit dem Namen der Tabelle nimmt die Suchanfrage entgegen (match = '...' entspricht MATCH),
+    # rank enthält die Relevanz des Treffers (bm25, je kleiner desto relevanter)
+    match = models.TextField(db_column='blogs_blog_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blogs_blog_fts'
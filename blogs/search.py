@@ -0,0 +1,126 @@
+# Volltextsuche für Blogs über eine SQLite FTS5-Tabelle
+# Der SearchFilter von DRF erzeugt für jeden Suchbegriff ein LIKE '%begriff%' auf blog_title und blog_body -> das ist immer
+# ein Full Table Scan. FTS5 ist ein invertierter Index: für jedes Wort wird gespeichert, in welchen Blogs es vorkommt.
+# https://www.sqlite.org/fts5.html
+from django.db import connections
+
+# Name der virtuellen FTS5-Tabelle
+FTS_TABLE = 'blogs_blog_fts'
+
+# External Content Table: Die FTS-Tabelle speichert nur den Index, die Texte selbst liegen weiterhin in blogs_blog
+# content_rowid='id' -> die rowid in der FTS-Tabelle ist der Primary Key des Blogs
+CREATE_TABLE_SQL = f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        blog_title, blog_body,
+        content='blogs_blog', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+'''
+
+# Trigger halten den Index bei INSERT, UPDATE und DELETE automatisch synchron -> das funktioniert auch bei bulk_create,
+# queryset.update() und queryset.delete(), bei denen Django keine Signals verschickt
+# Der UPDATE-Trigger feuert nur, wenn sich Titel oder Text tatsächlich ändern
+CREATE_TRIGGERS_SQL = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON blogs_blog BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, blog_title, blog_body) VALUES (new.id, new.blog_title, new.blog_body);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON blogs_blog BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, blog_title, blog_body) VALUES ('delete', old.id, old.blog_title, old.blog_body);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF blog_title, blog_body ON blogs_blog BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, blog_title, blog_body) VALUES ('delete', old.id, old.blog_title, old.blog_body);
+        INSERT INTO {FTS_TABLE}(rowid, blog_title, blog_body) VALUES (new.id, new.blog_title, new.blog_body);
+    END
+    ''',
+]
+
+DROP_TRIGGERS_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+]
+
+DROP_SQL = DROP_TRIGGERS_SQL + [f'DROP TABLE IF EXISTS {FTS_TABLE}']
+
+# Ranking über die versteckte Spalte 'rank' -> bm25 mit Gewichtung der Spalten (blog_title, blog_body)
+# Treffer im Titel zählen mehr als Treffer im Text. Die Einstellung wird dauerhaft in der FTS-Tabelle gespeichert
+RANK_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"
+
+# 'rebuild' liest alle Zeilen aus der Content-Tabelle (blogs_blog) neu ein
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def install_search_index(connection):
+    # Legt FTS-Tabelle und Trigger an, falls sie fehlen
+    # SQLite kann viele Schemaänderungen nur durch Neuanlegen der Tabelle umsetzen. Dabei gehen die Trigger auf blogs_blog
+    # verloren -> werden nach Migrationen der blogs-App automatisch wieder angelegt (siehe unten)
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        for statement in CREATE_TRIGGERS_SQL:
+            cursor.execute(statement)
+        cursor.execute(RANK_SQL)
+
+
+def rebuild_search_index(connection):
+    if not is_supported(connection):
+        return
+    install_search_index(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(REBUILD_SQL)
+
+
+def drop_search_index(connection):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SQL:
+            cursor.execute(statement)
+
+
+'''MIGRATIONEN'''
+# Wie bei der Kommentaranzahl (siehe counters.py): vor Migrationen der blogs-App werden die Trigger entfernt und danach
+# wieder angelegt (verbunden in BlogsConfig.ready()) -> keine Migration muss sich selbst um die Volltextsuche kümmern
+# Danach wird der Index einmal neu aufgebaut -> dadurch wird er auch beim ersten Anlegen (Migration 0003) befüllt
+
+
+def migrates_blogs(plan):
+    return any(migration.app_label == 'blogs' for migration, backwards in plan or ())
+
+
+def drop_before_migrate(sender, using, plan=None, **kwargs):
+    connection = connections[using]
+    if migrates_blogs(plan) and is_supported(connection):
+        with connection.cursor() as cursor:
+            for statement in DROP_TRIGGERS_SQL:
+                cursor.execute(statement)
+
+
+def install_after_migrate(sender, using, plan=None, apps=None, **kwargs):
+    if not migrates_blogs(plan):
+        return
+    try:
+        apps.get_model('blogs', 'BlogSearchIndex')
+    except LookupError:
+        # Zurück vor Migration 0003 migriert -> keine Volltextsuche
+        drop_search_index(connections[using])
+        return
+    rebuild_search_index(connections[using])
+
+
+def build_match_expression(terms):
+    # Jeder Suchbegriff wird als FTS5-String in Anführungszeichen gesetzt -> Sonderzeichen wie -, *, : oder AND/OR werden
+    # dadurch nicht als FTS-Syntax interpretiert. Das * dahinter macht daraus eine Präfixsuche ("blo" findet auch "blog")
+    # Mehrere Begriffe werden mit Leerzeichen verbunden -> implizites AND, genau wie beim SearchFilter
+    quoted = ['"{}"*'.format(term.replace('"', '""')) for term in terms if term.strip()]
+    return ' '.join(quoted)
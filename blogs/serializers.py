@@ -12,6 +12,10 @@ class CommentSerializer(serializers.ModelSerializer):
 class BlogSerializer(serializers.ModelSerializer):
     # Der Variablenname 'comments' muss gleich dem related_name Attribut von "blog" im Comment Model sein
     comments = CommentSerializer(many=True, read_only=True)
+
+    # Gesamtzahl der Kommentare -> Spalte Blog.comment_count, wird automatisch gepflegt (siehe blogs/counters.py)
+    # Bei ?comments_limit= oder ?exclude=comments werden nicht mehr alle Kommentare mitgeliefert, die Anzahl bleibt aber sichtbar
+    comment_count = serializers.IntegerField(read_only=True)
     class Meta:
         model = Blog
         fields = '__all__'
\ No newline at end of file
@@ -1,3 +1,289 @@
+import csv
+import io
+import json
+
+from django.apps import apps as django_apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.models.signals import post_delete, post_init, post_save
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_cache
+from api.signals import bulk_deleted, bulk_saved
+from api.testing import ApiTestCase
+
+from . import counters, search
+from .models import Blog, Comment
+
+
+class BlogCommentQueriesTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            blog = Blog.objects.create(blog_title=f'Blog {i}', blog_body=f'Body {i}')
+            Comment.objects.bulk_create(Comment(blog=blog, comment=f'Comment {i}.{j}') for j in range(3))
+
+    def test_list_query_count_is_constant(self):
+        # ETag-Aggregat + COUNT für die Pagination + Blogs + Kommentare aller Blogs der Seite
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/v1/blogs/?limit=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 5)
+        for blog in response.data['results']:
+            self.assertEqual(len(blog['comments']), 3)
+            self.assertEqual(blog['comment_count'], 3)
+
+    def test_comments_limit(self):
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/v1/blogs/?limit=5&comments_limit=1&comments_offset=1')
+        for blog in response.data['results']:
+            self.assertEqual(len(blog['comments']), 1)
+            self.assertTrue(blog['comments'][0]['comment'].endswith('.1'))
+            self.assertEqual(blog['comment_count'], 3)
+
+    def test_detail_query_count(self):
+        blog = Blog.objects.first()
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/v1/blogs/{blog.pk}/?comments_limit=2')
+        self.assertEqual(len(response.data['comments']), 2)
+        self.assertEqual(response.data['comment_count'], 3)
+
+    def test_invalid_comments_limit(self):
+        response = self.client.get('/api/v1/blogs/?comments_limit=-1')
+        self.assertEqual(response.status_code, 400)
+
+
+class BlogFullTextSearchTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.django = Blog.objects.create(blog_title='Django Basics', blog_body='Models, views and serializers')
+        cls.rest = Blog.objects.create(blog_title='REST APIs', blog_body='Building APIs with Django REST framework')
+        Blog.objects.create(blog_title='Cooking', blog_body='Pasta recipes')
+
+    def search(self, query, **params):
+        response = self.client.get('/api/v1/blogs/', {'q': query, 'limit': 10, **params})
+        return [blog['id'] for blog in response.data['results']]
+
+    def test_ranked_results(self):
+        # Treffer im Titel werden höher gewichtet als Treffer im Text
+        self.assertEqual(self.search('django'), [self.django.pk, self.rest.pk])
+
+    def test_prefix_and_multiple_terms(self):
+        self.assertEqual(self.search('serial'), [self.django.pk])
+        self.assertEqual(self.search('django framework'), [self.rest.pk])
+
+    def test_ordering_param_overrides_rank(self):
+        self.assertEqual(self.search('django', **{'order-by': '-blog_title'}), [self.rest.pk, self.django.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.django.blog_title = 'Flask Basics'
+        self.django.save()
+        self.assertEqual(self.search('flask'), [self.django.pk])
+        self.django.delete()
+        self.assertEqual(self.search('flask'), [])
+
+    def test_fts_syntax_is_escaped(self):
+        self.assertEqual(self.search('"REST" AND -'), [])
+
+    def test_migrate_hooks_reinstall_the_index(self):
+        # Vor Migrationen der blogs-App werden die Trigger entfernt, danach angelegt und der Index neu aufgebaut
+        plan = [(MigrationLoader(connection).graph.nodes[('blogs', '0005_blog_comment_count')], False)]
+        search.drop_before_migrate(None, using='default', plan=plan)
+        blog = Blog.objects.create(blog_title='Trigger', blog_body='Während der Migration')
+        self.assertEqual(self.search('trigger'), [])
+        search.install_after_migrate(None, using='default', plan=plan, apps=django_apps)
+        get_cache().clear()
+        self.assertEqual(self.search('trigger'), [blog.pk])
+        blog.delete()
+        self.assertEqual(self.search('trigger'), [])
+
+
+class BlogKeysetPaginationTest(ApiTestCase):
+    def test_keyset_pages_with_comments(self):
+        blogs = [Blog.objects.create(blog_title='Same title', blog_body=str(i)) for i in range(5)]
+        url, ids = '/api/v1/blogs/?pagination=keyset&order-by=blog_title', []
+        while url:
+            # Kein COUNT(*) -> ETag-Aggregat + Blogs + Kommentare
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            ids += [blog['id'] for blog in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, [blog.pk for blog in blogs])
+
+    def test_search_is_not_keyset_paginated(self):
+        # Die Keyset Pagination würde die Sortierung nach Relevanz durch die id ersetzen
+        response = self.client.get('/api/v1/blogs/', {'q': 'blog', 'pagination': 'keyset'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('q', response.data)
+        self.assertEqual(self.client.get('/api/v1/blogs/', {'q': 'blog'}).status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/blogs/', {'q': '', 'pagination': 'keyset'}).status_code, 200)
+
+
+class BlogSparseFieldsetTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            blog = Blog.objects.create(blog_title=f'Blog {i}', blog_body=f'Long body {i}')
+            Comment.objects.bulk_create(Comment(blog=blog, comment=f'Comment {i}.{j}') for j in range(2))
+
+    def test_list_without_comments_skips_prefetch_and_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/v1/blogs/?limit=3&fields=id,blog_title')
+        self.assertEqual(response.data['results'][0], {'id': Blog.objects.first().pk, 'blog_title': 'Blog 0'})
+        # ETag-Aggregat + COUNT + Blogs -> keine Kommentar-Query
+        self.assertEqual(len(context.captured_queries), 3)
+        blogs_sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('blog_body', blogs_sql)
+        self.assertNotIn('blogs_comment', blogs_sql)
+
+    def test_exclude_keeps_comments(self):
+        response = self.client.get('/api/v1/blogs/?limit=3&exclude=blog_body,updated_at')
+        blog = response.data['results'][0]
+        self.assertEqual(list(blog), ['id', 'comments', 'comment_count', 'blog_title'])
+        self.assertEqual(len(blog['comments']), 2)
+
+    def test_detail_and_keyset_pagination(self):
+        blog = Blog.objects.last()
+        response = self.client.get(f'/api/v1/blogs/{blog.pk}/?fields=comment_count')
+        self.assertEqual(response.data, {'comment_count': 2})
+
+        response = self.client.get('/api/v1/blogs/?pagination=keyset&page_size=2&fields=blog_title&order-by=-blog_title')
+        self.assertEqual([item['blog_title'] for item in response.data['results']], ['Blog 2', 'Blog 1'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['blog_title'] for item in response.data['results']], ['Blog 0'])
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/v1/blogs/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', str(response.data['fields']))
+
+    def test_writes_return_full_representation(self):
+        response = self.client.post('/api/v1/blogs/?fields=id', {'blog_title': 'New', 'blog_body': 'Body'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('blog_body', response.data)
+
+
+class BlogExportTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            blog = Blog.objects.create(blog_title=f'Blog {i}', blog_body=f'Body {i}')
+            Comment.objects.bulk_create(Comment(blog=blog, comment=f'Comment {i}.{j}') for j in range(i))
+
+    def test_ndjson_with_comments_without_n_plus_one(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/v1/blogs/export/')
+            rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['blog_title'] for row in rows], [f'Blog {i}' for i in range(5)])
+        self.assertEqual([len(row['comments']) for row in rows], [0, 1, 2, 3, 4])
+        # ETag-Aggregat + Blogs + ein Prefetch der Kommentare -> unabhängig von der Anzahl der Blogs
+        self.assertEqual(len(context.captured_queries), 3)
+
+    def test_csv_with_search_and_nested_comments(self):
+        response = self.client.get('/api/v1/blogs/export/?output=csv&fields=blog_title,comments&q=body')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 5)
+        blog = next(row for row in rows if row['blog_title'] == 'Blog 2')
+        self.assertEqual(len(json.loads(blog['comments'])), 2)
+
+    def test_read_only(self):
+        response = self.client.post('/api/v1/blogs/export/', {'blog_title': 'x', 'blog_body': 'y'})
+        self.assertEqual(response.status_code, 405)
+
+
+class BlogCommentCountTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = Blog.objects.create(blog_title='First', blog_body='Body')
+        self.second = Blog.objects.create(blog_title='Second', blog_body='Body')
+
+    def counts(self):
+        return list(Blog.objects.order_by('pk').values_list('comment_count', flat=True))
+
+    def test_maintained_on_every_write_path(self):
+        comment = Comment.objects.create(blog=self.first, comment='a')
+        Comment.objects.bulk_create(Comment(blog=self.second, comment=str(i)) for i in range(3))
+        self.assertEqual(self.counts(), [1, 3])
+
+        comment.blog = self.second
+        comment.save()
+        self.assertEqual(self.counts(), [0, 4])
+        Comment.objects.filter(comment='0').update(blog=self.first)
+        self.assertEqual(self.counts(), [1, 3])
+        comment.save()
+        self.assertEqual(self.counts(), [1, 3])
+
+        Comment.objects.filter(blog=self.second)[:1].get().delete()
+        Comment.objects.filter(comment='2').delete()
+        self.assertEqual(self.counts(), [1, 1])
+
+    def test_ordering_filter_and_counts_without_comments(self):
+        Comment.objects.bulk_create(Comment(blog=self.second, comment=str(i)) for i in range(2))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/v1/blogs/?order-by=-comment_count&exclude=comments,blog_body')
+        self.assertEqual([(blog['blog_title'], blog['comment_count']) for blog in response.data['results']], [('Second', 2), ('First', 0)])
+        # ETag-Aggregat + COUNT + Blogs -> weder Kommentare noch COUNT über die Kommentare
+        self.assertEqual(len(context.captured_queries), 3)
+        self.assertNotIn('blogs_comment', context.captured_queries[-1]['sql'])
+
+        response = self.client.get('/api/v1/blogs/?comments_min=1&fields=blog_title')
+        self.assertEqual(response.data['results'], [{'blog_title': 'Second'}])
+        response = self.client.get('/api/v1/blogs/?comments_max=0&fields=blog_title')
+        self.assertEqual(response.data['results'], [{'blog_title': 'First'}])
+
+    def test_read_only(self):
+        response = self.client.patch(f'/api/v1/blogs/{self.first.pk}/', {'comment_count': 10}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.comment_count, 0)
+
+    def test_recount_command(self):
+        Comment.objects.bulk_create(Comment(blog=self.first, comment=str(i)) for i in range(2))
+        Blog.objects.update(comment_count=7)
+
+        out = io.StringIO()
+        call_command('recount_comments', '--dry-run', stdout=out)
+        self.assertIn('2 blogs have a wrong comment_count', out.getvalue())
+        self.assertEqual(self.counts(), [7, 7])
+
+        call_command('recount_comments', '--batch-size', '1', stdout=out)
+        self.assertEqual(self.counts(), [2, 0])
+
+
+class BlogCommentCountFallbackTest(TestCase):
+    # Datenbanken ohne Trigger -> die Receiver aus blogs/counters.py pflegen den Zähler
+    def setUp(self):
+        counters.drop_comment_counter(connection)
+        for signal, receiver in (
+            (post_init, counters.remember_blog),
+            (post_save, counters.comment_saved),
+            (post_delete, counters.comment_deleted),
+            (bulk_saved, counters.comments_bulk_saved),
+            (bulk_deleted, counters.comments_bulk_deleted),
+        ):
+            signal.connect(receiver, sender=Comment)
+            self.addCleanup(signal.disconnect, receiver, sender=Comment)
+        self.first = Blog.objects.create(blog_title='First', blog_body='Body')
+        self.second = Blog.objects.create(blog_title='Second', blog_body='Body')
+
+    def counts(self):
+        return list(Blog.objects.order_by('pk').values_list('comment_count', flat=True))
+
+    def test_signals(self):
+        comment = Comment.objects.create(blog=self.first, comment='a')
+        comments = Comment.objects.bulk_create(Comment(blog=self.second, comment=str(i)) for i in range(3))
+        bulk_saved.send(sender=Comment, instances=comments, created=True)
+        self.assertEqual(self.counts(), [1, 3])
+
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.blog = self.second
+        comment.save()
+        self.assertEqual(self.counts(), [0, 4])
 
-# Create your tests here.
+        comment.delete()
+        # Bulk-Pfad wie in EmployeeViewset.bulk_delete -> _raw_delete() ohne post_delete, dafür bulk_deleted
+        Comment.objects.filter(pk__in=[c.pk for c in comments[:2]])._raw_delete(connection.alias)
+        bulk_deleted.send(sender=Comment, instances=comments[:2])
+        self.assertEqual(self.counts(), [0, 1])
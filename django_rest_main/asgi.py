@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_rest_main.settings')
 
 application = get_asgi_application()
+
+# Prefix-Index für die Autocomplete-Endpunkte vorab laden (siehe api/autocomplete.py)
+from api.autocomplete import warm_up  # noqa: E402
+
+warm_up()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Profiling (opt-in, siehe API_PROFILING unten) -> steht ganz vorne, damit die Gesamtzeit alle anderen Middlewares enthält
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,6 +83,26 @@ WSGI_APPLICATION = 'django_rest_main.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite-Profil über die Umgebungsvariable SQLITE_PROFILE:
+# 'tuned' (Standard) -> WAL, Pragmas und persistente Verbindungen, 'default' -> Einstellungen von Django ohne Anpassungen
+# WAL (Write-Ahead Log): Leser werden nicht mehr von Schreibzugriffen blockiert (beim Rollback Journal schon)
+# synchronous=NORMAL: im WAL-Modus sicher, spart aber das fsync bei jedem Commit
+# mmap_size / cache_size: Datenbankseiten werden über Memory Mapping bzw. einen größeren Page Cache gelesen (cache_size negativ -> KiB)
+# Die Werte können einzeln über Umgebungsvariablen überschrieben werden
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'tuned')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+# Sekunden, die eine Verbindung auf einen gesperrten Schreibzugriff wartet, bevor "database is locked" kommt
+SQLITE_TIMEOUT = float(os.environ.get('SQLITE_TIMEOUT', 20))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -87,6 +110,104 @@ DATABASES = {
     }
 }
 
+if SQLITE_PROFILE == 'tuned':
+    DATABASES['default'].update({
+        # Verbindungen werden über Requests hinweg wiederverwendet (None -> unbegrenzt), statt bei jedem Request neu geöffnet
+        # CONN_HEALTH_CHECKS -> eine kaputte Verbindung wird vor dem nächsten Request erkannt und ersetzt
+        'CONN_MAX_AGE': None if os.environ.get('SQLITE_CONN_MAX_AGE') is None else int(os.environ['SQLITE_CONN_MAX_AGE']),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # init_command -> wird beim Öffnen jeder Verbindung ausgeführt
+            'init_command': ''.join(f'PRAGMA {name}={value};' for name, value in SQLITE_PRAGMAS.items()),
+            'timeout': SQLITE_TIMEOUT,
+            # IMMEDIATE -> Transaktionen holen die Schreibsperre sofort. Sonst kann das spätere Upgrade von Lese- auf Schreibsperre
+            # sofort mit "database is locked" fehlschlagen, ohne dass der timeout greift
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'api' -> Response Cache der API (siehe api/cache.py). LocMemCache läuft im Prozess und braucht keinen externen Dienst,
+# verdrängt bei mehr als MAX_ENTRIES Einträgen die am längsten nicht benutzten (LRU) und lässt Einträge nach TIMEOUT Sekunden ablaufen
+# Bei mehreren Worker-Prozessen hier z.B. 'django.core.cache.backends.redis.RedisCache' eintragen
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+API_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'api',
+    'TIMEOUT': 300,
+}
+
+# Gesamtanzahl der Pagination (siehe api/paginations.py): gecacht über den API_CACHE, über COUNT_THRESHOLD geschätzt bzw. weggelassen
+API_PAGINATION = {
+    'COUNT_THRESHOLD': 10000,
+    'COUNT_CACHE': True,
+}
+
+# Autocomplete (siehe api/autocomplete.py): Prefix-Index im Speicher, beim Start geladen
+# SYNC_INTERVAL -> Änderungen anderer Worker-Prozesse werden alle paar Sekunden aus dem Change Log übernommen
+# Standardmäßig von einem Hintergrund-Thread -> Suchen bleiben ohne Datenbankzugriff
+# SYNC_ON_REQUEST=True -> kein Thread, dafür fragt der erste Request nach Ablauf von SYNC_INTERVAL die Datenbank
+# (für Server, die die App vor dem Fork laden, z.B. gunicorn --preload; dieser Request wird dadurch langsamer)
+API_AUTOCOMPLETE = {
+    'WARM_UP': True,
+    'LIMIT': 10,
+    'MAX_LIMIT': 50,
+    'SYNC_INTERVAL': 5,
+    'SYNC_ON_REQUEST': False,
+}
+
+
+# Profiling Middleware (siehe api/middleware.py) -> standardmäßig aus, einschalten mit der Umgebungsvariable API_PROFILING=1
+# Ausgeschaltet wird die Middleware beim Start entfernt und kostet nichts
+API_PROFILING = {
+    'ENABLED': os.environ.get('API_PROFILING') == '1',
+    'SLOW_QUERY_MS': float(os.environ.get('API_SLOW_QUERY_MS', 100)),
+    'EXPLAIN': True,
+    # URL-Namen aus api/urls.py, die per cProfile profiliert werden, z.B. API_PROFILE_ROUTES=blogs_View,employees-list
+    'PROFILE_ROUTES': [route for route in os.environ.get('API_PROFILE_ROUTES', '').split(',') if route],
+    'PROFILE_SAMPLE_RATE': float(os.environ.get('API_PROFILE_SAMPLE_RATE', 0.01)),
+    'PROFILE_DIR': BASE_DIR / 'profiles',
+}
+
+
+# Logging
+# Slow Query Log und cProfile-Hinweise der Profiling Middleware auf der Konsole
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.slow_queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -139,7 +260,8 @@ REST_FRAMEWORK = {
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     # 'PAGE_SIZE': 2,
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    # LimitOffsetPagination mit gecachter bzw. geschätzter Gesamtanzahl und ?count=false (siehe api/paginations.py)
+    'DEFAULT_PAGINATION_CLASS': 'api.paginations.CountingLimitOffsetPagination',
     'PAGE_SIZE': 2,
 
     # Global Filtering -> Alle Views unterstützen durch diese Einstellung Filtering
@@ -154,4 +276,17 @@ REST_FRAMEWORK = {
     # Standardmäßig heißt der Queryparameter in der URL 'ordering' -> http://127.0.0.1:8000/api/v1/blogs/?ordering=blog_title
     # Dieser Parametername wird hier geændert -> http://127.0.0.1:8000/api/v1/blogs/?order-by=blog_title
     'ORDERING_PARAM': 'order-by',
+
+    # Renderer und Parser
+    # FastJSONRenderer/FastJSONParser benutzen orjson, falls installiert (pip install orjson), sonst das json-Modul von Python
+    # Die Ausgabe ist identisch mit dem JSONRenderer von DRF (siehe api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
\ No newline at end of file
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Employee
+from .models import DesignationFacet, Employee
 
 # Register your models here.
-admin.site.register(Employee)
\ No newline at end of file
+admin.site.register(Employee)
+admin.site.register(DesignationFacet)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class EmployeesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employees'
+
+    def ready(self):
+        # Trigger der Designation-Facetten vor Migrationen der Employees entfernen und danach wieder anlegen (siehe employees/facets.py)
+        from . import facets
+
+        pre_migrate.connect(facets.drop_before_migrate, sender=self, dispatch_uid='employees_drop_designation_facets')
+        post_migrate.connect(facets.install_after_migrate, sender=self, dispatch_uid='employees_install_designation_facets')
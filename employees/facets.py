@@ -0,0 +1,204 @@
+# Facetten für den Designation-Filter: Anzahl der Employees pro Designation (GET /api/v1/employees/facets/)
+# Ohne weitere Filter kommen die Zahlen aus der Tabelle DesignationFacet -> so viele Zeilen, wie es Designations gibt,
+# statt eines GROUP BY über alle Employees. Mit Filtern (emp_name, id_min/id_max, ?q=, ...) wird über die gefilterten Employees gruppiert
+#
+# SQLite: Trigger auf employees_employee pflegen DesignationFacet in derselben Transaktion wie das INSERT/UPDATE/DELETE
+# -> immer konsistent, auch bei bulk_create(), queryset.update()/delete() und gleichzeitigen Writes
+# Die Trigger benutzen lower() der Datenbank -> genau dieselbe Normalisierung wie der Filter (lower(designation) = lower(value))
+# Label: die kleinste Schreibweise (MIN(designation), z.B. "Manager" vor "manager") -> die Trigger übernehmen beim INSERT die kleinere,
+# rebuild_facets() rechnet sie neu. Gefilterte Facetten lesen das Label ebenfalls aus DesignationFacet (siehe add_labels)
+# -> mit und ohne Filter dasselbe Label
+# Andere Datenbanken: die Receiver unten (verbunden in api/signals.py) machen dasselbe, inklusive der Bulk-Signals
+# Falls die Zahlen trotzdem einmal abweichen: python manage.py rebuild_facets
+import collections
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Min, Value
+from django.db.models.functions import Least, Lower
+
+CREATE_TRIGGERS_SQL = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_designation_facet_ai AFTER INSERT ON employees_employee BEGIN
+        INSERT INTO employees_designationfacet (designation, label, count) VALUES (lower(new.designation), new.designation, 1)
+        ON CONFLICT (designation) DO UPDATE SET count = count + 1, label = min(label, excluded.label);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_designation_facet_ad AFTER DELETE ON employees_employee BEGIN
+        UPDATE employees_designationfacet SET count = count - 1 WHERE designation = lower(old.designation);
+        DELETE FROM employees_designationfacet WHERE designation = lower(old.designation) AND count = 0;
+    END
+    ''',
+    # Feuert nur, wenn sich die Designation nicht nur in der Groß-/Kleinschreibung ändert
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_designation_facet_au AFTER UPDATE OF designation ON employees_employee
+    WHEN lower(old.designation) IS NOT lower(new.designation) BEGIN
+        UPDATE employees_designationfacet SET count = count - 1 WHERE designation = lower(old.designation);
+        DELETE FROM employees_designationfacet WHERE designation = lower(old.designation) AND count = 0;
+        INSERT INTO employees_designationfacet (designation, label, count) VALUES (lower(new.designation), new.designation, 1)
+        ON CONFLICT (designation) DO UPDATE SET count = count + 1, label = min(label, excluded.label);
+    END
+    ''',
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS employees_designation_facet_ai',
+    'DROP TRIGGER IF EXISTS employees_designation_facet_ad',
+    'DROP TRIGGER IF EXISTS employees_designation_facet_au',
+]
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def install_designation_facets(connection):
+    # Legt die Trigger an
+    # Legt eine Migration employees_employee neu an (bei SQLite z.B. jedes AlterField), gehen die Trigger verloren
+    # -> werden nach Migrationen der employees-App automatisch wieder angelegt (siehe unten)
+    # Bestehende Trigger werden ersetzt -> eine geänderte Definition (z.B. die Regel für das Label) kommt auch ohne Migration an
+    # (python manage.py rebuild_facets)
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SQL + CREATE_TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+def drop_designation_facets(connection):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_SQL:
+            cursor.execute(statement)
+
+
+def uses_triggers(model):
+    return is_supported(connections[router.db_for_write(model)])
+
+
+def count_designations(queryset):
+    # GROUP BY lower(designation) über die (gefilterten) Employees -> [{'key': ..., 'label': ..., 'count': ...}]
+    return list(
+        queryset.order_by()
+        .values(key=Lower('designation'))
+        .annotate(label=Min('designation'), count=Count('pk'))
+        .values('key', 'label', 'count')
+        .order_by('-count', 'key')
+    )
+
+
+def add_labels(counts):
+    # Labels der gefilterten Zählung aus DesignationFacet -> wie bei den ungefilterten Facetten
+    # Nur falls es (noch) keine Facette gibt, bleibt MIN(designation) aus count_designations()
+    from .models import DesignationFacet
+
+    labels = dict(DesignationFacet.objects.filter(designation__in=[item['key'] for item in counts]).values_list('designation', 'label'))
+    return [{**item, 'label': labels.get(item['key'], item['label'])} for item in counts]
+
+
+def rebuild_facets(using='default'):
+    # Berechnet DesignationFacet komplett neu -> gibt die Anzahl der Designations zurück
+    from .models import DesignationFacet, Employee
+
+    counts = count_designations(Employee.objects.using(using).all())
+    with transaction.atomic(using=using):
+        DesignationFacet.objects.using(using).all().delete()
+        DesignationFacet.objects.using(using).bulk_create(
+            DesignationFacet(designation=item['key'], label=item['label'], count=item['count']) for item in counts
+        )
+    return len(counts)
+
+
+'''MIGRATIONEN'''
+# Vor Migrationen der employees-App werden die Trigger entfernt und danach wieder angelegt (verbunden in EmployeesConfig.ready())
+# Danach werden die Facetten einmal neu berechnet -> dadurch wird die Tabelle auch beim ersten Anlegen (Migration 0004) befüllt
+
+
+def migrates_employees(plan):
+    return any(migration.app_label == 'employees' for migration, backwards in plan or ())
+
+
+def drop_before_migrate(sender, using, plan=None, **kwargs):
+    if migrates_employees(plan):
+        drop_designation_facets(connections[using])
+
+
+def install_after_migrate(sender, using, plan=None, apps=None, **kwargs):
+    if not migrates_employees(plan):
+        return
+    # Zurück vor Migration 0004 migriert -> die Tabelle gibt es nicht mehr
+    try:
+        apps.get_model('employees', 'DesignationFacet')
+    except LookupError:
+        return
+    install_designation_facets(connections[using])
+    rebuild_facets(using)
+
+
+'''FALLBACK OHNE TRIGGER'''
+# Receiver für post_init/post_save/post_delete und die Bulk-Signals von Employee
+# Werden in api/signals.py nur verbunden, wenn die Datenbank keine Trigger hat (uses_triggers() -> False)
+
+
+def adjust(designation, delta):
+    from .models import DesignationFacet
+
+    key = designation.lower()
+    # F() -> das UPDATE rechnet in der Datenbank, gleichzeitige Writes gehen nicht verloren
+    # Label wie bei den Triggern: die kleinere Schreibweise
+    changes = {'count': F('count') + delta, 'label': Least('label', Value(designation))} if delta > 0 else {'count': F('count') + delta}
+    if not DesignationFacet.objects.filter(designation=key).update(**changes) and delta > 0:
+        facet, created = DesignationFacet.objects.get_or_create(designation=key, defaults={'label': designation, 'count': delta})
+        if not created:
+            DesignationFacet.objects.filter(designation=key).update(**changes)
+    if delta < 0:
+        DesignationFacet.objects.filter(designation=key, count=0).delete()
+
+
+def remember_designation(sender, instance, **kwargs):
+    # post_init: Designation beim Laden merken -> beim Speichern lässt sich erkennen, ob sie sich geändert hat
+    instance._loaded_designation = instance.__dict__.get('designation')
+
+
+def moved(instance):
+    loaded = instance._loaded_designation
+    return loaded is not None and loaded.lower() != instance.designation.lower()
+
+
+def employee_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust(instance.designation, 1)
+    elif moved(instance):
+        adjust(instance._loaded_designation, -1)
+        adjust(instance.designation, 1)
+    instance._loaded_designation = instance.designation
+
+
+def employee_deleted(sender, instance, **kwargs):
+    adjust(instance.designation, -1)
+
+
+def employees_bulk_saved(sender, instances, created, **kwargs):
+    # Ein UPDATE pro Designation statt pro Employee, "Manager" und "manager" zählen zusammen
+    deltas = collections.Counter()
+    labels = {}
+    for instance in instances:
+        if created or moved(instance):
+            deltas[instance.designation.lower()] += 1
+            labels[instance.designation.lower()] = min(labels.get(instance.designation.lower(), instance.designation), instance.designation)
+        if not created and moved(instance):
+            deltas[instance._loaded_designation.lower()] -= 1
+            labels.setdefault(instance._loaded_designation.lower(), instance._loaded_designation)
+        instance._loaded_designation = instance.designation
+    # Erst verringern, dann erhöhen -> keine Facette wird zwischendurch gelöscht und neu angelegt
+    for key, delta in sorted(deltas.items(), key=lambda item: item[1]):
+        if delta:
+            adjust(labels[key], delta)
+
+
+def employees_bulk_deleted(sender, instances, **kwargs):
+    for designation, count in collections.Counter(instance.designation for instance in instances).items():
+        adjust(designation, -count)
@@ -1,44 +1,91 @@
 import django_filters
-from .models import Employee
+from django import forms
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+from .models import Employee, parse_emp_num
+
+# Größtes Unicode-Zeichen -> obere Grenze für Präfix-Suchen (alle Werte, die mit dem Präfix beginnen, sind kleiner als präfix + MAX_CHAR)
+MAX_CHAR = '\U0010ffff'
+
+
+# Formularfeld für emp_ids (EMP002 oder nur 2) -> der bereinigte Wert ist die Nummer aus der emp_id
+# Ungültige Werte scheitern schon in filterset.is_valid() -> 400 in jeder View (DRF, Async Views, Batch), nicht erst beim Filtern
+class EmpIdField(forms.CharField):
+    def clean(self, value):
+        value = super().clean(value)
+        if value in self.empty_values:
+            return None
+        number = parse_emp_num(value)
+        if number is None:
+            raise forms.ValidationError('Expected an employee id like EMP002 or a number.', code='invalid')
+        return number
+
+
+class EmpIdFilter(django_filters.CharFilter):
+    field_class = EmpIdField
 
 # Erstellen eines Custom Filters
 class EmployeeFilter(django_filters.FilterSet):
     # Filter Employees by designation -> Retrieve all employees whose designation is "Software Engineer"
     # in der URL steht der Name dieser Variable, also z.B. ?designation=Manager
     # field_name ist der Name des Feldes im Model, nach dem wir Filtern wollen
-    # lookup_expr='iexact' -> wir akzeptieren Groß- und Kleinschreibung beim Filtern
-    designation = django_filters.CharFilter(field_name='designation', lookup_expr='iexact')
+    # wir akzeptieren Groß- und Kleinschreibung beim Filtern
+    # Statt lookup_expr='iexact' (wird bei SQLite zu LIKE und kann keinen Index benutzen) -> lower(designation) = lower(value)
+    # dafür gibt es den funktionalen Index employee_designation_lower_idx (siehe Employee.Meta.indexes)
+    designation = django_filters.CharFilter(method='filter_by_designation')
     
     # Filter Employees by name -> Retrieve all employees whose names CONTAIN the word "John"
+    # Hinweis: icontains ('%john%') kann nie einen Index benutzen -> Full Scan
     emp_name = django_filters.CharFilter(field_name='emp_name', lookup_expr='icontains')
 
+    # Filter Employees by name prefix -> Retrieve all employees whose names START WITH "jo" (Groß-/Kleinschreibung egal)
+    # Läuft als Range-Scan über den Index employee_name_lower_idx -> für große Tabellen deutlich schneller als emp_name
+    emp_name_prefix = django_filters.CharFilter(method='filter_by_name_prefix', label='Name starts with')
+
     # Filter nach ID bzw. Primary Key
     # id = django_filters.RangeFilter(field_name='id')
 
     # Filter Employees by ID Range -> Retrieve all employees whose IDs are between "EMP002" and "EMP004"
-    # Hinweis: Wir haben emp_id im Model als CharField gesetzt -> deshalb CharFilter
+    # Hinweis: Wir haben emp_id im Model als CharField gesetzt -> deshalb CharFilter, es geht aber auch nur die Nummer (?id_min=2)
     # label: Beschriftung, die dem User für die Filteroption angezeigt wird
     # method: Funktion, die aufgerufen wird, um die Filterung durchzuführen
-    id_min = django_filters.CharFilter(method='filter_by_id_range', label='From EMP ID')
-    id_max = django_filters.CharFilter(method='filter_by_id_range', label='To EMP ID')
+    # EmpIdFilter -> der Wert ist schon die Nummer aus der emp_id (siehe EmpIdField)
+    id_min = EmpIdFilter(method='filter_by_id_range', label='From EMP ID')
+    id_max = EmpIdFilter(method='filter_by_id_range', label='To EMP ID')
 
     class Meta:
         model = Employee
 
         # Felder aus dem Employee-Model, die gefiltert werden können
         # Wichtig: 'id_min' und 'id_max' sind nicht im Model definiert -> diese haben wir selbst definiert, um die EMP_ID's mit einem CustomFilter zu filtern
-        fields = ['designation', 'emp_name', 'id_min', 'id_max']
+        fields = ['designation', 'emp_name', 'emp_name_prefix', 'id_min', 'id_max']
+
+    # Vergleicht den kleingeschriebenen Wert in der DB mit dem kleingeschriebenen Filterwert
+    # Lower(Value(...)) -> der Filterwert wird in der DB kleingeschrieben, also genau so wie der Index
+    def filter_by_designation(self, queryset, name, value):
+        return queryset.alias(designation_lower=Lower('designation')).filter(designation_lower=Lower(Value(value)))
+
+    # Präfix-Suche als Range: präfix <= lower(emp_name) < präfix + MAX_CHAR
+    # istartswith würde zu LIKE 'jo%' -> das kann den funktionalen Index nicht benutzen
+    def filter_by_name_prefix(self, queryset, name, value):
+        return queryset.alias(emp_name_lower=Lower('emp_name')).filter(
+            emp_name_lower__gte=Lower(Value(value)),
+            emp_name_lower__lt=Lower(Value(value + MAX_CHAR)),
+        )
 
     # Funktion zum Filtern der emp_id's nach ID Range -> emp_id ist ein CharField
+    # Als Text verglichen wäre EMP10 < EMP2 -> verglichen wird stattdessen die Nummer aus der emp_id (Employee.emp_num)
+    # gte/lte auf emp_num -> numerischer Range-Scan über den Index employee_emp_num_idx
     # name: Name des Filters, der gesetzt wird, value: Wert des Filters
     # GET /employees/?id_min=EMP002&id_max=EMP007 -> In so einem Fall wird die Funktion zweimal aufgerufen
-    def filter_by_id_range(self, queryset, name, value):
+    def filter_by_id_range(self, queryset, name, number):
         if name == 'id_min':
             # gte: greater than or equal -> Alle Werte die größer oder gleich dem vom User eingegebenen Wert sind werden herausgefiltert
-            return queryset.filter(emp_id__gte=value)
+            return queryset.filter(emp_num__gte=number)
         elif name == 'id_max':
             # lte: less than or equal -> Alle Werte die kleiner oder gleich dem vom User eingegebenen Wert sind werden herausgefiltert
-            return queryset.filter(emp_id__lte=value)
+            return queryset.filter(emp_num__lte=number)
         
         # Wenn name weder id_min noch id_max ist, wird das ursprüngl. queryset returned
         return queryset
\ No newline at end of file
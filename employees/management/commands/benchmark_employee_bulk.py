@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+
+
+# python manage.py benchmark_employee_bulk --rows 5000
+# Vergleicht das Anlegen von Employees per Einzel-POST (/api/v1/employees/) mit einem Bulk-POST (/api/v1/employees/bulk/)
+# Alles läuft in-process über den Test-Client und wird am Ende zurückgerollt -> die Datenbank bleibt unverändert
+class Command(BaseCommand):
+    help = 'Benchmarks per-row employee POSTs against the bulk endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Number of employees to create per mode.')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        payload = [
+            {'emp_id': f'BENCH{i:07}', 'emp_name': f'Bench Employee {i}', 'designation': 'Developer'}
+            for i in range(rows)
+        ]
+        # Host 'localhost' -> ist bei DEBUG = True ohne Eintrag in ALLOWED_HOSTS erlaubt
+        client = APIClient(HTTP_HOST='localhost')
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            for item in payload:
+                response = client.post('/api/v1/employees/', item, format='json')
+                assert response.status_code == 201, response.data
+            single = time.perf_counter() - started
+
+            Employee.objects.filter(emp_id__startswith='BENCH').delete()
+
+            started = time.perf_counter()
+            response = client.post('/api/v1/employees/bulk/', payload, format='json')
+            bulk = time.perf_counter() - started
+            assert response.status_code == 201, response.data
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'per-row POST: {rows / single:10.0f} rows/s  ({single:.2f} s)')
+        self.stdout.write(f'bulk POST:    {rows / bulk:10.0f} rows/s  ({bulk:.2f} s)')
+        self.stdout.write(self.style.SUCCESS(f'speedup: {single / bulk:.1f}x'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesignationFacet',
+            fields=[
+                ('designation', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('label', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
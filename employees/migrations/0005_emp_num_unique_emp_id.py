@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:40
+
+import re
+
+from django.db import migrations, models
+
+# Kopie von employees.models.parse_emp_num zum Zeitpunkt dieser Migration -> spätere Änderungen am Model ändern die Migration nicht
+EMP_NUM_RE = re.compile(r'(\d+)\D*$')
+
+
+def parse_emp_num(emp_id):
+    # Letzte Ziffernfolge der emp_id -> "EMP010" -> 10, None ohne Ziffern
+    match = EMP_NUM_RE.search(emp_id or '')
+    return int(match.group(1)) if match else None
+
+
+def fill_emp_num(apps, schema_editor):
+    # Bestehende Employees: emp_num einmalig aus emp_id berechnen, batchweise über den Primary Key
+    # Das historische Model hat den EmployeeQuerySet nicht -> emp_num wird hier selbst gesetzt
+    Employee = apps.get_model('employees', 'Employee')
+    last = 0
+    while True:
+        batch = list(Employee.objects.filter(pk__gt=last).order_by('pk').only('pk', 'emp_id')[:1000])
+        if not batch:
+            return
+        for employee in batch:
+            employee.emp_num = parse_emp_num(employee.emp_id)
+        Employee.objects.bulk_update(batch, ['emp_num'])
+        last = batch[-1].pk
+
+
+def check_unique_emp_id(apps, schema_editor):
+    # Doppelte emp_ids würden den Unique Index scheitern lassen -> vorher mit verständlicher Meldung abbrechen
+    Employee = apps.get_model('employees', 'Employee')
+    duplicates = list(
+        Employee.objects.values('emp_id').annotate(count=models.Count('pk')).filter(count__gt=1).values_list('emp_id', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(f'emp_id must be unique, fix these duplicates before migrating: {", ".join(duplicates)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_designation_facet'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='employee',
+            name='employee_emp_id_idx',
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='emp_num',
+            field=models.BigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_emp_num, migrations.RunPython.noop),
+        migrations.RunPython(check_unique_emp_id, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='employee',
+            name='emp_id',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['emp_num'], name='employee_emp_num_idx'),
+        ),
+    ]
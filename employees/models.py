@@ -1,10 +1,91 @@
+import re
+
 from django.db import models
+from django.db.models.functions import Lower
+
+# Letzte Ziffernfolge einer emp_id -> "EMP010" -> 10
+EMP_NUM_RE = re.compile(r'(\d+)\D*$')
+
+
+def parse_emp_num(emp_id):
+    # Numerischer Schlüssel aus der emp_id, None ohne Ziffern
+    match = EMP_NUM_RE.search(emp_id or '')
+    return int(match.group(1)) if match else None
+
+
+# Custom QuerySet für Employees
+# emp_num wird aus emp_id abgeleitet -> auch bulk_create(), bulk_update() und update() setzen es (save() siehe unten)
+class EmployeeQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.emp_num = parse_emp_num(obj.emp_id)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if 'emp_id' in fields:
+            for obj in objs:
+                obj.emp_num = parse_emp_num(obj.emp_id)
+            if 'emp_num' not in fields:
+                fields.append('emp_num')
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if isinstance(kwargs.get('emp_id'), str):
+            kwargs['emp_num'] = parse_emp_num(kwargs['emp_id'])
+        return super().update(**kwargs)
+
 
 # Create your models here.
 class Employee(models.Model):
-    emp_id = models.CharField(max_length=20)
+    # unique -> eine Abfrage nach emp_id ist ein Lookup über den Unique Index (höchstens eine Zeile)
+    # z.B. /api/v1/employees/by-emp-id/<emp_id>/ (siehe api/lookups.py)
+    emp_id = models.CharField(max_length=20, unique=True)
     emp_name = models.CharField(max_length=50)
     designation = models.CharField(max_length=50)
 
+    # Numerischer Teil der emp_id (EMP010 -> 10), wird nie direkt gesetzt
+    # emp_id ist ein CharField -> als Text sortiert steht EMP10 vor EMP2. Die Filter id_min/id_max vergleichen deshalb emp_num
+    emp_num = models.BigIntegerField(null=True, editable=False)
+
+    # Zeitpunkt der letzten Änderung -> wird bei jedem save() automatisch gesetzt (auto_now)
+    # Dient als Validator für ETag/Last-Modified (Conditional GET, siehe api/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        # Indizes für den EmployeeFilter (siehe employees/filters.py)
+        # Lower(...) -> funktionaler Index auf den kleingeschriebenen Wert, damit auch case-insensitive Filter den Index benutzen können
+        # Ein normaler Index auf designation würde bei iexact nicht helfen
+        # emp_id braucht keinen eigenen Index mehr -> unique=True legt einen an
+        indexes = [
+            models.Index(fields=['emp_num'], name='employee_emp_num_idx'),
+            models.Index(Lower('designation'), name='employee_designation_lower_idx'),
+            models.Index(Lower('emp_name'), name='employee_name_lower_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.emp_num = parse_emp_num(self.emp_id)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'emp_id' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'emp_num'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.emp_name
+
+
+# Anzahl der Employees pro Designation (Facetten für das Dropdown des Designation-Filters, siehe employees/facets.py)
+# designation ist kleingeschrieben wie beim Filter (lower(designation) = lower(value)) -> "Manager" und "manager" zählen zusammen
+# Wird bei jeder Änderung an den Employees mitgepflegt -> die ungefilterten Facetten kosten nur so viele Zeilen, wie es Designations gibt
+class DesignationFacet(models.Model):
+    designation = models.CharField(max_length=50, primary_key=True)
+    # Schreibweise, mit der die Designation zuerst angelegt wurde -> Anzeige im Dropdown
+    label = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
-        return self.emp_name
\ No newline at end of file
+        return f'{self.label}: {self.count}'
@@ -1,3 +1,391 @@
+import csv
+import io
+import json
+
+from unittest import mock
+
+from django.db import IntegrityError, connection
+from django.db.models.signals import post_delete, post_init, post_save
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.serializers import BulkListSerializer
+from api.signals import bulk_deleted, bulk_saved
+from api.testing import ApiTestCase
+
+from . import facets
+from .filters import EmployeeFilter
+from .models import DesignationFacet, Employee
+
+
+class EmployeeKeysetPaginationTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'EMP{i:03}', emp_name=f'Employee {i}', designation='Manager' if i % 2 else 'Developer')
+            for i in range(1, 8)
+        )
+
+    def collect(self, url):
+        # Allen next-Links folgen und die emp_ids aller Seiten einsammeln
+        emp_ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            emp_ids += [employee['emp_id'] for employee in response.data['results']]
+            url = response.data['next']
+        return emp_ids
+
+    def test_walks_all_pages_without_count(self):
+        self.assertEqual(self.collect('/api/v1/employees/?pagination=keyset'), [f'EMP{i:03}' for i in range(1, 8)])
+
+    def test_with_filter_and_ordering(self):
+        self.assertEqual(
+            self.collect('/api/v1/employees/?pagination=keyset&designation=manager&order-by=-emp_id'),
+            ['EMP007', 'EMP005', 'EMP003', 'EMP001'],
+        )
+
+    def test_ties_use_the_primary_key_in_the_cursor(self):
+        # Viele gleiche Namen: die Position enthält auch die id -> WHERE emp_name > ... OR (emp_name = ... AND id > ...), kein OFFSET
+        Employee.objects.filter(designation='Manager').update(emp_name='Same Name')
+        url = '/api/v1/employees/?pagination=keyset&order-by=emp_name&page_size=1'
+        expected = list(Employee.objects.order_by('emp_name', 'id').values_list('emp_id', flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.collect(url), expected)
+        self.assertFalse([query for query in queries.captured_queries if 'OFFSET' in query['sql']])
+
+        # Rückwärts über die previous-Links
+        response = self.client.get(url)
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+        emp_ids = [employee['emp_id'] for employee in response.data['results']]
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            emp_ids = [employee['emp_id'] for employee in response.data['results']] + emp_ids
+        self.assertEqual(emp_ids, expected)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/v1/employees/?pagination=keyset&cursor=cD1hYmM=').status_code, 404)
+
+    def test_optional_count(self):
+        response = self.client.get('/api/v1/employees/?pagination=keyset&count=true&designation=developer')
+        self.assertEqual(response.data['count'], 3)
+
+    def test_default_pagination_unchanged(self):
+        response = self.client.get('/api/v1/employees/')
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(response.data['page_size'], 2)
+
+
+class EmployeeBulkTest(ApiTestCase):
+    url = '/api/v1/employees/bulk/'
+
+    def payload(self, count, start=1):
+        return [
+            {'emp_id': f'EMP{i:03}', 'emp_name': f'Employee {i}', 'designation': 'Developer'}
+            for i in range(start, start + count)
+        ]
+
+    def test_bulk_create_uses_few_queries(self):
+        with self.assertNumQueries(7), self.captureOnCommitCallbacks(execute=True):
+            # SAVEPOINT + INSERT ... RETURNING pro Batch (Batchgröße 1000) + RELEASE + Cache-Versionen kosten keine Query
+            # + 2 INSERTs in das Change Log nach dem Commit (SQLite teilt bulk_create nach der Anzahl der Parameter auf)
+            # + 1 SELECT für die Prüfung der emp_ids (statt eines UniqueValidators pro Employee)
+            response = self.client.post(self.url, self.payload(300), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 300)
+        self.assertEqual(Employee.objects.count(), 300)
+
+    def test_per_item_errors(self):
+        payload = self.payload(3)
+        payload[1]['emp_name'] = ''
+        del payload[2]['designation']
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('emp_name', response.data['errors'][0]['errors'])
+        self.assertFalse(Employee.objects.exists())
+
+    def test_bulk_update(self):
+        ids = self.client.post(self.url, self.payload(3), format='json').data['ids']
+        response = self.client.patch(self.url, [{'id': pk, 'designation': 'Manager'} for pk in ids[:2]], format='json')
+        self.assertEqual(response.data, {'updated': 2})
+        self.assertEqual(Employee.objects.filter(designation='Manager').count(), 2)
+
+        response = self.client.patch(self.url, [{'id': 999999, 'designation': 'Manager'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data['errors'][0]['errors'])
+
+    def test_unique_emp_id(self):
+        self.client.post(self.url, self.payload(2), format='json')
+        payload = self.payload(3, start=2)
+        payload.append(dict(payload[1], emp_name='Duplicate'))
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        # EMP002 gibt es schon, EMP003 kommt im Request zweimal vor
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 3])
+        self.assertIn('emp_id', response.data['errors'][1]['errors'])
+
+        # Updates: die eigene emp_id ist kein Konflikt, die eines anderen Employees schon
+        employees = list(Employee.objects.order_by('pk'))
+        response = self.client.put(self.url, [
+            {'id': employees[0].pk, 'emp_id': 'EMP001', 'emp_name': 'Renamed', 'designation': 'Manager'},
+            {'id': employees[1].pk, 'emp_id': 'EMP001', 'emp_name': 'Other', 'designation': 'Manager'},
+        ], format='json')
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertEqual(self.client.post('/api/v1/employees/', self.payload(1)[0], format='json').status_code, 400)
+
+    def test_all_batches_in_one_transaction(self):
+        # Ein Konflikt, den die Prüfung vorher nicht sieht (z.B. ein gleichzeitiger Write), lässt einen späteren Batch scheitern
+        # -> auch die früheren Batches werden nicht geschrieben, bulk_saved wird nicht verschickt
+        payload = self.payload(4)
+        payload[3]['emp_id'] = payload[0]['emp_id']
+        received = []
+        bulk_saved.connect(lambda sender, instances, **kwargs: received.append(len(instances)), sender=Employee, weak=False, dispatch_uid='test')
+        self.addCleanup(bulk_saved.disconnect, sender=Employee, dispatch_uid='test')
+        with mock.patch.object(BulkListSerializer, 'batch_size', 2), mock.patch('api.serializers.find_unique_conflicts', return_value={}):
+            with self.assertRaises(IntegrityError), self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.url, payload, format='json')
+        self.assertFalse(Employee.objects.exists())
+        self.assertEqual(received, [])
+
+    def test_bulk_update_invalidates_cache(self):
+        ids = self.client.post(self.url, self.payload(1), format='json').data['ids']
+        self.client.get('/api/v1/employees/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.url, [{'id': ids[0], **self.payload(1)[0], 'emp_name': 'Renamed'}], format='json')
+        self.assertEqual(self.client.get('/api/v1/employees/').data['results'][0]['emp_name'], 'Renamed')
+
+    def test_bulk_delete(self):
+        ids = self.client.post(self.url, self.payload(5), format='json').data['ids']
+        response = self.client.delete(self.url, {'ids': ids[:2]}, format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+
+        response = self.client.delete(self.url + '?emp_name=Employee 5')
+        self.assertEqual(response.data, {'deleted': 1})
+        self.assertEqual(Employee.objects.count(), 2)
+
+        # Ohne ids und ohne Filter wird nichts gelöscht
+        self.assertEqual(self.client.delete(self.url).status_code, 400)
+        self.assertEqual(Employee.objects.count(), 2)
+
+    def test_bulk_delete_ignores_empty_filters(self):
+        self.client.post(self.url, self.payload(3), format='json')
+        # Leere Werte filtern nicht -> würden sonst alle Employees löschen
+        for query in ('?designation=', '?id_min=', '?designation=&id_min=&emp_name=', '?unknown=1'):
+            self.assertEqual(self.client.delete(self.url + query).status_code, 400, query)
+        self.assertEqual(self.client.delete(self.url + '?id_min=abc').status_code, 400)
+        self.assertEqual(Employee.objects.count(), 3)
+
+
+class EmployeeFilterIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Employee.objects.bulk_create([
+            Employee(emp_id='EMP001', emp_name='John Smith', designation='Manager'),
+            Employee(emp_id='EMP002', emp_name='joanna Berg', designation='Developer'),
+            Employee(emp_id='EMP003', emp_name='Mary Jones', designation='developer'),
+        ])
+
+    def filter(self, **data):
+        return EmployeeFilter(data, queryset=Employee.objects.all()).qs
+
+    def assertUsesIndex(self, queryset, index_name):
+        # EXPLAIN QUERY PLAN -> der Filter muss über den Index laufen, nicht über einen Full Scan der Tabelle
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index_name}', plan)
+
+    def test_designation_is_case_insensitive_and_indexed(self):
+        queryset = self.filter(designation='DEVELOPER')
+        self.assertEqual(sorted(queryset.values_list('emp_id', flat=True)), ['EMP002', 'EMP003'])
+        self.assertUsesIndex(queryset, 'employee_designation_lower_idx')
+
+    def test_name_prefix_uses_index_range(self):
+        queryset = self.filter(emp_name_prefix='JO')
+        self.assertEqual(sorted(queryset.values_list('emp_id', flat=True)), ['EMP001', 'EMP002'])
+        self.assertUsesIndex(queryset, 'employee_name_lower_idx')
+
+    def test_id_range_uses_index(self):
+        queryset = self.filter(id_min='EMP002', id_max='EMP003')
+        self.assertEqual(sorted(queryset.values_list('emp_id', flat=True)), ['EMP002', 'EMP003'])
+        self.assertUsesIndex(queryset, 'employee_emp_num_idx')
+
+    def test_id_range_is_numeric(self):
+        Employee.objects.bulk_create(Employee(emp_id=f'EMP{i}', emp_name=f'Employee {i}', designation='Intern') for i in (9, 10, 25))
+        # Als Text wäre EMP10 < EMP2 < EMP25 < EMP9
+        self.assertEqual(
+            sorted(self.filter(id_min='EMP2', id_max='EMP10').values_list('emp_id', flat=True)), ['EMP002', 'EMP003', 'EMP10', 'EMP9'],
+        )
+        self.assertEqual(list(self.filter(id_min='10').values_list('emp_id', flat=True)), ['EMP10', 'EMP25'])
+        self.assertEqual(APIClient().get('/api/v1/employees/?id_min=abc').status_code, 400)
+
+    def test_emp_num_is_kept_in_sync(self):
+        employee = Employee.objects.get(emp_id='EMP001')
+        self.assertEqual(employee.emp_num, 1)
+        employee.emp_id = 'EMP100'
+        employee.save(update_fields=['emp_id'])
+        self.assertEqual(Employee.objects.get(pk=employee.pk).emp_num, 100)
+
+        employee.emp_id = 'EMP200'
+        Employee.objects.bulk_update([employee], ['emp_id'])
+        self.assertEqual(Employee.objects.get(pk=employee.pk).emp_num, 200)
+        Employee.objects.filter(pk=employee.pk).update(emp_id='X-7')
+        self.assertEqual(Employee.objects.get(pk=employee.pk).emp_num, 7)
+        self.assertNotIn('emp_num', APIClient().get(f'/api/v1/employees/{employee.pk}/').data)
+
+    def test_name_contains_still_supported(self):
+        self.assertEqual(list(self.filter(emp_name='smith').values_list('emp_id', flat=True)), ['EMP001'])
+
+
+class EmployeeExportTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'EMP{i:03}', emp_name=f'Employee {i}', designation='Manager' if i % 2 else 'Developer')
+            for i in range(1, 8)
+        )
+
+    def export(self, query):
+        response = self.client.get(f'/api/v1/employees/export/?{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_without_pagination(self):
+        response, content = self.export('')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('employees.ndjson', response['Content-Disposition'])
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['emp_id'] for row in rows], [f'EMP{i:03}' for i in range(1, 8)])
+
+    def test_csv_with_filter_search_and_ordering(self):
+        response, content = self.export('output=csv&designation=manager&q=employee&order-by=-emp_id&fields=emp_id,designation')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['emp_id', 'designation'])
+        self.assertEqual([row[0] for row in rows[1:]], ['EMP007', 'EMP005', 'EMP003', 'EMP001'])
+
+    def test_not_modified_and_invalid_format(self):
+        response, _ = self.export('output=csv')
+        response = self.client.get('/api/v1/employees/export/?output=csv', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get('/api/v1/employees/export/?output=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('output', response.data)
+
+
+class DesignationFacetTest(ApiTestCase):
+    url = '/api/v1/employees/facets/'
+
+    def setUp(self):
+        super().setUp()
+        for i, (name, designation) in enumerate([
+            ('John', 'Manager'), ('Jane', 'manager'), ('Joe', 'Developer'), ('Anna', 'Developer'), ('Bob', 'Intern'),
+        ]):
+            Employee.objects.create(emp_id=f'EMP{i:03}', emp_name=name, designation=designation)
+
+    def facets(self):
+        return {facet.designation: facet.count for facet in DesignationFacet.objects.all()}
+
+    def test_triggers_maintain_facets(self):
+        self.assertEqual(self.facets(), {'manager': 2, 'developer': 2, 'intern': 1})
+        # Nur Groß-/Kleinschreibung geändert -> gleiche Facette
+        Employee.objects.filter(emp_name='Jane').update(designation='MANAGER')
+        Employee.objects.filter(emp_name='Bob').update(designation='Developer')
+        Employee.objects.filter(emp_name='John').delete()
+        self.assertEqual(self.facets(), {'manager': 1, 'developer': 3})
+
+        self.client.post('/api/v1/employees/bulk/', [
+            {'emp_id': f'NEW{i}', 'emp_name': f'New {i}', 'designation': 'Tester'} for i in range(3)
+        ], format='json')
+        self.assertEqual(self.facets()['tester'], 3)
+        self.assertEqual(facets.rebuild_facets(), 3)
+        self.assertEqual(self.facets(), {'manager': 1, 'developer': 3, 'tester': 3})
+
+    def test_unfiltered_facets_come_from_the_table(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['designation'], [
+            {'value': 'developer', 'label': 'Developer', 'count': 2},
+            {'value': 'manager', 'label': 'Manager', 'count': 2},
+            {'value': 'intern', 'label': 'Intern', 'count': 1},
+        ])
+        # Der Designation-Filter selbst schränkt die Facetten nicht ein
+        self.assertEqual(self.client.get(self.url, {'designation': 'manager'}).data, response.data)
+
+    def test_filtered_facets(self):
+        response = self.client.get(self.url, {'emp_name': 'jo', 'designation': 'intern'})
+        self.assertEqual(
+            [(facet['value'], facet['count']) for facet in response.data['designation']],
+            [('developer', 1), ('manager', 1)],
+        )
+        response = self.client.get(self.url, {'id_min': 'EMP002', 'id_max': 'EMP003'})
+        self.assertEqual([(facet['value'], facet['count']) for facet in response.data['designation']], [('developer', 2)])
+        response = self.client.get(self.url, {'q': 'Jane'})
+        self.assertEqual([(facet['value'], facet['count']) for facet in response.data['designation']], [('manager', 1)])
+
+    def test_same_label_with_and_without_filters(self):
+        # Die kleinste Schreibweise gewinnt, unabhängig davon, welche zuerst angelegt wurde
+        Employee.objects.create(emp_id='EMP010', emp_name='Tim', designation='tester')
+        Employee.objects.create(emp_id='EMP011', emp_name='Tom', designation='Tester')
+        unfiltered = {facet['value']: facet['label'] for facet in self.client.get(self.url).data['designation']}
+        filtered = {facet['value']: facet['label'] for facet in self.client.get(self.url, {'emp_name': 't'}).data['designation']}
+        self.assertEqual(unfiltered['tester'], 'Tester')
+        self.assertEqual(filtered['tester'], 'Tester')
+        facets.rebuild_facets()
+        self.assertEqual(DesignationFacet.objects.get(designation='tester').label, 'Tester')
+
+    def test_cache_invalidation(self):
+        self.client.get(self.url)
+        Employee.objects.create(emp_id='EMP010', emp_name='Eve', designation='Intern')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn({'value': 'intern', 'label': 'Intern', 'count': 2}, response.data['designation'])
+
+
+class DesignationFacetFallbackTest(TestCase):
+    # Datenbanken ohne Trigger -> die Receiver aus employees/facets.py pflegen die Facetten
+    def setUp(self):
+        facets.drop_designation_facets(connection)
+        for signal, receiver in (
+            (post_init, facets.remember_designation),
+            (post_save, facets.employee_saved),
+            (post_delete, facets.employee_deleted),
+            (bulk_saved, facets.employees_bulk_saved),
+            (bulk_deleted, facets.employees_bulk_deleted),
+        ):
+            signal.connect(receiver, sender=Employee)
+            self.addCleanup(signal.disconnect, receiver, sender=Employee)
+
+    def facets(self):
+        return {facet.designation: facet.count for facet in DesignationFacet.objects.all()}
+
+    def test_signals(self):
+        employee = Employee.objects.create(emp_id='EMP001', emp_name='John', designation='Manager')
+        employees = Employee.objects.bulk_create(
+            Employee(emp_id=f'EMP{i:03}', emp_name=f'Employee {i}', designation='Developer') for i in range(2, 5)
+        )
+        bulk_saved.send(sender=Employee, instances=employees, created=True)
+        self.assertEqual(self.facets(), {'manager': 1, 'developer': 3})
+
+        employee = Employee.objects.get(pk=employee.pk)
+        employee.designation = 'developer'
+        employee.save()
+        self.assertEqual(self.facets(), {'developer': 4})
+
+        employees[0].designation = 'Intern'
+        Employee.objects.bulk_update(employees[:1], ['designation'])
+        bulk_saved.send(sender=Employee, instances=employees[:1], created=False)
+        self.assertEqual(self.facets(), {'developer': 3, 'intern': 1})
+
+        employee.delete()
+        Employee.objects.filter(pk__in=[e.pk for e in employees[:2]])._raw_delete(connection.alias)
+        bulk_deleted.send(sender=Employee, instances=employees[:2])
+        self.assertEqual(self.facets(), {'developer': 1})
 
-# Create your tests here.
+    def test_label_is_the_smallest_spelling(self):
+        Employee.objects.create(emp_id='EMP001', emp_name='John', designation='manager')
+        Employee.objects.create(emp_id='EMP002', emp_name='Jane', designation='Manager')
+        self.assertEqual(DesignationFacet.objects.get(designation='manager').label, 'Manager')
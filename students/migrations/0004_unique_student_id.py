@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+def check_unique_student_id(apps, schema_editor):
+    # Doppelte student_ids würden den Unique Index scheitern lassen -> vorher mit verständlicher Meldung abbrechen
+    Student = apps.get_model('students', 'Student')
+    duplicates = list(
+        Student.objects.values('student_id').annotate(count=models.Count('pk')).filter(count__gt=1).values_list('student_id', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(f'student_id must be unique, fix these duplicates before migrating: {", ".join(duplicates)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_unique_student_id, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='student',
+            name='student_id',
+            field=models.CharField(max_length=10, unique=True),
+        ),
+    ]
@@ -2,9 +2,14 @@ from django.db import models
 
 # Create your models here.
 class Student(models.Model):
-    student_id = models.CharField(max_length=10)
+    # Fachlicher Schlüssel -> Unique Index, Lookup über /api/v1/students/by-student-id/<student_id>/ (siehe api/lookups.py)
+    student_id = models.CharField(max_length=10, unique=True)
     name = models.CharField(max_length=50)
     branch = models.CharField(max_length=50)
 
+    # Zeitpunkt der letzten Änderung -> wird bei jedem save() automatisch gesetzt (auto_now)
+    # Dient als Validator für ETag/Last-Modified (Conditional GET, siehe api/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     def __str__(self):
         return self.name
\ No newline at end of file
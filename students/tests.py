@@ -1,3 +1,37 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from api.testing import ApiTestCase
+
+from .models import Student
+
+
+class StudentsListTest(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Student.objects.bulk_create(
+            Student(student_id=f'S{i:03}', name=f'Student {i}', branch='Informatik') for i in range(1, 6)
+        )
+
+    def test_paginated(self):
+        response = self.client.get('/api/v1/students/?limit=2&offset=2')
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual([s['student_id'] for s in response.data['results']], ['S003', 'S004'])
+
+    def test_stream_json_array(self):
+        response = self.client.get('/api/v1/students/?stream=json')
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0], {
+            'id': data[0]['id'], 'student_id': 'S001', 'name': 'Student 1', 'branch': 'Informatik',
+            'updated_at': data[0]['updated_at'],
+        })
+
+    def test_stream_ndjson(self):
+        response = self.client.get('/api/v1/students/?stream=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)['student_id'] for line in lines], [f'S{i:03}' for i in range(1, 6)])
+
+    def test_invalid_stream_format(self):
+        self.assertEqual(self.client.get('/api/v1/students/?stream=xml').status_code, 400)